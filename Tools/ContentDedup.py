@@ -0,0 +1,183 @@
+"""
+Content Dedup Module
+This module detects near-duplicate pages (syndicated or mirrored articles under different
+URLs) with 64-bit SimHash fingerprints over word shingles. Fingerprints are bucketed by
+8-bit bands, so a lookup only compares against pages that share a band; with eight bands,
+any two fingerprints within Hamming distance 7 are guaranteed to meet in some bucket.
+"""
+
+import re
+import hashlib
+import threading
+from typing import Dict, List, Optional, Tuple
+
+
+FINGERPRINT_BITS = 64
+BANDS = 8
+BAND_BITS = FINGERPRINT_BITS // BANDS
+DEFAULT_MAX_DISTANCE = 6   # Must stay below BANDS for the band lookup to find every match
+DEFAULT_MIN_WORDS = 50     # Shorter texts give unreliable fingerprints and are never collapsed
+SHINGLE_WORDS = 3
+SNIPPET_CHARS = 300        # Leading text kept per page to describe it to later duplicates
+
+
+def simhash(text: str, shingle_words: int = SHINGLE_WORDS) -> int:
+    """
+    Compute the 64-bit SimHash of a text from its overlapping word shingles
+
+    Args:
+        text (str): Text to fingerprint
+        shingle_words (int): Words per shingle (default: 3)
+
+    Returns:
+        int: The fingerprint
+    """
+    words = re.findall(r'\w+', text.lower())
+    if len(words) < shingle_words:
+        shingles = [" ".join(words)] if words else []
+    else:
+        shingles = [" ".join(words[i:i + shingle_words]) for i in range(len(words) - shingle_words + 1)]
+
+    # Count set bits for all 64 positions at once with bit-sliced counters: planes[k] holds
+    # bit k of every position's count, and each hash is added with a ripple carry
+    planes: List[int] = []
+    for shingle in shingles:
+        carry = int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big')
+        level = 0
+        while carry:
+            if level == len(planes):
+                planes.append(0)
+            planes[level], carry = planes[level] ^ carry, planes[level] & carry
+            level += 1
+
+    fingerprint = 0
+    for position in range(FINGERPRINT_BITS):
+        count = sum((plane >> position & 1) << level for level, plane in enumerate(planes))
+        if 2 * count > len(shingles):
+            fingerprint |= 1 << position
+    return fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits between two fingerprints"""
+    return bin(a ^ b).count('1')
+
+
+class ContentDedup:
+    """
+    Thread-safe near-duplicate index over extracted page content
+    """
+
+    def __init__(self, max_distance: int = DEFAULT_MAX_DISTANCE, min_words: int = DEFAULT_MIN_WORDS):
+        """
+        Initialize the ContentDedup
+
+        Args:
+            max_distance (int): Largest Hamming distance treated as a duplicate (default: 6, at most 7)
+            min_words (int): Minimum words for a page to take part in deduplication (default: 50)
+        """
+        if not 0 <= max_distance < BANDS:
+            raise ValueError(f"max_distance must be between 0 and {BANDS - 1}, got {max_distance}")
+        self.max_distance = max_distance
+        self.min_words = min_words
+        self.lock = threading.Lock()
+        self.fingerprints: Dict[str, int] = {}
+        self.summaries: Dict[str, Dict[str, str]] = {}
+        self.buckets: Dict[Tuple[int, int], List[str]] = {}
+        self.duplicates: Dict[str, List[str]] = {}
+
+    @staticmethod
+    def _bands(fingerprint: int) -> List[Tuple[int, int]]:
+        """Split a fingerprint into (band number, band value) bucket keys"""
+        mask = (1 << BAND_BITS) - 1
+        return [(band, fingerprint >> (band * BAND_BITS) & mask) for band in range(BANDS)]
+
+    def check_and_add(self, url: str, text: str, title: str = '') -> Optional[str]:
+        """
+        Check a page against every page seen so far and remember it
+
+        A page at a URL that was already seen is not a duplicate of itself; only copies
+        under different URLs are reported.
+
+        Args:
+            url (str): Page URL
+            text (str): Extracted page content
+            title (str): Page title, kept with a snippet for summary_of() (default: '')
+
+        Returns:
+            Optional[str]: URL of the first page with the same content, or None if the page is new
+        """
+        if len(text.split()) < self.min_words:
+            return None
+        fingerprint = simhash(text)
+        bands = self._bands(fingerprint)
+
+        with self.lock:
+            if url in self.fingerprints:
+                return None
+            for key in bands:
+                for candidate in self.buckets.get(key, ()):
+                    if hamming_distance(fingerprint, self.fingerprints[candidate]) <= self.max_distance:
+                        duplicates = self.duplicates.setdefault(candidate, [])
+                        if url not in duplicates:
+                            duplicates.append(url)
+                        return candidate
+
+            self.fingerprints[url] = fingerprint
+            self.summaries[url] = {'title': title, 'snippet': text[:SNIPPET_CHARS]}
+            for key in bands:
+                self.buckets.setdefault(key, []).append(url)
+            return None
+
+    def duplicates_of(self, url: str) -> List[str]:
+        """
+        Get the URLs collapsed into a page
+
+        Args:
+            url (str): URL of the first-seen page
+
+        Returns:
+            List[str]: URLs of its near-duplicates in the order they were seen
+        """
+        with self.lock:
+            return list(self.duplicates.get(url, []))
+
+    def summary_of(self, url: str) -> Optional[Dict[str, str]]:
+        """
+        Get the title and leading snippet of a first-seen page
+
+        Args:
+            url (str): URL of the first-seen page
+
+        Returns:
+            Optional[Dict[str, str]]: 'title' and 'snippet', or None if the URL was not indexed
+        """
+        with self.lock:
+            summary = self.summaries.get(url)
+            return dict(summary) if summary else None
+
+    def __len__(self) -> int:
+        with self.lock:
+            return len(self.fingerprints)
+
+
+_shared_dedups: Dict[str, ContentDedup] = {}
+_shared_dedups_lock = threading.Lock()
+
+
+def get_content_dedup(scope: str = "default") -> ContentDedup:
+    """
+    Get the process-wide shared ContentDedup for a scope (e.g. one research run), creating it on first use
+
+    Args:
+        scope (str): Scope name; every caller passing the same scope shares one index
+
+    Returns:
+        ContentDedup: The shared index
+    """
+    with _shared_dedups_lock:
+        dedup = _shared_dedups.get(scope)
+        if dedup is None:
+            dedup = ContentDedup()
+            _shared_dedups[scope] = dedup
+        return dedup
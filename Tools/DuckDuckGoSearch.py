@@ -4,24 +4,101 @@ This module provides functionality to search the web using DuckDuckGo's free API
 and retrieve search result links.
 """
 
+import sys
+import os
+import re
 import requests
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import json
-import time
+from concurrent.futures import ThreadPoolExecutor
+from lxml import etree
+import lxml.html
 from urllib.parse import quote_plus
 
+# Add the Tools directory to the path
+sys.path.append(os.path.dirname(__file__))
+
+from HttpSession import HttpClient, get_http_client, DEFAULT_USER_AGENT
+from SearchCache import SearchCache, get_search_cache
+
+
+PARSER_BACKENDS = ('lxml', 'bs4')
+
+
+def _class_xpath(tag: str, class_name: str, descendant: bool = True) -> str:
+    """XPath matching elements that carry class_name as one of their classes, like BeautifulSoup's class_"""
+    axis = './/' if descendant else '//'
+    return f"{axis}{tag}[contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')]"
+
+
+# Compiled once at import; these mirror the BeautifulSoup lookups in _parse_html_results_bs4
+RESULT_CONTAINERS_XPATH = etree.XPath(_class_xpath('div', 'result', descendant=False))
+WEB_RESULT_CONTAINERS_XPATH = etree.XPath(_class_xpath('div', 'web-result', descendant=False))
+TITLE_XPATH = etree.XPath(f"({_class_xpath('a', 'result__a')})[1]")
+SNIPPET_XPATH = etree.XPath(f"({_class_xpath('a', 'result__snippet')})[1]")
+# BeautifulSoup's get_text() skips strings inside these elements, so the XPath does too
+HIDDEN_TEXT_TAGS = ('script', 'style', 'template', 'rt', 'rp')
+TEXT_NODES_XPATH = etree.XPath(
+    f".//text()[not({' or '.join(f'ancestor::{tag}' for tag in HIDDEN_TEXT_TAGS)})]"
+)
+
+# Markup that html.parser and libxml2 build into different trees
+ANCHOR_TAG_PATTERN = re.compile(r'<(/?)a(?=[\s/>])', re.IGNORECASE)
+CDATA_MARKER = '<![CDATA['
+
+
+def _stripped_text(element) -> str:
+    """Equivalent of BeautifulSoup's get_text(strip=True): stripped text nodes joined without separators"""
+    return ''.join(text.strip() for text in TEXT_NODES_XPATH(element) if text.strip())
+
+
+def _needs_bs4(html_content: str) -> bool:
+    """
+    Check for markup the lxml parser cannot reproduce: libxml2 closes an open <a> when another
+    <a> starts and drops CDATA sections, while html.parser keeps both
+    """
+    if CDATA_MARKER in html_content:
+        return True
+    depth = 0
+    for match in ANCHOR_TAG_PATTERN.finditer(html_content):
+        if match.group(1):
+            depth = max(0, depth - 1)
+        else:
+            depth += 1
+            if depth > 1:
+                return True
+    return False
+
 
 class DuckDuckGoSearcher:
     """
     A class to perform web searches using DuckDuckGo's instant answer API
     """
     
-    def __init__(self):
+    def __init__(self, http_client: Optional[HttpClient] = None,
+                 search_cache: Optional[SearchCache] = None, use_cache: bool = True,
+                 parser_backend: str = "lxml"):
+        """
+        Initialize the DuckDuckGoSearcher
+        
+        Args:
+            http_client (Optional[HttpClient]): HTTP client to use (default: the shared pooled client)
+            search_cache (Optional[SearchCache]): Query-result cache to use (default: the shared cache)
+            use_cache (bool): Whether to read and write the query-result cache at all (default: True)
+            parser_backend (str): "lxml" for the compiled-XPath parser or "bs4" for the
+                BeautifulSoup parser (default: "lxml")
+        """
+        if parser_backend not in PARSER_BACKENDS:
+            raise ValueError(f"parser_backend must be one of {PARSER_BACKENDS}")
+        
         self.base_url = "https://api.duckduckgo.com/"
         self.search_url = "https://html.duckduckgo.com/html/"
         self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+            'User-Agent': DEFAULT_USER_AGENT
         }
+        self.http = http_client or get_http_client()
+        self.cache = (search_cache or get_search_cache()) if use_cache else None
+        self.parser_backend = parser_backend
     
     def search(self, query: str, max_results: int = 10, safe_search: str = "moderate") -> List[Dict[str, str]]:
         """
@@ -35,17 +112,26 @@ class DuckDuckGoSearcher:
         Returns:
             List[Dict[str, str]]: List of search results with title, url, and snippet
         """
+        if self.cache:
+            hit, cached = self.cache.get('search', query, max_results=max_results, safe_search=safe_search)
+            if hit:
+                return [dict(result) for result in cached]
+        
         try:
             # Use the HTML search endpoint for better results
             encoded_query = quote_plus(query)
             search_url = f"{self.search_url}?q={encoded_query}"
             
-            response = requests.get(search_url, headers=self.headers, timeout=10)
+            response = self.http.get(search_url, headers=self.headers, timeout=10)
             response.raise_for_status()
             
             # Parse the HTML response to extract search results
             results = self._parse_html_results(response.text, max_results)
             
+            # Empty pages are usually throttling responses, so only cache real results
+            if self.cache and results:
+                self.cache.put('search', query, results, max_results=max_results, safe_search=safe_search)
+            
             return results
             
         except requests.exceptions.RequestException as e:
@@ -57,7 +143,75 @@ class DuckDuckGoSearcher:
     
     def _parse_html_results(self, html_content: str, max_results: int) -> List[Dict[str, str]]:
         """
-        Parse HTML content to extract search results
+        Parse HTML content to extract search results with the configured parser backend
+        
+        Args:
+            html_content (str): HTML content from DuckDuckGo
+            max_results (int): Maximum number of results to extract
+        
+        Returns:
+            List[Dict[str, str]]: Parsed search results
+        """
+        if self.parser_backend == "bs4":
+            return self._parse_html_results_bs4(html_content, max_results)
+        return self._parse_html_results_lxml(html_content, max_results)
+    
+    def _parse_html_results_lxml(self, html_content: str, max_results: int) -> List[Dict[str, str]]:
+        """
+        Parse HTML content with lxml and precompiled XPath expressions
+        
+        Produces exactly the same output as _parse_html_results_bs4. Pages with nested links
+        or CDATA sections, which the two parsers build differently, are handed to the
+        BeautifulSoup parser.
+        
+        Args:
+            html_content (str): HTML content from DuckDuckGo
+            max_results (int): Maximum number of results to extract
+        
+        Returns:
+            List[Dict[str, str]]: Parsed search results
+        """
+        if not html_content or not html_content.strip():
+            return []
+        if _needs_bs4(html_content):
+            return self._parse_html_results_bs4(html_content, max_results)
+        
+        tree = lxml.html.fromstring(html_content)
+        results = []
+        
+        # Find all result containers - try multiple class patterns
+        result_containers = RESULT_CONTAINERS_XPATH(tree)
+        if not result_containers:
+            result_containers = WEB_RESULT_CONTAINERS_XPATH(tree)
+        
+        for container in result_containers[:max_results]:
+            try:
+                # Extract title and URL
+                title_elements = TITLE_XPATH(container)
+                if title_elements:
+                    title_element = title_elements[0]
+                    title = _stripped_text(title_element)
+                    url = title_element.get('href', '')
+                    
+                    snippet_elements = SNIPPET_XPATH(container)
+                    snippet = _stripped_text(snippet_elements[0]) if snippet_elements else ""
+                    snippet = snippet.replace('<b>', '').replace('</b>', '')
+                    
+                    if title and url and url.startswith('http'):
+                        results.append({
+                            'title': title,
+                            'url': url,
+                            'snippet': snippet
+                        })
+            except Exception as e:
+                print(f"Error parsing result: {e}")
+                continue
+        
+        return results
+    
+    def _parse_html_results_bs4(self, html_content: str, max_results: int) -> List[Dict[str, str]]:
+        """
+        Parse HTML content with BeautifulSoup's html.parser
         
         Args:
             html_content (str): HTML content from DuckDuckGo
@@ -117,6 +271,11 @@ class DuckDuckGoSearcher:
         Returns:
             Optional[Dict]: Instant answer data if available
         """
+        if self.cache:
+            hit, cached = self.cache.get('instant', query)
+            if hit:
+                return dict(cached) if cached else None
+        
         try:
             params = {
                 'q': query,
@@ -125,20 +284,24 @@ class DuckDuckGoSearcher:
                 'skip_disambig': '1'
             }
             
-            response = requests.get(self.base_url, params=params, headers=self.headers, timeout=10)
+            response = self.http.get(self.base_url, params=params, headers=self.headers, timeout=10)
             response.raise_for_status()
             
             data = response.json()
             
+            answer = None
             if data.get('AbstractText') or data.get('Answer'):
-                return {
+                answer = {
                     'abstract': data.get('AbstractText', ''),
                     'answer': data.get('Answer', ''),
                     'source': data.get('AbstractSource', ''),
                     'url': data.get('AbstractURL', '')
                 }
             
-            return None
+            if self.cache:
+                self.cache.put('instant', query, answer)
+            
+            return answer
             
         except requests.exceptions.RequestException as e:
             print(f"Error getting instant answer: {e}")
@@ -147,13 +310,22 @@ class DuckDuckGoSearcher:
             print(f"Error parsing JSON response: {e}")
             return None
     
+    def get_cache_stats(self) -> Dict[str, float]:
+        """
+        Get hit/miss counters of the query-result cache
+        
+        Returns:
+            Dict[str, float]: Cache counters, or an empty dict if caching is disabled
+        """
+        return self.cache.get_stats() if self.cache else {}
+    
     def search_with_delay(self, queries: List[str], delay: float = 1.0, max_results: int = 10) -> Dict[str, List[Dict[str, str]]]:
         """
-        Perform multiple searches with delay between requests
+        Perform multiple searches, pacing requests through the shared per-host rate limiter
         
         Args:
             queries (List[str]): List of search queries
-            delay (float): Delay between requests in seconds (default: 1.0)
+            delay (float): Ignored; the html.duckduckgo.com bucket in RateLimiter.py paces the searches
             max_results (int): Maximum results per query (default: 10)
         
         Returns:
@@ -165,11 +337,57 @@ class DuckDuckGoSearcher:
             print(f"Searching for: {query}")
             results = self.search(query, max_results)
             all_results[query] = results
-            
-            if query != queries[-1]:  # Don't delay after the last query
-                time.sleep(delay)
         
         return all_results
+    
+    def search_many(self, queries: List[str], max_results: int = 10, safe_search: str = "moderate",
+                    max_workers: int = 4) -> Dict[str, List[Dict[str, str]]]:
+        """
+        Perform multiple searches concurrently
+        
+        Requests still go through the shared per-host rate limiter, so concurrency only
+        overlaps network latency and cache lookups; it never exceeds the DuckDuckGo budget.
+        
+        Args:
+            queries (List[str]): List of search queries (duplicates are searched once)
+            max_results (int): Maximum results per query (default: 10)
+            safe_search (str): Safe search setting - "strict", "moderate", or "off" (default: "moderate")
+            max_workers (int): Maximum simultaneous searches (default: 4)
+        
+        Returns:
+            Dict[str, List[Dict[str, str]]]: Dictionary with query as key and results as value,
+            in the order the queries were given
+        """
+        unique_queries = list(dict.fromkeys(queries))
+        if not unique_queries:
+            return {}
+        
+        def run(query: str) -> List[Dict[str, str]]:
+            return self.search(query, max_results, safe_search)
+        
+        workers = max(1, min(max_workers, len(unique_queries)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(run, unique_queries))
+        
+        return dict(zip(unique_queries, results))
+
+
+def compare_parsers(html_content: str, max_results: int = 10) -> Tuple[bool, List[Dict[str, str]], List[Dict[str, str]]]:
+    """
+    Differential check of the lxml parser against the BeautifulSoup parser
+    
+    Args:
+        html_content (str): HTML content from DuckDuckGo
+        max_results (int): Maximum number of results to extract (default: 10)
+    
+    Returns:
+        Tuple[bool, List[Dict[str, str]], List[Dict[str, str]]]: Whether both parsers agree,
+        followed by the lxml and BeautifulSoup results
+    """
+    searcher = DuckDuckGoSearcher(use_cache=False)
+    lxml_results = searcher._parse_html_results_lxml(html_content, max_results)
+    bs4_results = searcher._parse_html_results_bs4(html_content, max_results)
+    return lxml_results == bs4_results, lxml_results, bs4_results
 
 
 # Example usage
@@ -194,3 +412,4 @@ if __name__ == "__main__":
         print(f"Answer: {instant['answer']}")
         print(f"Abstract: {instant['abstract']}")
         print(f"Source: {instant['source']}")
+
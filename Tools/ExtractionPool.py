@@ -0,0 +1,92 @@
+"""
+Extraction Pool Module
+This module keeps a persistent process pool for CPU-bound HTML extraction, so lxml/trafilatura
+parsing runs on all cores instead of serializing on the GIL inside the I/O threads.
+"""
+
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+
+class ExtractionPool:
+    """
+    A lazily started, persistent process pool that restarts itself if a worker dies
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        """
+        Initialize the ExtractionPool
+
+        Args:
+            max_workers (Optional[int]): Number of worker processes (default: os.cpu_count())
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Start the pool on first use"""
+        with self.lock:
+            if self.executor is None:
+                # spawn avoids forking a process that already runs I/O threads
+                self.executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            return self.executor
+
+    def run(self, fn: Callable, *args) -> Any:
+        """
+        Run a picklable top-level function in a worker process and wait for its result
+
+        Args:
+            fn (Callable): Module-level function to call
+            *args: Arguments for the function (bytes are sent to the worker without re-encoding)
+
+        Returns:
+            Any: The function's return value
+        """
+        executor = self._get_executor()
+        try:
+            return executor.submit(fn, *args).result()
+        except BrokenProcessPool:
+            # A worker crashed (e.g. on a pathological page); start a fresh pool and retry once
+            with self.lock:
+                if self.executor is executor:
+                    self.executor = None
+            executor.shutdown(wait=False)
+            return self._get_executor().submit(fn, *args).result()
+
+    def shutdown(self):
+        """Stop all worker processes"""
+        with self.lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+_shared_pools = {}
+_shared_pools_lock = threading.Lock()
+
+
+def get_extraction_pool(max_workers: Optional[int] = None) -> ExtractionPool:
+    """
+    Get the process-wide shared ExtractionPool for a pool size, creating it on first use
+
+    Args:
+        max_workers (Optional[int]): Number of worker processes (default: os.cpu_count())
+
+    Returns:
+        ExtractionPool: The shared pool
+    """
+    size = max_workers or os.cpu_count() or 1
+    with _shared_pools_lock:
+        pool = _shared_pools.get(size)
+        if pool is None:
+            pool = ExtractionPool(size)
+            _shared_pools[size] = pool
+        return pool
@@ -0,0 +1,274 @@
+"""
+Host Health Module
+This module tracks the health of remote hosts with a per-host circuit breaker and keeps a
+time-bounded negative cache of failed URLs, so hung or blocking sources fail fast instead
+of costing every agent a full timeout.
+"""
+
+import sys
+import os
+import threading
+import time
+from typing import Dict, Optional, Any
+from urllib.parse import urlparse
+
+import requests
+
+# Add the Tools directory to the path
+sys.path.append(os.path.dirname(__file__))
+
+from UrlCanonicalizer import canonicalize_url
+
+
+# Circuit breaker states
+CLOSED = "closed"        # Requests flow normally
+OPEN = "open"            # Requests are refused until the cooldown ends
+HALF_OPEN = "half_open"  # One probe request is allowed through to test the host
+
+DEFAULT_FAILURE_THRESHOLD = 3      # Consecutive failures that open a circuit
+DEFAULT_THROTTLE_THRESHOLD = 10    # Consecutive 429 responses that open a circuit
+DEFAULT_COOLDOWN = 60.0            # Seconds a circuit stays open before a probe
+DEFAULT_NEGATIVE_TTL = 10 * 60.0   # Seconds a failed URL is refused
+
+# Responses that mean the host is unhealthy or blocking us, not that one page is missing
+HOST_FAILURE_STATUSES = {403, 500, 502, 503, 504}
+# Responses that mean we are sending too fast; the transport backs off and retries them,
+# so they only open the circuit when they persist
+THROTTLE_STATUSES = {429}
+# Responses that only say something about the URL itself
+URL_FAILURE_STATUSES = {404, 410} | HOST_FAILURE_STATUSES | THROTTLE_STATUSES
+
+
+class HostUnavailableError(requests.exceptions.RequestException):
+    """Raised when a request is refused because its host circuit is open or the URL recently failed"""
+
+
+class CircuitBreaker:
+    """
+    Closed/open/half-open circuit breaker for a single host
+    """
+
+    def __init__(self, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+                 cooldown: float = DEFAULT_COOLDOWN,
+                 throttle_threshold: int = DEFAULT_THROTTLE_THRESHOLD):
+        """
+        Initialize the CircuitBreaker
+
+        Args:
+            failure_threshold (int): Consecutive failures that open the circuit (default: 3)
+            cooldown (float): Seconds to stay open before allowing a probe (default: 60)
+            throttle_threshold (int): Consecutive 429 responses that open the circuit (default: 10)
+        """
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.throttle_threshold = throttle_threshold
+        self.state = CLOSED
+        self.failures = 0
+        self.throttles = 0
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self.last_error = ''
+
+    def allow(self) -> bool:
+        """Decide whether a request may be sent now (caller holds the registry lock)"""
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+            self.state = HALF_OPEN
+            self.probe_in_flight = False
+        if self.state == HALF_OPEN and not self.probe_in_flight:
+            self.probe_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        """Close the circuit after a healthy response"""
+        self.state = CLOSED
+        self.failures = 0
+        self.throttles = 0
+        self.probe_in_flight = False
+
+    def record_failure(self, reason: str):
+        """Count a failure, opening the circuit at the threshold or when a probe fails"""
+        self.failures += 1
+        self.last_error = reason
+        self.probe_in_flight = False
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+    def record_throttle(self, reason: str):
+        """Count a 429 response, opening the circuit at the throttle threshold or when a probe is throttled"""
+        self.throttles += 1
+        self.last_error = reason
+        self.probe_in_flight = False
+        if self.state == HALF_OPEN or self.throttles >= self.throttle_threshold:
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+    def release_probe(self):
+        """Free the half-open probe slot when a probe ended without a recorded outcome"""
+        self.probe_in_flight = False
+
+
+class HostHealthRegistry:
+    """
+    Shared registry of per-host circuit breakers and recently failed URLs
+    """
+
+    def __init__(self, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+                 cooldown: float = DEFAULT_COOLDOWN, negative_ttl: float = DEFAULT_NEGATIVE_TTL,
+                 throttle_threshold: int = DEFAULT_THROTTLE_THRESHOLD):
+        """
+        Initialize the HostHealthRegistry
+
+        Args:
+            failure_threshold (int): Consecutive failures that open a host circuit (default: 3)
+            cooldown (float): Seconds a circuit stays open before a probe (default: 60)
+            negative_ttl (float): Seconds a failed URL is refused (default: 10 minutes)
+            throttle_threshold (int): Consecutive 429 responses that open a host circuit (default: 10)
+        """
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.throttle_threshold = throttle_threshold
+        self.negative_ttl = negative_ttl
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.failed_urls: Dict[str, tuple] = {}
+        self.lock = threading.Lock()
+
+    def _breaker(self, host: str) -> CircuitBreaker:
+        """Get or create the breaker for a host (caller holds the lock)"""
+        breaker = self.breakers.get(host)
+        if breaker is None:
+            breaker = CircuitBreaker(self.failure_threshold, self.cooldown, self.throttle_threshold)
+            self.breakers[host] = breaker
+        return breaker
+
+    def check(self, url: str) -> bool:
+        """
+        Refuse a request whose URL recently failed or whose host circuit is open
+
+        Args:
+            url (str): Request URL
+
+        Returns:
+            bool: True if the request is the half-open probe of its host, which the caller must
+                finish with record_response(), record_error() or release()
+
+        Raises:
+            HostUnavailableError: If the request should not be sent
+        """
+        key = canonicalize_url(url)
+        host = (urlparse(url).hostname or '').lower()
+        now = time.monotonic()
+        with self.lock:
+            failed = self.failed_urls.get(key)
+            if failed:
+                expires_at, reason = failed
+                if now < expires_at:
+                    raise HostUnavailableError(f"URL failed recently ({reason}): {url}")
+                del self.failed_urls[key]
+
+            breaker = self._breaker(host)
+            if not breaker.allow():
+                raise HostUnavailableError(
+                    f"Circuit open for {host} ({breaker.last_error}); skipping {url}"
+                )
+            return breaker.state == HALF_OPEN
+
+    def record_response(self, url: str, status_code: int, remember_url: bool = True):
+        """
+        Record the outcome of a request that produced a response
+
+        Args:
+            url (str): Request URL
+            status_code (int): HTTP status code
+            remember_url (bool): Add a failed URL to the negative cache; callers that will
+                retry pass False so their own retries are not refused (default: True)
+        """
+        if remember_url and status_code in URL_FAILURE_STATUSES:
+            self._record_url_failure(url, f"HTTP {status_code}")
+        host = (urlparse(url).hostname or '').lower()
+        with self.lock:
+            breaker = self._breaker(host)
+            if status_code in HOST_FAILURE_STATUSES:
+                breaker.record_failure(f"HTTP {status_code}")
+            elif status_code in THROTTLE_STATUSES:
+                breaker.record_throttle(f"HTTP {status_code}")
+            else:
+                breaker.record_success()
+
+    def record_error(self, url: str, error: Exception, remember_url: bool = True):
+        """
+        Record a request that failed without a response (timeout, connection error, ...)
+
+        Args:
+            url (str): Request URL
+            error (Exception): The raised exception
+            remember_url (bool): Add the URL to the negative cache (default: True)
+        """
+        reason = type(error).__name__
+        if remember_url:
+            self._record_url_failure(url, reason)
+        host = (urlparse(url).hostname or '').lower()
+        with self.lock:
+            self._breaker(host).record_failure(reason)
+
+    def release(self, url: str):
+        """
+        Free the host's half-open probe slot after the probe request ended without a recorded
+        outcome, e.g. because of an unexpected exception
+
+        Args:
+            url (str): Request URL
+        """
+        host = (urlparse(url).hostname or '').lower()
+        with self.lock:
+            breaker = self.breakers.get(host)
+            if breaker is not None:
+                breaker.release_probe()
+
+    def _record_url_failure(self, url: str, reason: str):
+        """Add a URL to the negative cache"""
+        with self.lock:
+            self.failed_urls[canonicalize_url(url)] = (time.monotonic() + self.negative_ttl, reason)
+            # Keep the negative cache bounded by dropping expired entries when it grows
+            if len(self.failed_urls) > 10000:
+                now = time.monotonic()
+                self.failed_urls = {k: v for k, v in self.failed_urls.items() if v[0] > now}
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Get a snapshot of unhealthy hosts and the negative cache size
+
+        Returns:
+            Dict[str, Any]: Non-closed circuits by host and the number of refused URLs
+        """
+        now = time.monotonic()
+        with self.lock:
+            return {
+                'unhealthy_hosts': {
+                    host: {'state': b.state, 'failures': b.failures, 'last_error': b.last_error}
+                    for host, b in self.breakers.items() if b.state != CLOSED
+                },
+                'failed_urls': sum(1 for expires_at, _ in self.failed_urls.values() if expires_at > now)
+            }
+
+
+_shared_registry: Optional[HostHealthRegistry] = None
+_shared_registry_lock = threading.Lock()
+
+
+def get_host_health() -> HostHealthRegistry:
+    """
+    Get the process-wide shared HostHealthRegistry, creating it on first use
+
+    Returns:
+        HostHealthRegistry: The shared registry
+    """
+    global _shared_registry
+    if _shared_registry is None:
+        with _shared_registry_lock:
+            if _shared_registry is None:
+                _shared_registry = HostHealthRegistry()
+    return _shared_registry
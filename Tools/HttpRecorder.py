@@ -0,0 +1,311 @@
+"""
+HTTP Recorder Module
+This module records HTTP request/response pairs into a compact SQLite archive and replays
+them later, so full pipeline runs can be repeated offline against frozen inputs. The mode
+is chosen with DEEPRESEARCH_HTTP_MODE ("live", "record" or "replay") and the archive path
+with DEEPRESEARCH_HTTP_ARCHIVE.
+"""
+
+import os
+import json
+import sqlite3
+import hashlib
+import threading
+import time
+import zlib
+from datetime import timedelta
+from typing import Any, Dict, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+
+LIVE = "live"        # Requests go to the network and nothing is stored
+RECORD = "record"    # Requests go to the network and every exchange is archived
+REPLAY = "replay"    # Requests are answered from the archive only
+MODES = (LIVE, RECORD, REPLAY)
+
+DEFAULT_ARCHIVE_PATH = os.path.join("Workspaces", "recordings", "http_archive.sqlite")
+DEFAULT_MAX_BODY_BYTES = 8 * 1024 * 1024   # Bodies larger than this are truncated when recording
+READ_CHUNK_SIZE = 64 * 1024
+
+# Latency settings for replay
+LATENCY_ORIGINAL = "original"   # Sleep for the recorded round-trip time
+LATENCY_NONE = "none"           # Answer immediately
+
+# Headers that describe the wire encoding, which no longer applies to the stored decoded body
+WIRE_HEADERS = {'content-encoding', 'transfer-encoding', 'content-length'}
+
+# Added to archived responses whose body was cut off at max_body_bytes
+TRUNCATED_HEADER = 'X-Recorder-Truncated'
+
+
+class ReplayMissError(requests.exceptions.RequestException):
+    """Raised in replay mode when the archive has no response for a request"""
+
+
+class HttpRecorder:
+    """
+    Records and replays HTTP exchanges keyed by method and full URL
+    """
+
+    def __init__(self, mode: str = RECORD, archive_path: str = DEFAULT_ARCHIVE_PATH,
+                 latency: str = LATENCY_ORIGINAL, latency_scale: float = 1.0,
+                 max_body_bytes: int = DEFAULT_MAX_BODY_BYTES):
+        """
+        Initialize the HttpRecorder
+
+        Args:
+            mode (str): "record" or "replay" (default: "record")
+            archive_path (str): SQLite archive file (default: Workspaces/recordings/http_archive.sqlite)
+            latency (str): Replay latency - "original", "none" or a fixed number of seconds (default: "original")
+            latency_scale (float): Multiplier applied to replayed latencies (default: 1.0)
+            max_body_bytes (int): Largest body stored per response when recording (default: 8 MB)
+        """
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"HttpRecorder mode must be '{RECORD}' or '{REPLAY}'")
+        if latency not in (LATENCY_ORIGINAL, LATENCY_NONE):
+            float(latency)  # Raises ValueError for anything that is not a number of seconds
+
+        self.mode = mode
+        self.archive_path = archive_path
+        self.latency = latency
+        self.latency_scale = latency_scale
+        self.max_body_bytes = max_body_bytes
+        self.lock = threading.Lock()
+        self.stats = {'recorded': 0, 'replayed': 0, 'misses': 0}
+
+        os.makedirs(os.path.dirname(archive_path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(archive_path, timeout=30, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS exchanges (
+                key TEXT PRIMARY KEY,
+                method TEXT NOT NULL,
+                url TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                reason TEXT,
+                final_url TEXT,
+                headers TEXT,
+                body BLOB,
+                elapsed REAL NOT NULL,
+                error TEXT,
+                recorded_at REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_exchanges_url ON exchanges(url)")
+
+    @staticmethod
+    def make_key(method: str, url: str) -> str:
+        """
+        Build the archive key for a request
+
+        Args:
+            method (str): HTTP method
+            url (str): Full request URL including the query string
+
+        Returns:
+            str: Hex digest identifying the request
+        """
+        return hashlib.sha256(f"{method.upper()} {url}".encode('utf-8')).hexdigest()
+
+    def request(self, session: requests.Session, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Send a request through the session (record) or answer it from the archive (replay)
+
+        Args:
+            session (requests.Session): Session used for live requests
+            method (str): HTTP method
+            url (str): Request URL
+            **kwargs: Extra arguments passed to requests (params, headers, timeout, stream, ...)
+
+        Returns:
+            requests.Response: A fully read response built from the archived exchange
+
+        Raises:
+            ReplayMissError: In replay mode, if the request was never recorded
+        """
+        full_url = requests.Request(method, url, params=kwargs.get('params')).prepare().url
+        key = self.make_key(method, full_url)
+        if self.mode == REPLAY:
+            return self._replay(key, method, full_url)
+        return self._record(session, key, method, full_url, url, **kwargs)
+
+    def _record(self, session: requests.Session, key: str, method: str, full_url: str,
+                url: str, **kwargs) -> requests.Response:
+        """
+        Send a live request, archive the exchange and return it as a replayed response
+
+        The body is read in full (up to max_body_bytes) even for streamed requests, so callers
+        see exactly what a later replay will hand them. A body cut off at the limit is marked
+        with the TRUNCATED_HEADER header, live and on replay.
+        """
+        kwargs['stream'] = True
+        started = time.monotonic()
+        try:
+            response = session.request(method, url, **kwargs)
+            truncated = False
+            try:
+                body = bytearray()
+                for chunk in response.iter_content(chunk_size=READ_CHUNK_SIZE):
+                    body.extend(chunk)
+                    if len(body) > self.max_body_bytes:
+                        del body[self.max_body_bytes:]
+                        truncated = True
+                        break
+            finally:
+                response.close()
+        except requests.exceptions.RequestException as e:
+            self._store(key, method, full_url, {
+                'status': 0, 'elapsed': time.monotonic() - started,
+                'error': json.dumps({'type': type(e).__name__, 'message': str(e)})
+            })
+            raise
+
+        headers = {name: value for name, value in response.headers.items() if name.lower() not in WIRE_HEADERS}
+        headers['Content-Length'] = str(len(body))
+        if truncated:
+            headers[TRUNCATED_HEADER] = '1'
+        exchange = {
+            'status': response.status_code,
+            'reason': response.reason,
+            'final_url': response.url,
+            'headers': headers,
+            'body': bytes(body),
+            'elapsed': time.monotonic() - started
+        }
+        # A 304 only makes sense next to the cached copy it validated; keep the full response instead
+        if response.status_code != 304 or not self._has_full_response(key):
+            self._store(key, method, full_url, exchange)
+        return self._build_response(method, full_url, exchange)
+
+    def _has_full_response(self, key: str) -> bool:
+        """Whether the archive already holds a non-304 response for a key"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT 1 FROM exchanges WHERE key = ? AND status NOT IN (0, 304)", (key,)
+            ).fetchone()
+        return row is not None
+
+    def _store(self, key: str, method: str, full_url: str, exchange: Dict[str, Any]):
+        """Write one exchange to the archive, replacing any earlier recording"""
+        body = exchange.get('body')
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO exchanges "
+                "(key, method, url, status, reason, final_url, headers, body, elapsed, error, recorded_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, method.upper(), full_url, exchange['status'], exchange.get('reason'),
+                 exchange.get('final_url'), json.dumps(exchange.get('headers') or {}),
+                 zlib.compress(body) if body is not None else None,
+                 exchange['elapsed'], exchange.get('error'), time.time())
+            )
+            self.stats['recorded'] += 1
+
+    def _replay(self, key: str, method: str, full_url: str) -> requests.Response:
+        """Answer a request from the archive, simulating the configured latency"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT status, reason, final_url, headers, body, elapsed, error FROM exchanges WHERE key = ?",
+                (key,)
+            ).fetchone()
+            self.stats['replayed' if row else 'misses'] += 1
+        if row is None:
+            raise ReplayMissError(f"No recorded response for {method.upper()} {full_url}")
+
+        status, reason, final_url, headers, body, elapsed, error = row
+        delay = self._replay_delay(elapsed)
+        if delay > 0:
+            time.sleep(delay)
+
+        if error:
+            # Re-raise recorded network failures with their original exception type
+            details = json.loads(error)
+            error_class = getattr(requests.exceptions, details['type'], requests.exceptions.ConnectionError)
+            if not (isinstance(error_class, type) and issubclass(error_class, requests.exceptions.RequestException)):
+                error_class = requests.exceptions.ConnectionError
+            raise error_class(details['message'])
+
+        return self._build_response(method, full_url, {
+            'status': status,
+            'reason': reason,
+            'final_url': final_url,
+            'headers': json.loads(headers or '{}'),
+            'body': zlib.decompress(body) if body is not None else b'',
+            'elapsed': elapsed
+        })
+
+    def _replay_delay(self, elapsed: float) -> float:
+        """Seconds to wait before answering a replayed request"""
+        if self.latency == LATENCY_NONE:
+            return 0.0
+        if self.latency == LATENCY_ORIGINAL:
+            return elapsed * self.latency_scale
+        return float(self.latency) * self.latency_scale
+
+    @staticmethod
+    def _build_response(method: str, full_url: str, exchange: Dict[str, Any]) -> requests.Response:
+        """Build an already-consumed requests.Response from an archived exchange"""
+        response = requests.Response()
+        response.status_code = exchange['status']
+        response.reason = exchange.get('reason') or ''
+        response.url = exchange.get('final_url') or full_url
+        response.headers = CaseInsensitiveDict(exchange.get('headers') or {})
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.elapsed = timedelta(seconds=exchange.get('elapsed') or 0.0)
+        response.request = requests.Request(method, full_url).prepare()
+        response._content = exchange.get('body') or b''
+        response._content_consumed = True
+        return response
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get recorder counters and the archive size
+
+        Returns:
+            Dict[str, Any]: Mode, recorded/replayed/miss counters and the number of archived exchanges
+        """
+        with self.lock:
+            stats = dict(self.stats)
+            stats['archived'] = self.conn.execute("SELECT COUNT(*) FROM exchanges").fetchone()[0]
+        stats['mode'] = self.mode
+        return stats
+
+    def close(self):
+        """Close the archive"""
+        with self.lock:
+            self.conn.close()
+
+
+_shared_recorder: Optional[HttpRecorder] = None
+_shared_recorder_lock = threading.Lock()
+
+
+def get_http_recorder() -> Optional[HttpRecorder]:
+    """
+    Get the process-wide shared HttpRecorder configured from the environment
+
+    DEEPRESEARCH_HTTP_MODE selects "live" (default), "record" or "replay";
+    DEEPRESEARCH_HTTP_ARCHIVE sets the archive path; DEEPRESEARCH_HTTP_LATENCY
+    ("original", "none" or seconds) and DEEPRESEARCH_HTTP_LATENCY_SCALE shape replay timing.
+
+    Returns:
+        Optional[HttpRecorder]: The shared recorder, or None in live mode
+    """
+    global _shared_recorder
+    mode = os.getenv('DEEPRESEARCH_HTTP_MODE', LIVE).strip().lower() or LIVE
+    if mode not in MODES:
+        raise ValueError(f"DEEPRESEARCH_HTTP_MODE must be one of {MODES}, got '{mode}'")
+    if mode == LIVE:
+        return None
+    if _shared_recorder is None:
+        with _shared_recorder_lock:
+            if _shared_recorder is None:
+                _shared_recorder = HttpRecorder(
+                    mode=mode,
+                    archive_path=os.getenv('DEEPRESEARCH_HTTP_ARCHIVE', DEFAULT_ARCHIVE_PATH),
+                    latency=os.getenv('DEEPRESEARCH_HTTP_LATENCY', LATENCY_ORIGINAL).strip().lower(),
+                    latency_scale=float(os.getenv('DEEPRESEARCH_HTTP_LATENCY_SCALE', '1.0'))
+                )
+    return _shared_recorder
@@ -0,0 +1,211 @@
+"""
+HTTP Session Module
+This module provides the shared, pooled HTTP transport used by every fetcher in Tools.
+Reusing one session keeps TCP/TLS connections alive across searches and page downloads.
+"""
+
+import sys
+import os
+import threading
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Add the Tools directory to the path
+sys.path.append(os.path.dirname(__file__))
+
+from RateLimiter import HostRateLimiter, get_rate_limiter
+from HostHealth import HostHealthRegistry, get_host_health
+from HttpRecorder import HttpRecorder, get_http_recorder
+
+
+DEFAULT_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+# Default transport settings
+DEFAULT_POOL_CONNECTIONS = 32   # Number of per-host pools kept alive
+DEFAULT_POOL_MAXSIZE = 16       # Connections kept alive per host
+DEFAULT_MAX_RETRIES = 2         # Transport-level retries of 429/5xx responses for idempotent requests
+DEFAULT_BACKOFF_FACTOR = 0.5    # Exponential backoff between transport retries
+DEFAULT_TIMEOUT = 30            # Request timeout in seconds
+
+
+class HttpClient:
+    """
+    A thread-safe HTTP client backed by a single requests Session with
+    keep-alive connection pools per host
+    """
+
+    def __init__(self,
+                 pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+                 pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+                 max_retries: int = DEFAULT_MAX_RETRIES,
+                 backoff_factor: float = DEFAULT_BACKOFF_FACTOR,
+                 timeout: float = DEFAULT_TIMEOUT,
+                 headers: Optional[Dict[str, str]] = None,
+                 rate_limiter: Optional[HostRateLimiter] = None,
+                 host_health: Optional[HostHealthRegistry] = None,
+                 recorder: Optional[HttpRecorder] = None):
+        """
+        Initialize the HttpClient
+
+        Args:
+            pool_connections (int): Number of host pools to cache (default: 32)
+            pool_maxsize (int): Maximum keep-alive connections per host (default: 16)
+            max_retries (int): Retries on 429/5xx responses (default: 2). Connection errors and
+                timeouts are not retried here; they surface to the caller's own retry loop
+            backoff_factor (float): Backoff factor between retries (default: 0.5)
+            timeout (float): Default request timeout in seconds (default: 30)
+            headers (Optional[Dict[str, str]]): Default headers sent with every request
+            rate_limiter (Optional[HostRateLimiter]): Per-host limiter (default: the shared limiter)
+            host_health (Optional[HostHealthRegistry]): Circuit breakers and negative cache
+                (default: the shared registry)
+            recorder (Optional[HttpRecorder]): Record/replay archive (default: the shared recorder
+                configured by DEEPRESEARCH_HTTP_MODE, or none in live mode)
+        """
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.host_health = host_health or get_host_health()
+        self.recorder = recorder or get_http_recorder()
+
+        # Only status codes are retried: retrying connect/read timeouts here would multiply the
+        # request timeout under the caller's retries, and a server-chosen Retry-After could stall
+        # a worker for minutes. False (rather than 0) re-raises connect/read errors unwrapped, so
+        # requests still reports them as ConnectTimeout/ReadTimeout
+        retry = Retry(
+            total=max_retries,
+            connect=False,
+            read=False,
+            status=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            respect_retry_after_header=False,
+            raise_on_status=False  # Let callers decide via raise_for_status()
+        )
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=retry,
+            pool_block=False
+        )
+
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update(headers or {'User-Agent': DEFAULT_USER_AGENT})
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Send a request through the shared connection pools, waiting only
+        when the target host has used up its rate budget and failing fast
+        when the host circuit is open or the URL failed recently
+
+        Args:
+            method (str): HTTP method
+            url (str): Request URL
+            **kwargs: Extra arguments passed to requests (params, headers, timeout, ...), plus
+                remember_failure (bool, default True): put the URL in the negative cache if the
+                request fails; pass False for attempts the caller will retry
+
+        Returns:
+            requests.Response: The HTTP response
+        
+        Raises:
+            HostUnavailableError: If the host circuit is open or the URL is in the negative cache
+        """
+        remember_failure = kwargs.pop('remember_failure', True)
+        kwargs.setdefault('timeout', self.timeout)
+        
+        # Health is tracked per full URL, so query parameters passed separately must be included
+        full_url = url
+        if kwargs.get('params'):
+            full_url = requests.Request(method, url, params=kwargs['params']).prepare().url
+        
+        probe = self.host_health.check(full_url)
+        recorded = False
+        try:
+            self.rate_limiter.acquire(url)
+            try:
+                if self.recorder is not None:
+                    response = self.recorder.request(self.session, method, url, **kwargs)
+                else:
+                    response = self.session.request(method, url, **kwargs)
+            except requests.exceptions.RequestException as e:
+                self.host_health.record_error(full_url, e, remember_url=remember_failure)
+                recorded = True
+                raise
+            self.host_health.record_response(full_url, response.status_code, remember_url=remember_failure)
+            recorded = True
+        finally:
+            if probe and not recorded:
+                # Any other exception must not leave a half-open circuit waiting on its probe forever
+                self.host_health.release(full_url)
+        return response
+
+    def record_error(self, url: str, error: Exception, remember_failure: bool = True):
+        """
+        Report a failure that happened after request() returned, e.g. a timeout or a broken
+        chunked transfer while a streamed body was being read
+
+        Args:
+            url (str): Request URL
+            error (Exception): The raised exception
+            remember_failure (bool): Put the URL in the negative cache (default: True)
+        """
+        self.host_health.record_error(url, error, remember_url=remember_failure)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """Send a GET request"""
+        return self.request('GET', url, **kwargs)
+
+    def head(self, url: str, **kwargs) -> requests.Response:
+        """Send a HEAD request"""
+        return self.request('HEAD', url, **kwargs)
+
+    def close(self):
+        """Close all pooled connections"""
+        self.session.close()
+
+
+_shared_client: Optional[HttpClient] = None
+_shared_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """
+    Get the process-wide shared HttpClient, creating it on first use
+
+    Returns:
+        HttpClient: The shared client
+    """
+    global _shared_client
+    if _shared_client is None:
+        with _shared_client_lock:
+            if _shared_client is None:
+                _shared_client = HttpClient()
+    return _shared_client
+
+
+def configure_http_client(**settings) -> HttpClient:
+    """
+    Replace the shared HttpClient with one built from the given settings
+
+    Args:
+        **settings: Keyword arguments accepted by HttpClient
+
+    Returns:
+        HttpClient: The newly configured shared client
+    """
+    global _shared_client
+    with _shared_client_lock:
+        previous = _shared_client
+        _shared_client = HttpClient(**settings)
+    if previous is not None:
+        previous.close()
+    return _shared_client
@@ -0,0 +1,250 @@
+"""
+Notes Index Module
+This module keeps an incremental SQLite FTS5 full-text index over saved research notes and
+extracted search results. Documents are split into passages of a few hundred words, so a
+query returns the top-k BM25-ranked passages with their sources instead of whole files.
+"""
+
+import os
+import re
+import hashlib
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+
+DEFAULT_INDEX_PATH = os.path.join("Workspaces", "notes_index.sqlite")
+DEFAULT_PASSAGE_WORDS = 150
+NOTE = "note"
+SEARCH = "search"
+KINDS = (NOTE, SEARCH)
+
+# Relative BM25 weights of the indexed columns (title, content)
+TITLE_WEIGHT = 2.0
+CONTENT_WEIGHT = 1.0
+
+
+def split_passages(text: str, max_words: int = DEFAULT_PASSAGE_WORDS) -> List[str]:
+    """
+    Split text into passages of at most max_words words, keeping paragraphs together where possible
+
+    Args:
+        text (str): Text to split
+        max_words (int): Maximum words per passage (default: 150)
+
+    Returns:
+        List[str]: Non-empty passages in document order
+    """
+    passages = []
+    current: List[str] = []
+    for paragraph in re.split(r'\n\s*\n', text):
+        words = paragraph.split()
+        if not words:
+            continue
+        if current and len(current) + len(words) > max_words:
+            passages.append(" ".join(current))
+            current = []
+        # Paragraphs longer than a passage are cut into max_words slices
+        while len(words) > max_words:
+            passages.append(" ".join(words[:max_words]))
+            words = words[max_words:]
+        current.extend(words)
+    if current:
+        passages.append(" ".join(current))
+    return passages
+
+
+def _match_expression(query: str) -> str:
+    """Turn free text into an FTS5 query that matches any of its terms"""
+    terms = re.findall(r'\w+', query.lower())
+    return " OR ".join(f'"{term}"' for term in dict.fromkeys(terms))
+
+
+class NotesIndex:
+    """
+    BM25 passage index over research notes and search results
+    """
+
+    def __init__(self, db_path: str = DEFAULT_INDEX_PATH, passage_words: int = DEFAULT_PASSAGE_WORDS):
+        """
+        Initialize the NotesIndex
+
+        Args:
+            db_path (str): SQLite database file (default: Workspaces/notes_index.sqlite)
+            passage_words (int): Maximum words per indexed passage (default: 150)
+        """
+        self.db_path = db_path
+        self.passage_words = passage_words
+        self.lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS documents (
+                doc_key TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                indexed_at TEXT NOT NULL
+            )
+        """)
+        self.conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS passages USING fts5(
+                title, content,
+                kind UNINDEXED, source UNINDEXED, url UNINDEXED, task_id UNINDEXED, doc_key UNINDEXED,
+                tokenize = 'porter unicode61'
+            )
+        """)
+
+    def _add_document(self, doc_key: str, kind: str, title: str, text: str,
+                      source: str = '', url: str = '', task_id: Optional[str] = None) -> int:
+        """Index one document unless it is already indexed; returns the number of passages added"""
+        passages = split_passages(text, self.passage_words)
+        if not passages:
+            return 0
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = self.conn.execute(
+                    "INSERT OR IGNORE INTO documents (doc_key, kind, indexed_at) VALUES (?, ?, ?)",
+                    (doc_key, kind, datetime.now().isoformat())
+                )
+                if cursor.rowcount == 0:
+                    self.conn.execute("COMMIT")
+                    return 0
+                self.conn.executemany(
+                    "INSERT INTO passages (title, content, kind, source, url, task_id, doc_key) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(title, passage, kind, source, url, task_id or '', doc_key) for passage in passages]
+                )
+                self.conn.execute("COMMIT")
+            except sqlite3.Error:
+                self.conn.execute("ROLLBACK")
+                raise
+        return len(passages)
+
+    def add_note(self, task_id: Optional[str], section_title: str, content: str,
+                 sha256: Optional[str] = None, source: str = '') -> int:
+        """
+        Index a saved research note section
+
+        Args:
+            task_id (Optional[str]): Task the note belongs to
+            section_title (str): Section title
+            content (str): Section body
+            sha256 (Optional[str]): Section hash from the notes store (computed if omitted)
+            source (str): Where the note is stored, e.g. its shard path
+
+        Returns:
+            int: Number of passages added (0 if the section was already indexed)
+        """
+        digest = sha256 or hashlib.sha256(f"{section_title.strip()}\n{content.strip()}".encode('utf-8')).hexdigest()
+        return self._add_document(f"{NOTE}:{digest}", NOTE, section_title.strip(), content,
+                                  source=source, task_id=task_id)
+
+    def add_search_results(self, query: str, results: Dict[str, Any]) -> int:
+        """
+        Index the extracted pages of a search_and_extract result
+
+        Args:
+            query (str): The search query
+            results (Dict[str, Any]): Result of search_and_extract for the query
+
+        Returns:
+            int: Number of passages added
+        """
+        added = 0
+        for page in results.get('extracted_contents', []) or []:
+            content = page.get('content') or ''
+            url = page.get('source_url', '')
+            if not content:
+                continue
+            digest = hashlib.sha256(f"{url}\n{content}".encode('utf-8')).hexdigest()
+            added += self._add_document(f"{SEARCH}:{digest}", SEARCH, page.get('title') or url, content,
+                                        source=f"web_search: {query}", url=url)
+        return added
+
+    def search(self, query: str, k: int = 5, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Find the passages that best match a query
+
+        Args:
+            query (str): Free-text query
+            k (int): Number of passages to return (default: 5)
+            kind (Optional[str]): Restrict to "note" or "search" passages
+
+        Returns:
+            List[Dict[str, Any]]: Passages with 'title', 'content', 'kind', 'source', 'url',
+                'task_id' and 'score' (higher is better), best first
+        """
+        if kind is not None and kind not in KINDS:
+            raise ValueError(f"kind must be one of {KINDS}, got '{kind}'")
+        expression = _match_expression(query)
+        if not expression:
+            return []
+
+        sql = (f"SELECT title, content, kind, source, url, task_id, bm25(passages, {TITLE_WEIGHT}, {CONTENT_WEIGHT}) AS rank "
+               "FROM passages WHERE passages MATCH ?")
+        params: List[Any] = [expression]
+        if kind is not None:
+            sql += " AND kind = ?"
+            params.append(kind)
+        sql += " ORDER BY rank LIMIT ?"
+        params.append(max(1, int(k)))
+
+        with self.lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        return [{
+            'title': title,
+            'content': content,
+            'kind': row_kind,
+            'source': source,
+            'url': url,
+            'task_id': task_id or None,
+            'score': round(-rank, 4)   # FTS5 bm25() is lower-is-better
+        } for title, content, row_kind, source, url, task_id, rank in rows]
+
+    def clear(self, kind: Optional[str] = None):
+        """
+        Remove indexed passages
+
+        Args:
+            kind (Optional[str]): Only remove "note" or "search" passages (default: everything)
+        """
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                if kind is None:
+                    self.conn.execute("DELETE FROM passages")
+                    self.conn.execute("DELETE FROM documents")
+                else:
+                    self.conn.execute("DELETE FROM passages WHERE kind = ?", (kind,))
+                    self.conn.execute("DELETE FROM documents WHERE kind = ?", (kind,))
+                self.conn.execute("COMMIT")
+            except sqlite3.Error:
+                self.conn.execute("ROLLBACK")
+                raise
+
+
+_shared_indexes: Dict[str, NotesIndex] = {}
+_shared_indexes_lock = threading.Lock()
+
+
+def get_notes_index(db_path: Optional[str] = None) -> NotesIndex:
+    """
+    Get the process-wide shared NotesIndex for a database file, creating it on first use
+
+    Args:
+        db_path (Optional[str]): SQLite database file (default: Workspaces/notes_index.sqlite)
+
+    Returns:
+        NotesIndex: The shared index
+    """
+    db_path = db_path or DEFAULT_INDEX_PATH
+    key = os.path.abspath(db_path)
+    with _shared_indexes_lock:
+        index = _shared_indexes.get(key)
+        if index is None:
+            index = NotesIndex(db_path)
+            _shared_indexes[key] = index
+        return index
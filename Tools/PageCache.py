@@ -0,0 +1,286 @@
+"""
+Page Cache Module
+This module provides a persistent, content-addressed on-disk cache for downloaded web pages.
+Bodies are stored once per unique content hash; a SQLite index maps canonical URLs to bodies
+along with their ETag/Last-Modified validators so stale entries can be revalidated cheaply.
+"""
+
+import sys
+import os
+import sqlite3
+import hashlib
+import tempfile
+import threading
+import time
+from typing import Optional, Dict, Any, Mapping
+
+# Add the Tools directory to the path
+sys.path.append(os.path.dirname(__file__))
+
+from UrlCanonicalizer import canonicalize_url
+
+
+DEFAULT_CACHE_DIR = os.path.join("Workspaces", "cache", "pages")
+DEFAULT_TTL = 24 * 60 * 60                # Seconds an entry is served without revalidation
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024     # Total body size before LRU eviction kicks in
+ACCESS_UPDATE_INTERVAL = 60               # Seconds before a read refreshes an entry's access time again
+SIZE_RESYNC_STORES = 256                  # Stores between recounts of the total from the index
+
+# Each body file counts once, however many URLs share it
+TOTAL_SIZE_SQL = "SELECT COALESCE(SUM(size), 0) FROM (SELECT MAX(size) AS size FROM pages GROUP BY body_hash)"
+
+
+class PageCache:
+    """
+    A thread- and process-safe on-disk page cache with TTL, conditional
+    revalidation support and size-bounded LRU eviction
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, ttl: float = DEFAULT_TTL,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Initialize the PageCache
+
+        Args:
+            cache_dir (str): Directory holding the index and bodies (default: Workspaces/cache/pages)
+            ttl (float): Seconds an entry stays fresh (default: 24 hours)
+            max_bytes (int): Total body size allowed before evicting least recently used entries (default: 512 MB)
+        """
+        self.cache_dir = cache_dir
+        self.bodies_dir = os.path.join(cache_dir, "bodies")
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+
+        os.makedirs(self.bodies_dir, exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(cache_dir, "index.sqlite"),
+                                    timeout=30, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                body_hash TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                content_type TEXT,
+                encoding TEXT,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_accessed ON pages(accessed_at)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_body ON pages(body_hash)")
+
+        # Running body total, so stores don't sum the index; recounted every SIZE_RESYNC_STORES
+        # stores to pick up writes from other processes
+        self.total_bytes = self.conn.execute(TOTAL_SIZE_SQL).fetchone()[0]
+        self.stores_since_resync = 0
+
+    def _body_path(self, body_hash: str) -> str:
+        """Path of the file holding a body with the given hash"""
+        return os.path.join(self.bodies_dir, body_hash[:2], body_hash)
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached page
+
+        Args:
+            url (str): Page URL
+
+        Returns:
+            Optional[Dict[str, Any]]: Entry with 'body', validators, 'encoding' and a 'fresh' flag,
+            or None on a miss
+        """
+        key = canonicalize_url(url)
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT body_hash, etag, last_modified, content_type, encoding, fetched_at, accessed_at "
+                "FROM pages WHERE url = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            # LRU order only needs minute precision; skipping the write keeps hot reads read-only
+            now = time.time()
+            if now - row[6] >= ACCESS_UPDATE_INTERVAL:
+                self.conn.execute("UPDATE pages SET accessed_at = ? WHERE url = ?", (now, key))
+
+        body_hash, etag, last_modified, content_type, encoding, fetched_at, _ = row
+        try:
+            with open(self._body_path(body_hash), 'rb') as f:
+                body = f.read()
+        except OSError:
+            # Body was evicted by another process between the lookup and the read
+            return None
+
+        return {
+            'url': key,
+            'body': body,
+            'etag': etag,
+            'last_modified': last_modified,
+            'content_type': content_type,
+            'encoding': encoding,
+            'fetched_at': fetched_at,
+            'fresh': time.time() - fetched_at < self.ttl
+        }
+
+    def conditional_headers(self, entry: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Build If-None-Match/If-Modified-Since headers for revalidating an entry
+
+        Args:
+            entry (Dict[str, Any]): Entry returned by get()
+
+        Returns:
+            Dict[str, str]: Conditional request headers (empty if the entry has no validators)
+        """
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def store(self, url: str, body: bytes, headers: Mapping[str, str], encoding: Optional[str] = None):
+        """
+        Store a downloaded page
+
+        Args:
+            url (str): Page URL
+            body (bytes): Raw response body
+            headers (Mapping[str, str]): Response headers (ETag, Last-Modified, Content-Type are kept)
+            encoding (Optional[str]): Character encoding used to decode the body
+        """
+        body_hash = hashlib.sha256(body).hexdigest()
+        path = self._body_path(body_hash)
+
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temp file and rename so readers never see a partial body
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(body)
+                os.replace(tmp_path, path)
+            except OSError:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+        key = canonicalize_url(url)
+        now = time.time()
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                previous = self.conn.execute(
+                    "SELECT body_hash, size FROM pages WHERE url = ?", (key,)).fetchone()
+                body_is_new = not self.conn.execute(
+                    "SELECT 1 FROM pages WHERE body_hash = ? LIMIT 1", (body_hash,)).fetchone()
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO pages "
+                    "(url, body_hash, size, etag, last_modified, content_type, encoding, fetched_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, body_hash, len(body), headers.get('ETag'),
+                     headers.get('Last-Modified'), headers.get('Content-Type'), encoding, now, now)
+                )
+                previous_released = (
+                    previous is not None and previous[0] != body_hash and not self.conn.execute(
+                        "SELECT 1 FROM pages WHERE body_hash = ? LIMIT 1", (previous[0],)).fetchone()
+                )
+                self.conn.execute("COMMIT")
+            except sqlite3.Error:
+                self.conn.execute("ROLLBACK")
+                raise
+
+            if body_is_new:
+                self.total_bytes += len(body)
+            if previous_released:
+                self.total_bytes -= previous[1]
+            self.stores_since_resync += 1
+            if self.stores_since_resync >= SIZE_RESYNC_STORES:
+                self.total_bytes = self.conn.execute(TOTAL_SIZE_SQL).fetchone()[0]
+                self.stores_since_resync = 0
+            over_limit = self.total_bytes > self.max_bytes
+        if over_limit:
+            self._evict_if_needed()
+
+    def refresh(self, url: str, headers: Mapping[str, str]):
+        """
+        Mark an entry fresh again after a 304 Not Modified response
+
+        Args:
+            url (str): Page URL
+            headers (Mapping[str, str]): Headers of the 304 response (may carry updated validators)
+        """
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "UPDATE pages SET fetched_at = ?, accessed_at = ?, "
+                "etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified) WHERE url = ?",
+                (now, now, headers.get('ETag'), headers.get('Last-Modified'), canonicalize_url(url))
+            )
+
+    def _evict_if_needed(self):
+        """Evict least recently used entries until the cache is back under 90% of max_bytes"""
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Recount exactly before deleting anything; the running total is only an estimate
+                total = self.conn.execute(TOTAL_SIZE_SQL).fetchone()[0]
+                target = int(self.max_bytes * 0.9)
+                orphaned = []
+                if total > self.max_bytes:
+                    for url, body_hash, size in self.conn.execute(
+                            "SELECT url, body_hash, size FROM pages ORDER BY accessed_at ASC").fetchall():
+                        if total <= target:
+                            break
+                        self.conn.execute("DELETE FROM pages WHERE url = ?", (url,))
+                        still_used = self.conn.execute(
+                            "SELECT 1 FROM pages WHERE body_hash = ? LIMIT 1", (body_hash,)).fetchone()
+                        if not still_used:
+                            # Only the last URL using a body frees its bytes
+                            total -= size
+                            orphaned.append(body_hash)
+                self.conn.execute("COMMIT")
+            except sqlite3.Error:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.total_bytes = total
+            self.stores_since_resync = 0
+
+        for body_hash in orphaned:
+            try:
+                os.remove(self._body_path(body_hash))
+            except OSError:
+                pass
+
+    def clear(self):
+        """Remove every cached page"""
+        with self.lock:
+            hashes = [row[0] for row in self.conn.execute("SELECT DISTINCT body_hash FROM pages")]
+            self.conn.execute("DELETE FROM pages")
+            self.total_bytes = 0
+        for body_hash in hashes:
+            try:
+                os.remove(self._body_path(body_hash))
+            except OSError:
+                pass
+
+
+_shared_cache: Optional[PageCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_page_cache() -> PageCache:
+    """
+    Get the process-wide shared PageCache, creating it on first use
+
+    Returns:
+        PageCache: The shared cache
+    """
+    global _shared_cache
+    if _shared_cache is None:
+        with _shared_cache_lock:
+            if _shared_cache is None:
+                _shared_cache = PageCache()
+    return _shared_cache
@@ -0,0 +1,154 @@
+"""
+Rate Limiter Module
+This module provides a process-wide, per-host token-bucket rate limiter.
+Requests only wait when the target host has used up its budget, so fetches
+to different hosts never stall each other.
+"""
+
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+
+# Default budget for any host without an explicit limit
+DEFAULT_RATE = 1.0   # Requests per second
+DEFAULT_BURST = 3    # Requests allowed back-to-back before throttling
+
+# Built-in limits for hosts we hit on every tool call
+DEFAULT_HOST_LIMITS = {
+    'html.duckduckgo.com': (1.0, 1),
+    'api.duckduckgo.com': (1.0, 2),
+}
+
+
+class TokenBucket:
+    """
+    A thread-safe token bucket that refills at a fixed rate up to a burst size
+    """
+
+    def __init__(self, rate: float, burst: int):
+        """
+        Initialize the TokenBucket
+
+        Args:
+            rate (float): Tokens added per second
+            burst (int): Maximum number of tokens the bucket can hold
+        """
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        Take one token, borrowing against future refills if the bucket is empty
+
+        Returns:
+            float: Seconds the caller must wait before using the token
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            if self.tokens >= 0 or self.rate <= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def acquire(self):
+        """Block until a token is available"""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+
+class HostRateLimiter:
+    """
+    Keeps one token bucket per hostname with configurable rate and burst
+    """
+
+    def __init__(self, default_rate: float = DEFAULT_RATE, default_burst: int = DEFAULT_BURST,
+                 host_limits: Optional[Dict[str, Tuple[float, int]]] = None):
+        """
+        Initialize the HostRateLimiter
+
+        Args:
+            default_rate (float): Requests per second for hosts without an explicit limit (default: 1.0)
+            default_burst (int): Burst size for hosts without an explicit limit (default: 3)
+            host_limits (Optional[Dict[str, Tuple[float, int]]]): Per-host (rate, burst) overrides.
+                A key also applies to its subdomains, e.g. "wikipedia.org" covers "en.wikipedia.org".
+        """
+        self.default_rate = default_rate
+        self.default_burst = default_burst
+        self.host_limits = dict(DEFAULT_HOST_LIMITS if host_limits is None else host_limits)
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.lock = threading.Lock()
+
+    def set_host_limit(self, host: str, rate: float, burst: int):
+        """
+        Set the rate and burst for a host (and its subdomains)
+
+        Args:
+            host (str): Hostname or parent domain
+            rate (float): Requests per second
+            burst (int): Maximum back-to-back requests
+        """
+        host = host.lower()
+        with self.lock:
+            self.host_limits[host] = (rate, burst)
+            # Drop existing buckets so the new limit applies immediately
+            for name in list(self.buckets):
+                if name == host or name.endswith('.' + host):
+                    del self.buckets[name]
+
+    def _limit_for(self, host: str) -> Tuple[float, int]:
+        """Find the most specific configured limit for a host"""
+        parts = host.split('.')
+        for i in range(len(parts)):
+            candidate = '.'.join(parts[i:])
+            if candidate in self.host_limits:
+                return self.host_limits[candidate]
+        return self.default_rate, self.default_burst
+
+    def _bucket_for(self, host: str) -> TokenBucket:
+        """Get or create the bucket for a host"""
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                rate, burst = self._limit_for(host)
+                bucket = TokenBucket(rate, burst)
+                self.buckets[host] = bucket
+            return bucket
+
+    def acquire(self, url: str):
+        """
+        Wait until the host of the given URL has budget for another request
+
+        Args:
+            url (str): Request URL (or bare hostname)
+        """
+        host = (urlparse(url).hostname if '://' in url else url) or ''
+        if not host:
+            return
+        self._bucket_for(host.lower()).acquire()
+
+
+_shared_limiter: Optional[HostRateLimiter] = None
+_shared_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> HostRateLimiter:
+    """
+    Get the process-wide shared HostRateLimiter, creating it on first use
+
+    Returns:
+        HostRateLimiter: The shared limiter
+    """
+    global _shared_limiter
+    if _shared_limiter is None:
+        with _shared_limiter_lock:
+            if _shared_limiter is None:
+                _shared_limiter = HostRateLimiter()
+    return _shared_limiter
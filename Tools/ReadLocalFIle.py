@@ -1,6 +1,18 @@
 import json
 import os
-from typing import Optional, Dict, Any
+import re
+import mmap
+import threading
+from array import array
+from bisect import bisect_right
+from typing import Optional, Dict, Any, List, Tuple
+
+# Markdown ATX headings and code fences (headings inside fenced code are ignored)
+HEADING_OR_FENCE_PATTERN = re.compile(
+    rb'^(?:(?P<fence>```|~~~)[^\r\n]*|(?P<hashes>#{1,6})[ \t]+(?P<title>[^\r\n]*?)(?:[ \t]+#+)?[ \t]*)\r?$', re.M)
+
+DEFAULT_RANGE_BYTES = 16384
+DEFAULT_WINDOW_LINES = 200
 
 class ReadLocalFile:
     """
@@ -10,6 +22,10 @@ class ReadLocalFile:
     
     SUPPORTED_EXTENSIONS = {'.txt', '.json', '.md', '.markdown', '.csv'}
     
+    # Line offset and heading indexes shared by all readers, keyed by path and invalidated on change
+    _line_index_cache: Dict[str, Tuple[Tuple[int, int], array, Dict[str, Any]]] = {}
+    _line_index_lock = threading.Lock()
+    
     def __init__(self, workspace_path: str = None):
         self.name = "ReadLocalFile"
         self.description = "Read local files from workspace folder and return their content as strings"
@@ -40,6 +56,63 @@ class ReadLocalFile:
         except Exception:
             return False
     
+    def _error(self, message: str, content: Optional[str] = None, file_info: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Build the error response shared by all read methods"""
+        return {
+            'success': False,
+            'error': message,
+            'content': content,
+            'file_info': file_info
+        }
+    
+    def _resolve_file(self, file_path: str) -> Tuple[str, str, Optional[Dict[str, Any]]]:
+        """
+        Resolve a path against the workspace and check that it is a readable, supported file.
+        
+        Args:
+            file_path (str): Path relative to the workspace or absolute within it
+            
+        Returns:
+            Tuple of the absolute path, the lower-case extension and an error response (None if valid)
+        """
+        # If relative path, make it relative to workspace
+        if not os.path.isabs(file_path):
+            file_path = os.path.join(self.workspace_path, file_path)
+        
+        # Security check - ensure file is within workspace
+        if not self._is_within_workspace(file_path):
+            return file_path, '', self._error(f"Access denied: File must be within workspace directory ({self.workspace_path})")
+        
+        # Validate file exists
+        if not os.path.exists(file_path):
+            return file_path, '', self._error(f"File not found: {file_path}")
+        
+        # Check if it's a file (not directory)
+        if not os.path.isfile(file_path):
+            return file_path, '', self._error(f"Path is not a file: {file_path}")
+        
+        # Get file extension
+        file_extension = os.path.splitext(file_path)[1].lower()
+        
+        # Check if file type is supported
+        if file_extension not in self.SUPPORTED_EXTENSIONS:
+            return file_path, file_extension, self._error(
+                f"Unsupported file type: {file_extension}. Supported types: {', '.join(self.SUPPORTED_EXTENSIONS)}")
+        
+        return file_path, file_extension, None
+    
+    def _file_info(self, file_path: str, file_extension: str, encoding: str) -> Dict[str, Any]:
+        """Describe a resolved file"""
+        file_stats = os.stat(file_path)
+        return {
+            'name': os.path.basename(file_path),
+            'path': file_path,
+            'relative_path': os.path.relpath(file_path, self.workspace_path),
+            'size': file_stats.st_size,
+            'extension': file_extension,
+            'encoding': encoding
+        }
+    
     def read_file(self, file_path: str, encoding: str = 'utf-8') -> Dict[str, Any]:
         """
         Read a file from the workspace and return its content as a string.
@@ -52,72 +125,20 @@ class ReadLocalFile:
             Dict containing success status, content, file info, and any error messages
         """
         try:
-            # If relative path, make it relative to workspace
-            if not os.path.isabs(file_path):
-                file_path = os.path.join(self.workspace_path, file_path)
-            
-            # Security check - ensure file is within workspace
-            if not self._is_within_workspace(file_path):
-                return {
-                    'success': False,
-                    'error': f"Access denied: File must be within workspace directory ({self.workspace_path})",
-                    'content': None,
-                    'file_info': None
-                }
-            
-            # Validate file exists
-            if not os.path.exists(file_path):
-                return {
-                    'success': False,
-                    'error': f"File not found: {file_path}",
-                    'content': None,
-                    'file_info': None
-                }
-            
-            # Check if it's a file (not directory)
-            if not os.path.isfile(file_path):
-                return {
-                    'success': False,
-                    'error': f"Path is not a file: {file_path}",
-                    'content': None,
-                    'file_info': None
-                }
-            
-            # Get file extension
-            file_extension = os.path.splitext(file_path)[1].lower()
-            
-            # Check if file type is supported
-            if file_extension not in self.SUPPORTED_EXTENSIONS:
-                return {
-                    'success': False,
-                    'error': f"Unsupported file type: {file_extension}. Supported types: {', '.join(self.SUPPORTED_EXTENSIONS)}",
-                    'content': None,
-                    'file_info': None
-                }
+            file_path, file_extension, error = self._resolve_file(file_path)
+            if error:
+                return error
             
             # Read file content
             with open(file_path, 'r', encoding=encoding) as file:
                 content = file.read()
             
-            # Get file info
-            file_stats = os.stat(file_path)
-            relative_path = os.path.relpath(file_path, self.workspace_path)
-            file_info = {
-                'name': os.path.basename(file_path),
-                'path': file_path,
-                'relative_path': relative_path,
-                'size': file_stats.st_size,
-                'extension': file_extension,
-                'encoding': encoding
-            }
+            file_info = self._file_info(file_path, file_extension, encoding)
             
-            # Special handling for JSON files - validate and stringify
+            # Special handling for JSON files - validate, but return the text unchanged
             if file_extension == '.json':
                 try:
-                    # Parse JSON to validate it
-                    json_data = json.loads(content)
-                    # Re-stringify with proper formatting
-                    content = json.dumps(json_data, indent=2, ensure_ascii=False)
+                    json.loads(content)
                 except json.JSONDecodeError as e:
                     return {
                         'success': False,
@@ -155,6 +176,239 @@ class ReadLocalFile:
                 'file_info': None
             }
     
+    def _line_index(self, file_path: str, data) -> array:
+        """
+        Get the byte offset of the start of every line, cached until the file changes.
+        
+        Args:
+            file_path (str): Resolved file path
+            data: Mapped file contents
+            
+        Returns:
+            array: Start offset of line N at index N - 1
+        """
+        stats = os.stat(file_path)
+        key = (stats.st_mtime_ns, stats.st_size)
+        with self._line_index_lock:
+            cached = self._line_index_cache.get(file_path)
+            if cached is not None and cached[0] == key:
+                return cached[1]
+            self._line_index_cache.pop(file_path, None)
+        
+        size = len(data)
+        offsets = array('Q', [0] if size else [])
+        position = data.find(b'\n')
+        while position != -1 and position + 1 < size:
+            offsets.append(position + 1)
+            position = data.find(b'\n', position + 1)
+        
+        with self._line_index_lock:
+            self._line_index_cache[file_path] = (key, offsets, {})
+            while len(self._line_index_cache) > 64:
+                self._line_index_cache.pop(next(iter(self._line_index_cache)))
+        return offsets
+    
+    @staticmethod
+    def _align(data, position: int, encoding: str) -> int:
+        """Move a byte position forward to the next UTF-8 character boundary"""
+        if encoding.lower().replace('-', '').replace('_', '') not in ('utf8', 'utf8sig'):
+            return position
+        while position < len(data) and 0x80 <= data[position] <= 0xBF:
+            position += 1
+        return position
+    
+    def _headings(self, file_path: str, data, offsets: array, encoding: str) -> List[Tuple[int, str, int]]:
+        """Find markdown headings outside fenced code as (level, title, byte offset), cached with the line index"""
+        with self._line_index_lock:
+            cached = self._line_index_cache.get(file_path)
+            if cached is not None and cached[1] is offsets and encoding in cached[2]:
+                return cached[2][encoding]
+        
+        headings = []
+        open_fence = None
+        for match in HEADING_OR_FENCE_PATTERN.finditer(data):
+            fence = match.group('fence')
+            if fence:
+                if open_fence is None:
+                    open_fence = fence
+                elif fence == open_fence:
+                    open_fence = None
+            elif open_fence is None:
+                title = match.group('title').decode(encoding, errors='replace').strip()
+                headings.append((len(match.group('hashes')), title, match.start()))
+        
+        # Only attach to the index entry built from the same version of the file
+        with self._line_index_lock:
+            cached = self._line_index_cache.get(file_path)
+            if cached is not None and cached[1] is offsets:
+                cached[2][encoding] = headings
+        return headings
+    
+    def _read_window(self, file_path: str, encoding: str, locate) -> Dict[str, Any]:
+        """
+        Resolve and memory-map a file, then decode only the byte window chosen by locate.
+        
+        Args:
+            file_path (str): Path to the file to read
+            encoding (str): File encoding
+            locate: Function (path, data, line offsets) returning (start byte, end byte, extra fields)
+                    or an error response
+            
+        Returns:
+            Dict containing success status, content, file info, the window in 'range' and any error messages
+        """
+        try:
+            file_path, file_extension, error = self._resolve_file(file_path)
+            if error:
+                return error
+            file_info = self._file_info(file_path, file_extension, encoding)
+            
+            with open(file_path, 'rb') as file:
+                # Empty files cannot be mapped; an empty bytes object behaves the same here
+                data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if file_info['size'] else b''
+                try:
+                    located = locate(file_path, data, self._line_index(file_path, data))
+                    if isinstance(located, dict):
+                        located['file_info'] = file_info
+                        return located
+                    start, end, extra = located
+                    content = data[start:end].decode(encoding)
+                finally:
+                    if isinstance(data, mmap.mmap):
+                        data.close()
+            
+            window = {'start_byte': start, 'end_byte': end, 'total_bytes': file_info['size'],
+                      'has_more': end < file_info['size']}
+            window.update(extra)
+            return {
+                'success': True,
+                'content': content,
+                'file_info': file_info,
+                'range': window,
+                'error': None
+            }
+            
+        except UnicodeDecodeError as e:
+            return self._error(f"Encoding error: {str(e)}. Try a different encoding.")
+        except PermissionError:
+            return self._error(f"Permission denied: Cannot read file {file_path}")
+        except Exception as e:
+            return self._error(f"Unexpected error: {str(e)}")
+    
+    @staticmethod
+    def _line_of(offsets: array, position: int) -> int:
+        """1-based line number containing a byte position"""
+        return max(1, bisect_right(offsets, position))
+    
+    def read_range(self, file_path: str, offset: int = 0, length: int = DEFAULT_RANGE_BYTES,
+                   encoding: str = 'utf-8') -> Dict[str, Any]:
+        """
+        Read a byte range of a file without loading the rest of it.
+        
+        The window is widened to whole characters so multi-byte text is never cut in half.
+        
+        Args:
+            file_path (str): Path to the file to read (relative to workspace or absolute within workspace)
+            offset (int): First byte to read (default: 0)
+            length (int): Number of bytes to read (default: 16384)
+            encoding (str): File encoding (default: utf-8)
+            
+        Returns:
+            Dict containing success status, content, file info, the byte and line window in 'range', and any error messages
+        """
+        def locate(path, data, offsets):
+            start = self._align(data, min(max(0, int(offset)), len(data)), encoding)
+            end = self._align(data, min(len(data), start + max(0, int(length))), encoding)
+            return start, end, {'start_line': self._line_of(offsets, start) if offsets else 0,
+                                'total_lines': len(offsets)}
+        
+        return self._read_window(file_path, encoding, locate)
+    
+    def read_lines(self, file_path: str, start_line: int = 1, num_lines: int = DEFAULT_WINDOW_LINES,
+                   encoding: str = 'utf-8') -> Dict[str, Any]:
+        """
+        Read a window of lines using a cached index of line offsets.
+        
+        Args:
+            file_path (str): Path to the file to read (relative to workspace or absolute within workspace)
+            start_line (int): First line to read, 1-based (default: 1)
+            num_lines (int): Number of lines to read (default: 200)
+            encoding (str): File encoding (default: utf-8)
+            
+        Returns:
+            Dict containing success status, content, file info, the line window in 'range', and any error messages
+        """
+        def locate(path, data, offsets):
+            total = len(offsets)
+            first = min(max(1, int(start_line)), total + 1)
+            last = min(total, first + max(0, int(num_lines)) - 1)
+            start = offsets[first - 1] if first <= total else len(data)
+            end = offsets[last] if last < total else len(data)
+            return start, end, {'start_line': first, 'end_line': last, 'total_lines': total}
+        
+        return self._read_window(file_path, encoding, locate)
+    
+    def list_headings(self, file_path: str, encoding: str = 'utf-8') -> Dict[str, Any]:
+        """
+        List the markdown headings of a file with their line numbers, as an outline for targeted reads.
+        
+        Args:
+            file_path (str): Path to the file to read (relative to workspace or absolute within workspace)
+            encoding (str): File encoding (default: utf-8)
+            
+        Returns:
+            Dict containing success status, the outline as content, 'headings' (level, title, line, byte_offset),
+            file info and any error messages
+        """
+        found = {}
+        
+        def locate(path, data, offsets):
+            headings = [{'level': level, 'title': title, 'line': self._line_of(offsets, position),
+                         'byte_offset': position}
+                        for level, title, position in self._headings(path, data, offsets, encoding)]
+            found['headings'] = headings
+            # The outline is built from the headings, not from the mapped bytes
+            return 0, 0, {'total_lines': len(offsets)}
+        
+        result = self._read_window(file_path, encoding, locate)
+        if result['success']:
+            result['headings'] = found['headings']
+            result['content'] = "\n".join(f"L{h['line']} {'#' * h['level']} {h['title']}" for h in found['headings'])
+            result['range']['has_more'] = False
+        return result
+    
+    def read_section(self, file_path: str, heading: str, encoding: str = 'utf-8') -> Dict[str, Any]:
+        """
+        Read one markdown section: the heading line and everything up to the next heading of the same or a higher level.
+        
+        Args:
+            file_path (str): Path to the file to read (relative to workspace or absolute within workspace)
+            heading (str): Heading title; an exact (case-insensitive) match wins, otherwise the first title containing it
+            encoding (str): File encoding (default: utf-8)
+            
+        Returns:
+            Dict containing success status, content, file info, the section window in 'range', and any error messages
+        """
+        wanted = heading.strip().lstrip('#').strip().lower()
+        
+        def locate(path, data, offsets):
+            headings = self._headings(path, data, offsets, encoding)
+            titles = [title.lower() for _, title, _ in headings]
+            if wanted in titles:
+                index = titles.index(wanted)
+            else:
+                index = next((i for i, title in enumerate(titles) if wanted and wanted in title), None)
+            if index is None:
+                available = ", ".join(f"'{title}'" for _, title, _ in headings[:20])
+                return self._error(f"Heading not found: {heading}. Available headings: {available or 'none'}")
+            
+            level, title, start = headings[index]
+            end = next((position for other_level, _, position in headings[index + 1:] if other_level <= level), len(data))
+            return start, end, {'heading': title, 'level': level, 'start_line': self._line_of(offsets, start),
+                                'end_line': self._line_of(offsets, max(start, end - 1)), 'total_lines': len(offsets)}
+        
+        return self._read_window(file_path, encoding, locate)
+    
     def stringify(self, file_path: str, encoding: str = 'utf-8') -> str:
         """
         Read a file from the workspace and return its content as a string (simplified interface).
@@ -0,0 +1,98 @@
+"""
+Request Coalescer Module
+This module merges concurrent requests for the same key into a single call: the first
+caller does the work and every caller that arrives while it runs receives the same result.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class _InFlightCall:
+    """State of one call that other callers may be waiting on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class RequestCoalescer:
+    """
+    A thread-safe registry of in-flight calls keyed by an arbitrary hashable key
+    """
+
+    def __init__(self):
+        """Initialize the RequestCoalescer"""
+        self.in_flight: Dict[Hashable, _InFlightCall] = {}
+        self.lock = threading.Lock()
+        self.stats = {'executed': 0, 'coalesced': 0}
+
+    def run(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Run fn for the key unless an identical call is already running, in which case wait for it
+
+        Args:
+            key (Hashable): Identity of the call, e.g. a canonical URL plus options
+            fn (Callable[[], Any]): Function that performs the work
+
+        Returns:
+            Any: The result of fn (shared by all coalesced callers)
+
+        Raises:
+            BaseException: Whatever fn raised, re-raised in every waiting caller
+        """
+        with self.lock:
+            call = self.in_flight.get(key)
+            leader = call is None
+            if leader:
+                call = _InFlightCall()
+                self.in_flight[key] = call
+                self.stats['executed'] += 1
+            else:
+                self.stats['coalesced'] += 1
+
+        if leader:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+            finally:
+                with self.lock:
+                    del self.in_flight[key]
+                call.done.set()
+        else:
+            call.done.wait()
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get the number of executed and coalesced calls
+
+        Returns:
+            Dict[str, int]: Counters
+        """
+        with self.lock:
+            return dict(self.stats)
+
+
+_shared_coalescer: Optional[RequestCoalescer] = None
+_shared_coalescer_lock = threading.Lock()
+
+
+def get_request_coalescer() -> RequestCoalescer:
+    """
+    Get the process-wide shared RequestCoalescer, creating it on first use
+
+    Returns:
+        RequestCoalescer: The shared coalescer
+    """
+    global _shared_coalescer
+    if _shared_coalescer is None:
+        with _shared_coalescer_lock:
+            if _shared_coalescer is None:
+                _shared_coalescer = RequestCoalescer()
+    return _shared_coalescer
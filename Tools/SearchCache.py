@@ -0,0 +1,210 @@
+"""
+Search Cache Module
+This module caches parsed search results keyed by a normalized query, so repeated or
+trivially different queries from any agent skip the network round trip. A bounded
+in-memory LRU sits in front of a persistent SQLite store; both honour a TTL.
+"""
+
+import os
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+DEFAULT_CACHE_PATH = os.path.join("Workspaces", "cache", "search.sqlite")
+DEFAULT_TTL = 6 * 60 * 60          # Seconds a cached result list stays valid
+DEFAULT_MEMORY_ENTRIES = 1024      # Entries kept in the in-memory LRU
+
+BOOLEAN_OPERATORS = {'AND', 'OR', 'NOT'}
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize a search query for cache lookups
+
+    Case and whitespace are always normalized. Word order is only ignored for
+    boolean-free queries, i.e. ones without quotes, AND/OR/NOT, +/- prefixes or
+    operators such as site: where order or grouping can change the results.
+
+    Args:
+        query (str): Raw search query
+
+    Returns:
+        str: Normalized query
+    """
+    tokens = query.split()
+    has_operators = (
+        '"' in query or '(' in query
+        or any(token in BOOLEAN_OPERATORS for token in tokens)
+        or any(token[0] in '+-' or ':' in token for token in tokens)
+    )
+    tokens = [token.lower() for token in tokens]
+    if not has_operators:
+        tokens.sort()
+    return ' '.join(tokens)
+
+
+class SearchCache:
+    """
+    A two-level (memory LRU + SQLite) cache for search results with hit/miss counters
+    """
+
+    def __init__(self, db_path: Optional[str] = DEFAULT_CACHE_PATH, ttl: float = DEFAULT_TTL,
+                 max_memory_entries: int = DEFAULT_MEMORY_ENTRIES):
+        """
+        Initialize the SearchCache
+
+        Args:
+            db_path (Optional[str]): SQLite file for the persistent level, or None for memory only
+                (default: Workspaces/cache/search.sqlite)
+            ttl (float): Seconds an entry stays valid (default: 6 hours)
+            max_memory_entries (int): Maximum entries in the in-memory LRU (default: 1024)
+        """
+        self.ttl = ttl
+        self.max_memory_entries = max_memory_entries
+        self.memory: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0}
+
+        self.conn = None
+        if db_path:
+            os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+            self.conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False, isolation_level=None)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS search_cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    stored_at REAL NOT NULL
+                )
+            """)
+
+    @staticmethod
+    def make_key(kind: str, query: str, **params) -> str:
+        """
+        Build a cache key from the request kind, normalized query and parameters
+
+        Args:
+            kind (str): Request kind, e.g. "search" or "instant"
+            query (str): Raw search query
+            **params: Parameters that change the result (max_results, safe_search, ...)
+
+        Returns:
+            str: Cache key
+        """
+        param_text = '&'.join(f"{name}={params[name]}" for name in sorted(params))
+        return f"{kind}|{param_text}|{normalize_query(query)}"
+
+    def _remember(self, key: str, stored_at: float, value: Any):
+        """Insert into the memory LRU, evicting the oldest entry when full (lock held)"""
+        self.memory[key] = (stored_at, value)
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_memory_entries:
+            self.memory.popitem(last=False)
+
+    def get(self, kind: str, query: str, **params) -> Tuple[bool, Any]:
+        """
+        Look up a cached result
+
+        Args:
+            kind (str): Request kind
+            query (str): Raw search query
+            **params: Parameters used to build the key
+
+        Returns:
+            Tuple[bool, Any]: (hit, value); value is None on a miss
+        """
+        key = self.make_key(kind, query, **params)
+        now = time.time()
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry and now - entry[0] < self.ttl:
+                self.memory.move_to_end(key)
+                self.stats['memory_hits'] += 1
+                return True, entry[1]
+            if entry:
+                del self.memory[key]
+
+            if self.conn is not None:
+                row = self.conn.execute(
+                    "SELECT value, stored_at FROM search_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row and now - row[1] < self.ttl:
+                    value = json.loads(row[0])
+                    self._remember(key, row[1], value)
+                    self.stats['disk_hits'] += 1
+                    return True, value
+
+            self.stats['misses'] += 1
+            return False, None
+
+    def put(self, kind: str, query: str, value: Any, **params):
+        """
+        Store a result
+
+        Args:
+            kind (str): Request kind
+            query (str): Raw search query
+            value (Any): JSON-serializable result to cache
+            **params: Parameters used to build the key
+        """
+        key = self.make_key(kind, query, **params)
+        now = time.time()
+        # The memory entry gets its own copy, so the caller can keep using and mutating value
+        serialized = json.dumps(value, ensure_ascii=False)
+        with self.lock:
+            self._remember(key, now, json.loads(serialized))
+            if self.conn is not None:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO search_cache (key, value, stored_at) VALUES (?, ?, ?)",
+                    (key, serialized, now)
+                )
+
+    def purge_expired(self) -> int:
+        """
+        Delete expired entries from the persistent store
+
+        Returns:
+            int: Number of entries removed
+        """
+        if self.conn is None:
+            return 0
+        with self.lock:
+            cursor = self.conn.execute("DELETE FROM search_cache WHERE stored_at < ?", (time.time() - self.ttl,))
+            return cursor.rowcount
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get hit/miss counters
+
+        Returns:
+            Dict[str, Any]: Counters plus the overall hit rate in percent
+        """
+        with self.lock:
+            stats = dict(self.stats)
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        hits = stats['memory_hits'] + stats['disk_hits']
+        stats['hit_rate'] = round(hits / lookups * 100, 2) if lookups else 0.0
+        return stats
+
+
+_shared_cache: Optional[SearchCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> SearchCache:
+    """
+    Get the process-wide shared SearchCache, creating it on first use
+
+    Returns:
+        SearchCache: The shared cache
+    """
+    global _shared_cache
+    if _shared_cache is None:
+        with _shared_cache_lock:
+            if _shared_cache is None:
+                _shared_cache = SearchCache()
+    return _shared_cache
@@ -0,0 +1,294 @@
+"""
+Search Log Module
+This module stores search results in append-only, gzip-compressed JSONL segment files with a
+SQLite side index by query, URL and timestamp. Records are written by a background thread so
+callers never block on disk, and every record is its own gzip member, which lets the reader
+seek straight to it through the index.
+"""
+
+import os
+import json
+import gzip
+import queue
+import sqlite3
+import atexit
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+DEFAULT_LOG_DIR = os.path.join("Workspaces", "searches")
+DEFAULT_SEGMENT_BYTES = 64 * 1024 * 1024   # Compressed size at which a new segment is started
+SEGMENT_SUFFIX = ".jsonl.gz"
+
+
+def _record_urls(results: Dict[str, Any]) -> List[str]:
+    """Collect the distinct URLs mentioned in a search_and_extract result"""
+    urls = []
+    for item in results.get('search_results', []) or []:
+        if item.get('url'):
+            urls.append(item['url'])
+    for item in results.get('extracted_contents', []) or []:
+        if item.get('source_url'):
+            urls.append(item['source_url'])
+    return list(dict.fromkeys(urls))
+
+
+class SearchLog:
+    """
+    Append-only compressed segment log with an indexed reader API
+    """
+
+    def __init__(self, log_dir: str = DEFAULT_LOG_DIR, segment_bytes: int = DEFAULT_SEGMENT_BYTES):
+        """
+        Initialize the SearchLog
+
+        Args:
+            log_dir (str): Directory for segments and the index (default: Workspaces/searches)
+            segment_bytes (int): Compressed size that triggers a new segment (default: 64 MB)
+        """
+        self.log_dir = log_dir
+        self.segments_dir = os.path.join(log_dir, "segments")
+        self.segment_bytes = segment_bytes
+        self.lock = threading.Lock()
+        self.pending: "queue.Queue[Tuple[str, str, List[str], bytes]]" = queue.Queue()
+        self.segment_path: Optional[str] = None
+        self.segment_sequence = 0
+        self.writer: Optional[threading.Thread] = None
+
+        os.makedirs(self.segments_dir, exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(log_dir, "index.sqlite"),
+                                    timeout=30, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS records (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                query TEXT NOT NULL,
+                timestamp TEXT NOT NULL,
+                segment TEXT NOT NULL,
+                offset INTEGER NOT NULL,
+                length INTEGER NOT NULL
+            )
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS record_urls (
+                record_id INTEGER NOT NULL,
+                url TEXT NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_records_query ON records(query)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_records_timestamp ON records(timestamp)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_record_urls_url ON record_urls(url)")
+
+    def append(self, query: str, results: Dict[str, Any]):
+        """
+        Queue a search result for writing and return immediately
+
+        The record is serialized here, so later changes to results by the caller do not reach
+        the log and the writer thread never reads objects another thread may be mutating.
+
+        Args:
+            query (str): The search query
+            results (Dict[str, Any]): Result of search_and_extract for the query
+
+        Raises:
+            TypeError: If results is not JSON-serializable
+        """
+        timestamp = datetime.now().isoformat()
+        line = json.dumps({
+            'query': query,
+            'timestamp': timestamp,
+            'results': results
+        }, ensure_ascii=False).encode('utf-8') + b"\n"
+        urls = _record_urls(results or {})
+        self._ensure_writer()
+        self.pending.put((query, timestamp, urls, line))
+
+    def flush(self):
+        """Block until every queued record has been written and indexed"""
+        if self.writer is not None:
+            self.pending.join()
+
+    def _ensure_writer(self):
+        """Start the background writer on first use"""
+        if self.writer is not None:
+            return
+        with self.lock:
+            if self.writer is None:
+                self.writer = threading.Thread(target=self._write_loop, name="search-log-writer", daemon=True)
+                self.writer.start()
+                atexit.register(self.flush)
+
+    def _write_loop(self):
+        """Write queued records until the process exits"""
+        while True:
+            record = self.pending.get()
+            try:
+                self._write_record(record)
+            except Exception as e:
+                # Logging must never take the search tool down
+                print(f"Warning: Could not write search log record: {str(e)}")
+            finally:
+                self.pending.task_done()
+
+    def _next_segment(self) -> str:
+        """Name a new segment; the pid keeps concurrent processes in separate files"""
+        self.segment_sequence += 1
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        name = f"segment_{stamp}_{os.getpid()}_{self.segment_sequence:04d}{SEGMENT_SUFFIX}"
+        return os.path.join(self.segments_dir, name)
+
+    def _write_record(self, record: Tuple[str, str, List[str], bytes]):
+        """Append one serialized record as its own gzip member and index it"""
+        query, timestamp, urls, line = record
+        member = gzip.compress(line)
+
+        if self.segment_path is None or (
+                os.path.exists(self.segment_path) and os.path.getsize(self.segment_path) >= self.segment_bytes):
+            self.segment_path = self._next_segment()
+
+        with open(self.segment_path, 'ab') as f:
+            offset = f.tell()
+            f.write(member)
+
+        segment = os.path.basename(self.segment_path)
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = self.conn.execute(
+                    "INSERT INTO records (query, timestamp, segment, offset, length) VALUES (?, ?, ?, ?, ?)",
+                    (query, timestamp, segment, offset, len(member))
+                )
+                self.conn.executemany(
+                    "INSERT INTO record_urls (record_id, url) VALUES (?, ?)",
+                    [(cursor.lastrowid, url) for url in urls]
+                )
+                self.conn.execute("COMMIT")
+            except sqlite3.Error:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def _read_member(self, segment: str, offset: int, length: int) -> Dict[str, Any]:
+        """Read and decompress one record"""
+        with open(os.path.join(self.segments_dir, segment), 'rb') as f:
+            f.seek(offset)
+            return json.loads(gzip.decompress(f.read(length)))
+
+    def find(self, query: Optional[str] = None, url: Optional[str] = None,
+             since: Optional[str] = None, until: Optional[str] = None,
+             limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Look up logged searches through the index
+
+        Args:
+            query (Optional[str]): Exact query text
+            url (Optional[str]): A URL that appeared in the results
+            since (Optional[str]): ISO timestamp lower bound (inclusive)
+            until (Optional[str]): ISO timestamp upper bound (exclusive)
+            limit (Optional[int]): Maximum number of records, newest first
+
+        Returns:
+            List[Dict[str, Any]]: Records with 'id', 'query', 'timestamp' and 'results'
+        """
+        sql = "SELECT r.id, r.segment, r.offset, r.length FROM records r"
+        conditions, params = [], []
+        if url is not None:
+            sql += " JOIN record_urls u ON u.record_id = r.id"
+            conditions.append("u.url = ?")
+            params.append(url)
+        if query is not None:
+            conditions.append("r.query = ?")
+            params.append(query)
+        if since is not None:
+            conditions.append("r.timestamp >= ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("r.timestamp < ?")
+            params.append(until)
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " GROUP BY r.id ORDER BY r.timestamp DESC, r.id DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+
+        with self.lock:
+            rows = self.conn.execute(sql, params).fetchall()
+
+        records = []
+        for record_id, segment, offset, length in rows:
+            record = self._read_member(segment, offset, length)
+            record['id'] = record_id
+            records.append(record)
+        return records
+
+    def get(self, record_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Read one record by id
+
+        Args:
+            record_id (int): Record id from find()
+
+        Returns:
+            Optional[Dict[str, Any]]: The record, or None if unknown
+        """
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT segment, offset, length FROM records WHERE id = ?", (record_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        record = self._read_member(*row)
+        record['id'] = record_id
+        return record
+
+    def queries(self) -> List[str]:
+        """
+        List the distinct logged queries
+
+        Returns:
+            List[str]: Queries in order of first appearance
+        """
+        with self.lock:
+            return [row[0] for row in self.conn.execute(
+                "SELECT query FROM records GROUP BY query ORDER BY MIN(id)")]
+
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        """
+        Stream every record of every segment without using the index
+
+        Yields:
+            Dict[str, Any]: Records in segment order
+        """
+        for name in sorted(os.listdir(self.segments_dir)):
+            if not name.endswith(SEGMENT_SUFFIX):
+                continue
+            # gzip reads concatenated members as one stream
+            with gzip.open(os.path.join(self.segments_dir, name), 'rt', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+
+
+_shared_logs: Dict[str, SearchLog] = {}
+_shared_logs_lock = threading.Lock()
+
+
+def get_search_log(log_dir: Optional[str] = None) -> SearchLog:
+    """
+    Get the process-wide shared SearchLog for a directory, creating it on first use
+
+    Args:
+        log_dir (Optional[str]): Log directory (default: Workspaces/searches)
+
+    Returns:
+        SearchLog: The shared log
+    """
+    log_dir = log_dir or DEFAULT_LOG_DIR
+    key = os.path.abspath(log_dir)
+    with _shared_logs_lock:
+        log = _shared_logs.get(key)
+        if log is None:
+            log = SearchLog(log_dir)
+            _shared_logs[key] = log
+        return log
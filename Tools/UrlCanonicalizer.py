@@ -0,0 +1,63 @@
+"""
+URL Canonicalizer Module
+This module reduces equivalent URLs to one canonical form, so tracking-parameter,
+fragment, case and trailing-slash variants of a page share caches and in-flight fetches.
+"""
+
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+
+# Query parameters that only track the click and never change the page
+TRACKING_PARAMETERS = {
+    'gclid', 'dclid', 'fbclid', 'msclkid', 'yclid', 'mc_cid', 'mc_eid', '_hsenc', '_hsmi',
+}
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def _is_tracking_parameter(name: str) -> bool:
+    """Check whether a query parameter is a tracking parameter"""
+    name = name.lower()
+    return name.startswith('utm_') or name in TRACKING_PARAMETERS
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Build the canonical form of a URL
+
+    The scheme and host are lowercased, default ports, fragments and tracking
+    parameters (utm_* and common click IDs) are dropped, remaining query
+    parameters are sorted, and a trailing slash is removed from non-root paths.
+
+    Args:
+        url (str): URL to canonicalize
+
+    Returns:
+        str: Canonical URL, or the URL unchanged if it cannot be parsed (e.g. a
+        non-numeric port or an unterminated IPv6 literal)
+    """
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        return url
+    scheme = parts.scheme.lower()
+
+    host = (parts.hostname or '').lower().rstrip('.')
+    if ':' in host:
+        # hostname drops the brackets around IPv6 literals; they are required in a netloc
+        host = f"[{host}]"
+    if port and port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{port}"
+
+    path = parts.path or '/'
+    if len(path) > 1 and path.endswith('/'):
+        path = path.rstrip('/') or '/'
+
+    query_pairs = [
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not _is_tracking_parameter(name)
+    ]
+    query = urlencode(sorted(query_pairs))
+
+    return urlunsplit((scheme, host, path, query, ''))
@@ -4,13 +4,195 @@ This module provides functionality to extract and scrape text content from web p
 using Trafilatura library.
 """
 
+import sys
+import os
 import requests
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Tuple, Union
 import trafilatura
 from trafilatura.settings import use_config
+from trafilatura.utils import load_html
 from urllib.parse import urljoin, urlparse
-import time
+import re
+import codecs
 import logging
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the Tools directory to the path
+sys.path.append(os.path.dirname(__file__))
+
+from HttpSession import HttpClient, get_http_client, DEFAULT_USER_AGENT
+from PageCache import PageCache, get_page_cache
+from ExtractionPool import ExtractionPool, get_extraction_pool
+from UrlCanonicalizer import canonicalize_url
+from RequestCoalescer import RequestCoalescer, get_request_coalescer
+from HostHealth import HostUnavailableError
+from HttpRecorder import TRUNCATED_HEADER
+
+
+EXTRACTION_BACKENDS = ('inline', 'process')
+
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024   # Stop reading a page body past this size
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Content types trafilatura can extract from; anything else is rejected before download
+SUPPORTED_CONTENT_TYPES = {
+    'text/html',
+    'application/xhtml+xml',
+    'text/plain',
+    'text/xml',
+    'application/xml',
+}
+
+CHARSET_PATTERN = re.compile(r'charset\s*=\s*["\']?([\w.:-]+)', re.IGNORECASE)
+
+# Trafilatura configs built inside this process, keyed by extraction timeout
+_configs = {}
+
+
+def _get_config(timeout: int):
+    """Get a trafilatura config for the given timeout, building it once per process"""
+    config = _configs.get(timeout)
+    if config is None:
+        config = use_config()
+        config.set('DEFAULT', 'EXTRACTION_TIMEOUT', str(timeout))
+        _configs[timeout] = config
+    return config
+
+
+class ContentRejectedError(requests.exceptions.RequestException):
+    """Raised when a response is skipped because of its Content-Type or size"""
+
+
+def declared_charset(content_type: Optional[str]) -> Optional[str]:
+    """
+    Read the charset declared in a Content-Type header
+    
+    Args:
+        content_type (Optional[str]): Content-Type header value
+    
+    Returns:
+        Optional[str]: Codec name, or None if no known charset is declared
+    """
+    match = CHARSET_PATTERN.search(content_type or '')
+    if not match:
+        return None
+    try:
+        return codecs.lookup(match.group(1)).name
+    except LookupError:
+        return None
+
+
+def as_markup(body: bytes, encoding: Optional[str]) -> Union[str, bytes]:
+    """
+    Prepare a page body for trafilatura without a separate charset detection pass
+    
+    A declared encoding is decoded directly; otherwise the raw bytes are handed to the
+    parser, which tries UTF-8 first and only samples the document when that fails.
+    
+    Args:
+        body (bytes): Raw page body
+        encoding (Optional[str]): Declared character encoding, if any
+    
+    Returns:
+        Union[str, bytes]: Decoded text or the original bytes
+    """
+    if encoding:
+        return str(body, encoding, errors='replace')
+    return body
+
+
+def _document_fields(document, url: str, include_comments: bool) -> Optional[Dict[str, str]]:
+    """
+    Turn a trafilatura bare_extraction result into the extractor's result dict
+    
+    Args:
+        document: Document (trafilatura >= 2.0) or dict (older releases) from bare_extraction
+        url (str): URL of the page
+        include_comments (bool): Whether comments were extracted and should be appended
+    
+    Returns:
+        Optional[Dict[str, str]]: Extracted content with metadata, or None if there is no text
+    """
+    if document is None:
+        return None
+    if not isinstance(document, dict):
+        document = document.as_dict()
+    
+    # Rebuild the same text trafilatura.extract() would return for the txt format
+    text = document.get('text') or ''
+    if include_comments and document.get('comments'):
+        text = f"{text}\n{document['comments']}".strip()
+    text = unicodedata.normalize('NFC', text)
+    if not text:
+        return None
+    
+    return {
+        'url': url,
+        'content': text,
+        'title': document.get('title') or '',
+        'author': document.get('author') or '',
+        'date': document.get('date') or '',
+        'description': document.get('description') or '',
+        'sitename': document.get('sitename') or '',
+        'language': document.get('language') or '',
+        'content_length': len(text)
+    }
+
+
+def extract_document(body: bytes, encoding: Optional[str], url: str, include_comments: bool = False,
+                     include_tables: bool = True, include_images: bool = False,
+                     timeout: int = 30) -> Optional[Dict[str, str]]:
+    """
+    Extract main content and metadata from a downloaded page in a single parse
+    
+    This is a module-level function so the process backend can run it in a worker.
+    
+    Args:
+        body (bytes): Raw page body
+        encoding (Optional[str]): Declared character encoding of the body, if any
+        url (str): URL of the page
+        include_comments (bool): Whether to include comments (default: False)
+        include_tables (bool): Whether to include tables (default: True)
+        include_images (bool): Whether to include image descriptions (default: False)
+        timeout (int): Trafilatura extraction timeout in seconds (default: 30)
+    
+    Returns:
+        Optional[Dict[str, str]]: Extracted content with metadata, or None if nothing was extracted
+    """
+    # One bare extraction builds the lxml tree once and returns text and metadata together
+    document = trafilatura.bare_extraction(
+        as_markup(body, encoding),
+        url=url,
+        with_metadata=True,
+        include_comments=include_comments,
+        include_tables=include_tables,
+        include_images=include_images,
+        config=_get_config(timeout)
+    )
+    
+    return _document_fields(document, url, include_comments)
+
+
+def _collect_links(tree, base_url: str) -> List[str]:
+    """
+    Collect absolute http(s) links from a parsed page, in document order without duplicates
+    
+    Args:
+        tree: lxml tree of the page
+        base_url (str): URL used to resolve relative links
+    
+    Returns:
+        List[str]: Absolute link URLs
+    """
+    links = []
+    seen = set()
+    for href in tree.xpath('//a/@href'):
+        link = urljoin(base_url, href.strip())
+        if urlparse(link).scheme in ('http', 'https') and link not in seen:
+            seen.add(link)
+            links.append(link)
+    return links
 
 
 class WebContentExtractor:
@@ -18,17 +200,41 @@ class WebContentExtractor:
     A class to extract content from web pages using Trafilatura
     """
     
-    def __init__(self, timeout: int = 30):
+    def __init__(self, timeout: int = 30, http_client: Optional[HttpClient] = None,
+                 page_cache: Optional[PageCache] = None, use_cache: bool = True,
+                 extraction_backend: str = "inline", process_workers: Optional[int] = None,
+                 max_bytes: int = DEFAULT_MAX_BYTES,
+                 coalescer: Optional[RequestCoalescer] = None):
         """
         Initialize the WebContentExtractor
         
         Args:
             timeout (int): Request timeout in seconds (default: 30)
+            http_client (Optional[HttpClient]): HTTP client to use (default: the shared pooled client)
+            page_cache (Optional[PageCache]): On-disk page cache to use (default: the shared cache)
+            use_cache (bool): Whether to read and write the page cache at all (default: True)
+            extraction_backend (str): "inline" to parse in the calling thread, or "process" to parse
+                in a persistent process pool (default: "inline")
+            process_workers (Optional[int]): Size of the process pool (default: number of CPUs)
+            max_bytes (int): Maximum page body size to download; larger bodies are truncated and never cached (default: 5 MB)
+            coalescer (Optional[RequestCoalescer]): Registry merging concurrent fetches of the same
+                canonical URL (default: the shared coalescer)
         """
+        if extraction_backend not in EXTRACTION_BACKENDS:
+            raise ValueError(f"extraction_backend must be one of {EXTRACTION_BACKENDS}")
+        
         self.timeout = timeout
         self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+            'User-Agent': DEFAULT_USER_AGENT
         }
+        self.http = http_client or get_http_client()
+        self.page_cache = (page_cache or get_page_cache()) if use_cache else None
+        self.extraction_backend = extraction_backend
+        self.max_bytes = max_bytes
+        self.coalescer = coalescer or get_request_coalescer()
+        self.extraction_pool: Optional[ExtractionPool] = (
+            get_extraction_pool(process_workers) if extraction_backend == "process" else None
+        )
         
         # Configure trafilatura
         self.config = use_config()
@@ -38,6 +244,142 @@ class WebContentExtractor:
         logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
     
+    def _fetch_page(self, url: str, remember_failure: bool = True) -> Tuple[bytes, Optional[str]]:
+        """
+        Download a page, serving it from the page cache when fresh and
+        revalidating stale entries with a conditional request
+        
+        Args:
+            url (str): URL of the web page
+            remember_failure (bool): Put the URL in the negative cache if the download fails (default: True)
+        
+        Returns:
+            Tuple[bytes, Optional[str]]: Raw body and its declared character encoding (None if undeclared)
+        
+        Raises:
+            requests.exceptions.RequestException: If the download fails
+        """
+        cached = self.page_cache.get(url) if self.page_cache else None
+        if cached and cached['fresh']:
+            return cached['body'], cached['encoding']
+        
+        headers = dict(self.headers)
+        if cached:
+            headers.update(self.page_cache.conditional_headers(cached))
+        
+        try:
+            response = self.http.get(url, headers=headers, timeout=self.timeout, stream=True,
+                                     remember_failure=remember_failure)
+        except HostUnavailableError:
+            if cached:
+                # A stale copy beats nothing while the host is known to be failing
+                self.logger.info(f"Serving stale cached copy of {url}: host unavailable")
+                return cached['body'], cached['encoding']
+            raise
+        
+        try:
+            if cached and response.status_code == 304:
+                self.page_cache.refresh(url, response.headers)
+                return cached['body'], cached['encoding']
+            response.raise_for_status()
+            
+            try:
+                body, truncated = self._read_body(url, response)
+            except ContentRejectedError:
+                raise
+            except requests.exceptions.RequestException as e:
+                # The response was already counted as healthy when its headers arrived
+                self.http.record_error(url, e, remember_failure=remember_failure)
+                raise
+        finally:
+            response.close()
+        
+        # Only trust an explicit charset; never run requests' full-body detection
+        encoding = declared_charset(response.headers.get('Content-Type'))
+        
+        # A truncated body is not the page; caching it would serve the cut-off copy as complete
+        if self.page_cache and response.status_code == 200 and not truncated:
+            try:
+                self.page_cache.store(url, body, response.headers, encoding)
+            except Exception as e:
+                self.logger.warning(f"Could not cache {url}: {e}")
+        
+        return body, encoding
+    
+    def _read_body(self, url: str, response: requests.Response) -> Tuple[bytes, bool]:
+        """
+        Read a streamed response body, rejecting unsupported types up front
+        and stopping once max_bytes have been read
+        
+        Args:
+            url (str): URL of the web page
+            response (requests.Response): Response opened with stream=True
+        
+        Returns:
+            Tuple[bytes, bool]: The body, cut off at max_bytes, and whether it is incomplete
+            (cut off here, or already cut off by the HTTP recorder)
+        
+        Raises:
+            ContentRejectedError: If the Content-Type is unsupported or Content-Length exceeds max_bytes
+        """
+        content_type = response.headers.get('Content-Type', '')
+        media_type = content_type.split(';', 1)[0].strip().lower()
+        if media_type and media_type not in SUPPORTED_CONTENT_TYPES:
+            raise ContentRejectedError(f"Unsupported content type: {media_type}")
+        
+        content_length = response.headers.get('Content-Length', '')
+        if content_length.isdigit() and int(content_length) > self.max_bytes:
+            raise ContentRejectedError(
+                f"Content too large: {int(content_length)} bytes (limit {self.max_bytes})"
+            )
+        
+        truncated = bool(response.headers.get(TRUNCATED_HEADER))
+        body = bytearray()
+        for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+            body.extend(chunk)
+            if len(body) > self.max_bytes:
+                del body[self.max_bytes:]
+                truncated = True
+                break
+        if truncated:
+            self.logger.warning(f"Truncated {url} at {len(body)} bytes; not caching it")
+        return bytes(body), truncated
+    
+    def _fetch_markup(self, url: str) -> Union[str, bytes]:
+        """
+        Download a page and prepare it for the parser
+        
+        Args:
+            url (str): URL of the web page
+        
+        Returns:
+            Union[str, bytes]: Markup as returned by as_markup()
+        """
+        body, encoding = self._fetch_page(url)
+        return as_markup(body, encoding)
+    
+    def _run_extraction(self, body: bytes, encoding: Optional[str], url: str,
+                        include_comments: bool, include_tables: bool,
+                        include_images: bool) -> Optional[Dict[str, str]]:
+        """
+        Run extract_document on the configured backend
+        
+        Args:
+            body (bytes): Raw page body
+            encoding (Optional[str]): Declared character encoding of the body, if any
+            url (str): URL of the page
+            include_comments (bool): Whether to include comments
+            include_tables (bool): Whether to include tables
+            include_images (bool): Whether to include image descriptions
+        
+        Returns:
+            Optional[Dict[str, str]]: Extracted content with metadata
+        """
+        args = (body, encoding, url, include_comments, include_tables, include_images, self.timeout)
+        if self.extraction_pool is not None:
+            return self.extraction_pool.run(extract_document, *args)
+        return extract_document(*args)
+    
     def extract_content(self, url: str, include_comments: bool = False, 
                        include_tables: bool = True, include_images: bool = False) -> Optional[Dict[str, str]]:
         """
@@ -52,84 +394,143 @@ class WebContentExtractor:
         Returns:
             Optional[Dict[str, str]]: Extracted content with metadata
         """
+        content, _ = self.extract_content_with_error(url, include_comments, include_tables, include_images)
+        return content
+    
+    def extract_content_with_error(self, url: str, include_comments: bool = False,
+                                   include_tables: bool = True, include_images: bool = False,
+                                   remember_failure: bool = True) -> Tuple[Optional[Dict[str, str]], Optional[Exception]]:
+        """
+        Extract content from a single web page and report why it failed
+        
+        Args:
+            url (str): URL of the web page
+            include_comments (bool): Whether to include comments (default: False)
+            include_tables (bool): Whether to include tables (default: True)
+            include_images (bool): Whether to include image descriptions (default: False)
+            remember_failure (bool): Put the URL in the negative cache if the download fails;
+                pass False for attempts that will be retried (default: True)
+        
+        Returns:
+            Tuple[Optional[Dict[str, str]], Optional[Exception]]: Extracted content, or None and the
+            error that caused the failure (None if the page simply had no extractable content)
+        """
+        # Concurrent requests for the same canonical URL and options download and extract once
+        key = (canonicalize_url(url), include_comments, include_tables, include_images)
+        content, error = self.coalescer.run(
+            key, lambda: self._extract_uncoalesced(url, include_comments, include_tables, include_images,
+                                                   remember_failure)
+        )
+        
+        if content:
+            # Every caller gets its own copy, labelled with the URL it asked for
+            content = dict(content)
+            content['url'] = url
+        return content, error
+    
+    def _extract_uncoalesced(self, url: str, include_comments: bool, include_tables: bool,
+                             include_images: bool,
+                             remember_failure: bool = True) -> Tuple[Optional[Dict[str, str]], Optional[Exception]]:
+        """
+        Download and extract a page without request coalescing
+        
+        Args:
+            url (str): URL of the web page
+            include_comments (bool): Whether to include comments
+            include_tables (bool): Whether to include tables
+            include_images (bool): Whether to include image descriptions
+            remember_failure (bool): Put the URL in the negative cache if the download fails (default: True)
+        
+        Returns:
+            Tuple[Optional[Dict[str, str]], Optional[Exception]]: Same as extract_content_with_error
+        """
         try:
             # Download the page
-            response = requests.get(url, headers=self.headers, timeout=self.timeout)
-            response.raise_for_status()
+            body, encoding = self._fetch_page(url, remember_failure)
             
-            # Extract content using trafilatura
-            extracted_text = trafilatura.extract(
-                response.text,
-                include_comments=include_comments,
-                include_tables=include_tables,
-                include_images=include_images,
-                config=self.config
-            )
+            # Extract content and metadata on the configured backend
+            result = self._run_extraction(body, encoding, url, include_comments,
+                                          include_tables, include_images)
             
-            if not extracted_text:
+            if not result:
                 self.logger.warning(f"No content extracted from {url}")
-                return None
-            
-            # Extract metadata
-            metadata = trafilatura.extract_metadata(response.text)
+                return None, None
             
-            result = {
-                'url': url,
-                'content': extracted_text,
-                'title': metadata.title if metadata else '',
-                'author': metadata.author if metadata and metadata.author else '',
-                'date': metadata.date if metadata and metadata.date else '',
-                'description': metadata.description if metadata and metadata.description else '',
-                'sitename': metadata.sitename if metadata and metadata.sitename else '',
-                'language': metadata.language if metadata and metadata.language else '',
-                'content_length': len(extracted_text)
-            }
-            
-            return result
+            return result, None
             
+        except (ContentRejectedError, HostUnavailableError) as e:
+            self.logger.info(f"Skipping {url}: {e}")
+            return None, e
         except requests.exceptions.RequestException as e:
             self.logger.error(f"Error fetching {url}: {e}")
-            return None
+            return None, e
         except Exception as e:
             self.logger.error(f"Error extracting content from {url}: {e}")
-            return None
+            return None, e
     
     def extract_content_batch(self, urls: List[str], delay: float = 1.0, 
-                            max_retries: int = 3) -> List[Dict[str, str]]:
+                            max_retries: int = 3, concurrent: bool = False,
+                            max_concurrency: int = 4) -> List[Dict[str, str]]:
         """
-        Extract content from multiple URLs with delay between requests
+        Extract content from multiple URLs, pacing requests per host through the shared rate limiter
         
         Args:
             urls (List[str]): List of URLs to extract content from
-            delay (float): Delay between requests in seconds (default: 1.0)
+            delay (float): Unused; kept for compatibility. Requests are paced per host by the shared rate limiter
             max_retries (int): Maximum number of retries per URL (default: 3)
+            concurrent (bool): Download all URLs at once instead of one by one (default: False)
+            max_concurrency (int): Maximum simultaneous downloads in concurrent mode (default: 4)
         
         Returns:
             List[Dict[str, str]]: List of extracted content
         """
+        if concurrent and len(urls) > 1:
+            workers = max(1, min(max_concurrency, len(urls)))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                contents = list(executor.map(
+                    lambda url: self._extract_with_retries(url, max_retries), urls
+                ))
+            return [content for content in contents if content]
+        
         results = []
         
         for url in urls:
-            self.logger.info(f"Extracting content from: {url}")
-            
-            # Retry mechanism
-            for attempt in range(max_retries):
-                content = self.extract_content(url)
-                if content:
-                    results.append(content)
-                    break
-                elif attempt < max_retries - 1:
-                    self.logger.warning(f"Retry {attempt + 1} for {url}")
-                    time.sleep(delay)
-                else:
-                    self.logger.error(f"Failed to extract content from {url} after {max_retries} attempts")
-            
-            # Add delay between requests (except for the last one)
-            if url != urls[-1]:
-                time.sleep(delay)
+            content = self._extract_with_retries(url, max_retries)
+            if content:
+                results.append(content)
         
         return results
     
+    def _extract_with_retries(self, url: str, max_retries: int) -> Optional[Dict[str, str]]:
+        """
+        Extract content from a URL, retrying on failure
+        
+        Args:
+            url (str): URL to extract content from
+            max_retries (int): Maximum number of attempts
+        
+        Returns:
+            Optional[Dict[str, str]]: Extracted content or None if every attempt failed
+        """
+        self.logger.info(f"Extracting content from: {url}")
+        
+        # Retry mechanism
+        for attempt in range(max_retries):
+            # Only the last attempt may put the URL in the negative cache, or it would refuse the retries
+            content, error = self.extract_content_with_error(url, remember_failure=attempt == max_retries - 1)
+            if content:
+                return content
+            elif isinstance(error, (ContentRejectedError, HostUnavailableError)):
+                # Retrying cannot change the content type or size, and the host is known to be failing
+                return None
+            elif attempt < max_retries - 1:
+                # The host's rate budget spaces out the retries
+                self.logger.warning(f"Retry {attempt + 1} for {url}")
+            else:
+                self.logger.error(f"Failed to extract content from {url} after {max_retries} attempts")
+        
+        return None
+    
     def extract_with_fallback(self, url: str) -> Optional[Dict[str, str]]:
         """
         Extract content with fallback methods if trafilatura fails
@@ -147,12 +548,11 @@ class WebContentExtractor:
         
         # Fallback to basic extraction
         try:
-            response = requests.get(url, headers=self.headers, timeout=self.timeout)
-            response.raise_for_status()
+            markup = self._fetch_markup(url)
             
             # Use trafilatura's bare extraction
             extracted_text = trafilatura.extract(
-                response.text,
+                markup,
                 favor_precision=True,
                 include_comments=False,
                 include_tables=True
@@ -202,29 +602,30 @@ class WebContentExtractor:
             Optional[Dict[str, any]]: Content with extracted links
         """
         try:
-            response = requests.get(url, headers=self.headers, timeout=self.timeout)
-            response.raise_for_status()
+            markup = self._fetch_markup(url)
             
-            # Extract main content
-            content = trafilatura.extract(response.text, config=self.config)
-            if not content:
+            # Parse once; links are read before extraction, which works on its own copy of the tree
+            tree = load_html(markup)
+            if tree is None:
                 return None
+            links = _collect_links(tree, url)
             
-            # Extract links
-            links = trafilatura.extract_links(response.text)
-            
-            # Extract metadata
-            metadata = trafilatura.extract_metadata(response.text)
+            # Extract main content and metadata
+            document = trafilatura.bare_extraction(tree, url=url, with_metadata=True,
+                                                   include_comments=True, config=self.config)
+            fields = _document_fields(document, url, include_comments=True)
+            if not fields:
+                return None
             
             result = {
                 'url': url,
-                'content': content,
-                'links': links if links else [],
-                'title': metadata.title if metadata else '',
-                'author': metadata.author if metadata and metadata.author else '',
-                'date': metadata.date if metadata and metadata.date else '',
-                'description': metadata.description if metadata and metadata.description else '',
-                'content_length': len(content)
+                'content': fields['content'],
+                'links': links,
+                'title': fields['title'],
+                'author': fields['author'],
+                'date': fields['date'],
+                'description': fields['description'],
+                'content_length': fields['content_length']
             }
             
             return result
@@ -248,7 +649,7 @@ class WebContentExtractor:
             if not parsed.scheme or not parsed.netloc:
                 return False
             
-            response = requests.head(url, headers=self.headers, timeout=10)
+            response = self.http.head(url, headers=self.headers, timeout=10)
             return response.status_code == 200
             
         except Exception:
@@ -279,5 +680,5 @@ if __name__ == "__main__":
             print("Failed to extract content")
     
     print("\n--- Batch extraction ---")
-    batch_results = extractor.extract_content_batch(test_urls, delay=2.0)
+    batch_results = extractor.extract_content_batch(test_urls)
     print(f"Successfully extracted content from {len(batch_results)} URLs")
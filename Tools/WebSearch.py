@@ -7,9 +7,10 @@ It provides a unified interface for searching the web and extracting content fro
 import sys
 import os
 import json
-import time
+import threading
 from typing import List, Dict, Optional, Union
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urljoin, urlparse
 
 # Add the Tools directory to the path
@@ -17,6 +18,7 @@ sys.path.append(os.path.dirname(__file__))
 
 from DuckDuckGoSearch import DuckDuckGoSearcher
 from WebContentExtractor import WebContentExtractor
+from HttpSession import HttpClient, get_http_client
 
 
 class WebSearcher:
@@ -25,15 +27,22 @@ class WebSearcher:
     DuckDuckGo search with web content extraction capabilities.
     """
     
-    def __init__(self, timeout: int = 30):
+    def __init__(self, timeout: int = 30, http_client: Optional[HttpClient] = None,
+                 extraction_backend: str = "inline", process_workers: Optional[int] = None):
         """
         Initialize the WebSearcher
         
         Args:
             timeout (int): Request timeout in seconds (default: 30)
+            http_client (Optional[HttpClient]): HTTP client to use (default: the shared pooled client)
+            extraction_backend (str): "inline" or "process" HTML extraction (default: "inline")
+            process_workers (Optional[int]): Size of the extraction process pool (default: number of CPUs)
         """
-        self.searcher = DuckDuckGoSearcher()
-        self.extractor = WebContentExtractor(timeout=timeout)
+        self.http = http_client or get_http_client()
+        self.searcher = DuckDuckGoSearcher(http_client=self.http)
+        self.extractor = WebContentExtractor(timeout=timeout, http_client=self.http,
+                                             extraction_backend=extraction_backend,
+                                             process_workers=process_workers)
         self.timeout = timeout
     
     def search(self, query: str, max_results: int = 10, safe_search: str = "moderate") -> List[Dict[str, str]]:
@@ -67,24 +76,28 @@ class WebSearcher:
         return self.extractor.extract_content(url, include_comments, include_tables, include_images)
     
     def extract_content_batch(self, urls: List[str], delay: float = 1.0, 
-                            max_retries: int = 3) -> List[Dict[str, str]]:
+                            max_retries: int = 3, concurrent: bool = False,
+                            max_concurrency: int = 4) -> List[Dict[str, str]]:
         """
-        Extract content from multiple URLs with delay between requests
+        Extract content from multiple URLs, pacing requests per host through the shared rate limiter
         
         Args:
             urls (List[str]): List of URLs to extract content from
-            delay (float): Delay between requests in seconds (default: 1.0)
+            delay (float): Ignored (kept for backward compatibility)
             max_retries (int): Maximum number of retries per URL (default: 3)
+            concurrent (bool): Download all URLs at once instead of one by one (default: False)
+            max_concurrency (int): Maximum simultaneous downloads in concurrent mode (default: 4)
         
         Returns:
             List[Dict[str, str]]: List of extracted content
         """
-        return self.extractor.extract_content_batch(urls, delay, max_retries)
+        return self.extractor.extract_content_batch(urls, delay, max_retries, concurrent, max_concurrency)
     
     def search_and_extract(self, query: str, max_results: int = 5, 
                           extract_count: int = 3, delay: float = 1.0,
                           include_comments: bool = False, include_tables: bool = True,
-                          include_images: bool = False) -> Dict[str, List[Dict]]:
+                          include_images: bool = False, concurrent: bool = False,
+                          max_concurrency: int = 4) -> Dict[str, List[Dict]]:
         """
         Search for a query and extract content from the top results
         
@@ -92,10 +105,12 @@ class WebSearcher:
             query (str): The search query
             max_results (int): Maximum number of search results to get (default: 5)
             extract_count (int): Number of top results to extract content from (default: 3)
-            delay (float): Delay between extraction requests in seconds (default: 1.0)
+            delay (float): Ignored (kept for backward compatibility)
             include_comments (bool): Whether to include comments in extraction (default: False)
             include_tables (bool): Whether to include tables in extraction (default: True)
             include_images (bool): Whether to include image descriptions (default: False)
+            concurrent (bool): Download all selected URLs at once instead of one by one (default: False)
+            max_concurrency (int): Maximum simultaneous downloads in concurrent mode (default: 4)
         
         Returns:
             Dict[str, List[Dict]]: Dictionary containing 'search_results' and 'extracted_contents'
@@ -103,6 +118,67 @@ class WebSearcher:
         # Perform the search
         search_results = self.search(query, max_results)
         
+        return self._extract_search_results(query, search_results, extract_count,
+                                            include_comments, include_tables, include_images,
+                                            concurrent, max_concurrency)
+    
+    def search_and_extract_many(self, queries: List[str], max_results: int = 5,
+                                extract_count: int = 3, include_comments: bool = False,
+                                include_tables: bool = True, include_images: bool = False,
+                                max_workers: int = 4,
+                                max_concurrency: int = 4) -> Dict[str, Dict[str, List[Dict]]]:
+        """
+        Search for several queries at once and extract content from the top results of each
+        
+        Args:
+            queries (List[str]): The search queries (duplicates are handled once)
+            max_results (int): Maximum number of search results to get per query (default: 5)
+            extract_count (int): Number of top results to extract content from per query (default: 3)
+            include_comments (bool): Whether to include comments in extraction (default: False)
+            include_tables (bool): Whether to include tables in extraction (default: True)
+            include_images (bool): Whether to include image descriptions (default: False)
+            max_workers (int): Maximum queries searched and extracted simultaneously (default: 4)
+            max_concurrency (int): Maximum simultaneous downloads per query (default: 4)
+        
+        Returns:
+            Dict[str, Dict[str, List[Dict]]]: For each query, a dictionary containing
+            'search_results' and 'extracted_contents', in the order the queries were given
+        """
+        all_search_results = self.searcher.search_many(queries, max_results, max_workers=max_workers)
+        if not all_search_results:
+            return {}
+        
+        def extract(query: str) -> Dict[str, List[Dict]]:
+            return self._extract_search_results(query, all_search_results[query], extract_count,
+                                                include_comments, include_tables, include_images,
+                                                True, max_concurrency)
+        
+        workers = max(1, min(max_workers, len(all_search_results)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(extract, all_search_results))
+        
+        return dict(zip(all_search_results, results))
+    
+    def _extract_search_results(self, query: str, search_results: List[Dict[str, str]],
+                                extract_count: int, include_comments: bool, include_tables: bool,
+                                include_images: bool, concurrent: bool,
+                                max_concurrency: int) -> Dict[str, List[Dict]]:
+        """
+        Extract content from the top search results of one query
+        
+        Args:
+            query (str): The search query the results belong to
+            search_results (List[Dict[str, str]]): Results returned by search()
+            extract_count (int): Number of top results to extract content from
+            include_comments (bool): Whether to include comments in extraction
+            include_tables (bool): Whether to include tables in extraction
+            include_images (bool): Whether to include image descriptions
+            concurrent (bool): Download all selected URLs at once instead of one by one
+            max_concurrency (int): Maximum simultaneous downloads in concurrent mode
+        
+        Returns:
+            Dict[str, List[Dict]]: Dictionary containing 'search_results' and 'extracted_contents'
+        """
         if not search_results:
             return {
                 'search_results': [],
@@ -112,46 +188,70 @@ class WebSearcher:
         # Extract URLs for content extraction
         urls_to_extract = [result['url'] for result in search_results[:extract_count]]
         
+        def extract(url: str):
+            return self.extractor.extract_content_with_error(url, include_comments, include_tables, include_images)
+        
         # Extract content from URLs
         extracted_contents = []
-        for i, url in enumerate(urls_to_extract):
-            content = self.extract_content(url, include_comments, include_tables, include_images)
-            
-            if content:
-                # Add metadata
-                content['source_url'] = url
-                content['extraction_order'] = i + 1
-                content['extraction_timestamp'] = datetime.now().isoformat()
-                content['search_query'] = query
-                extracted_contents.append(content)
-            else:
-                # Add failed extraction record
-                failed_content = {
-                    'source_url': url,
-                    'extraction_order': i + 1,
-                    'extraction_timestamp': datetime.now().isoformat(),
-                    'search_query': query,
-                    'status': 'failed',
-                    'error': 'Failed to extract content from URL',
-                    'title': None,
-                    'author': None,
-                    'date': None,
-                    'content': None,
-                    'content_length': 0,
-                    'language': None,
-                    'sitename': None
-                }
-                extracted_contents.append(failed_content)
+        if concurrent and len(urls_to_extract) > 1:
+            workers = max(1, min(max_concurrency, len(urls_to_extract)))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                # map() keeps results in submission order, so extraction_order is preserved
+                contents = list(executor.map(extract, urls_to_extract))
             
-            # Add delay between requests (except for the last one)
-            if i < len(urls_to_extract) - 1:
-                time.sleep(delay)
+            for i, (url, (content, error)) in enumerate(zip(urls_to_extract, contents)):
+                extracted_contents.append(self._build_extraction_record(url, i + 1, query, content, error))
+        else:
+            for i, url in enumerate(urls_to_extract):
+                content, error = extract(url)
+                extracted_contents.append(self._build_extraction_record(url, i + 1, query, content, error))
         
         return {
             'search_results': search_results,
             'extracted_contents': extracted_contents
         }
     
+    def _build_extraction_record(self, url: str, order: int, query: str,
+                                 content: Optional[Dict[str, str]],
+                                 error: Optional[Exception] = None) -> Dict:
+        """
+        Attach search metadata to extracted content, or build a failed extraction record
+        
+        Args:
+            url (str): The URL that was extracted
+            order (int): 1-based position of the URL in the search results
+            query (str): The search query that produced the URL
+            content (Optional[Dict[str, str]]): Extracted content, or None if extraction failed
+            error (Optional[Exception]): Why extraction failed, if known
+        
+        Returns:
+            Dict: Extraction record in the shape returned by search_and_extract
+        """
+        if content:
+            # Add metadata
+            content['source_url'] = url
+            content['extraction_order'] = order
+            content['extraction_timestamp'] = datetime.now().isoformat()
+            content['search_query'] = query
+            return content
+        
+        # Add failed extraction record
+        return {
+            'source_url': url,
+            'extraction_order': order,
+            'extraction_timestamp': datetime.now().isoformat(),
+            'search_query': query,
+            'status': 'failed',
+            'error': str(error) if error else 'Failed to extract content from URL',
+            'title': None,
+            'author': None,
+            'date': None,
+            'content': None,
+            'content_length': 0,
+            'language': None,
+            'sitename': None
+        }
+    
     def search_and_extract_batch(self, query: str, max_results: int = 5, 
                                extract_count: int = 3, delay: float = 1.0,
                                max_retries: int = 3) -> Dict[str, List[Dict]]:
@@ -162,7 +262,7 @@ class WebSearcher:
             query (str): The search query
             max_results (int): Maximum number of search results to get (default: 5)
             extract_count (int): Number of top results to extract content from (default: 3)
-            delay (float): Delay between extraction requests in seconds (default: 1.0)
+            delay (float): Ignored (kept for backward compatibility)
             max_retries (int): Maximum number of retries per URL (default: 3)
         
         Returns:
@@ -235,10 +335,6 @@ class WebSearcher:
                     content['extraction_order'] = i + 1
                     content['extraction_timestamp'] = datetime.now().isoformat()
                     extracted_contents.append(content)
-                
-                # Add delay between requests (except for the last one)
-                if i < len(urls) - 1:
-                    time.sleep(1.0)
             
             return extracted_contents
     
@@ -286,20 +382,48 @@ class WebSearcher:
             raise ValueError("url_or_urls must be a string or list of strings")
 
 
+_shared_searcher: Optional[WebSearcher] = None
+_shared_searcher_lock = threading.Lock()
+
+
+def get_web_searcher() -> WebSearcher:
+    """
+    Get the process-wide shared WebSearcher, creating it on first use
+    
+    Returns:
+        WebSearcher: The shared searcher
+    """
+    global _shared_searcher
+    if _shared_searcher is None:
+        with _shared_searcher_lock:
+            if _shared_searcher is None:
+                _shared_searcher = WebSearcher()
+    return _shared_searcher
+
+
 # Convenience functions for backward compatibility
 def search_and_extract(query: str, max_results: int = 5, extract_count: int = 3) -> Dict[str, List[Dict]]:
     """
     Convenience function for search and extract
     """
-    searcher = WebSearcher()
+    searcher = get_web_searcher()
     return searcher.search_and_extract(query, max_results, extract_count)
 
 
+def search_and_extract_many(queries: List[str], max_results: int = 5,
+                            extract_count: int = 3) -> Dict[str, Dict[str, List[Dict]]]:
+    """
+    Convenience function for concurrent multi-query search and extract
+    """
+    searcher = get_web_searcher()
+    return searcher.search_and_extract_many(queries, max_results, extract_count)
+
+
 def quick_search(query: str, max_results: int = 10) -> List[Dict]:
     """
     Convenience function for quick search
     """
-    searcher = WebSearcher()
+    searcher = get_web_searcher()
     return searcher.quick_search(query, max_results)
 
 
@@ -307,15 +431,15 @@ def extract_content(url: str) -> Optional[Dict[str, str]]:
     """
     Convenience function for single content extraction
     """
-    searcher = WebSearcher()
+    searcher = get_web_searcher()
     return searcher.extract_content(url)
 
 
 def extract_content_batch(urls: List[str], delay: float = 1.0) -> List[Dict[str, str]]:
     """
-    Convenience function for batch content extraction
+    Convenience function for batch content extraction (delay is unused; see RateLimiter.py)
     """
-    searcher = WebSearcher()
+    searcher = get_web_searcher()
     return searcher.extract_content_batch(urls, delay)
 
 
@@ -339,5 +463,5 @@ if __name__ == "__main__":
     if results:
         print("\n📄 Testing batch extraction...")
         urls = [result['url'] for result in results[:2]]
-        batch_results = searcher.extract_content_batch(urls, delay=1.0)
+        batch_results = searcher.extract_content_batch(urls)
         print(f"Batch extracted: {len(batch_results)} contents")
@@ -1,6 +1,10 @@
+import os
 import sys
+from typing import List, Optional
+from concurrent.futures import ProcessPoolExecutor
 from researchplanner import ResearchPlanner
 from runsubagents import run_all_pending_tasks
+from runcontext import RunContext
 import subprocess
 
 # Colorful print helpers
@@ -19,31 +23,69 @@ def log_error(msg):
 def log_stage(msg):
     print(f"\033[96m[STAGE]\033[0m {msg}")
 
-def run_full_research_pipeline(topic: str, num_subtopics: int = 8):
+def run_full_research_pipeline(topic: str, num_subtopics: int = 8, context: RunContext = None) -> Optional[str]:
     """
     Runs the full research pipeline: planning, subagent execution, and report generation.
     Args:
         topic (str): The research topic
         num_subtopics (int): Number of subtopics to generate (default: 8)
+        context (RunContext): Run workspace to use (defaults to RunContext.from_env(), i.e. Workspaces/)
+    Returns:
+        Optional[str]: Path of the generated report, or None if the pipeline failed
     """
+    context = context or RunContext.from_env()
+    if context.run_id:
+        log_info(f"Run {context.run_id} in {context.workspace_dir}")
+
     log_stage(f"STEP 1: Generating research plan for: '{topic}'")
-    planner = ResearchPlanner()
+    planner = ResearchPlanner(context=context)
     plan = planner.create_and_save_plan(topic, num_subtopics=num_subtopics)
     if not plan:
         log_error("Failed to generate research plan. Aborting.")
-        return
+        return None
 
     log_stage("STEP 2: Running subagents for all pending tasks")
-    run_all_pending_tasks()
+    run_all_pending_tasks(context=context)
 
     log_stage("STEP 3: Generating final report")
     # Call report.py as a subprocess to ensure fresh environment
-    result = subprocess.run([sys.executable, "report.py"], capture_output=True, text=True)
+    report_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "report.py")
+    result = subprocess.run([sys.executable, report_script, *context.to_args()], capture_output=True, text=True)
     print(result.stdout)
     if result.returncode != 0:
         log_error(f"Report generation failed: {result.stderr}")
-    else:
-        log_success("\n🎉 Research pipeline completed! Report is ready.")
+        return None
+    log_success("\n🎉 Research pipeline completed! Report is ready.")
+    return context.report_path
+
+
+def run_parallel_pipelines(topics: List[str], num_subtopics: int = 8, max_processes: int = None,
+                           root_dir: str = None) -> List[Optional[str]]:
+    """
+    Runs one full pipeline per topic in separate processes, each in its own run workspace.
+    Args:
+        topics (List[str]): Research topics
+        num_subtopics (int): Number of subtopics per topic (default: 8)
+        max_processes (int): Maximum number of concurrent pipelines (default: one per CPU core, capped at len(topics))
+        root_dir (str): Root directory for the run workspaces (default: Workspaces)
+    Returns:
+        List[Optional[str]]: Report path for each topic in input order, None where the pipeline failed
+    """
+    if not topics:
+        return []
+    contexts = [RunContext.new(topic, root_dir or RunContext.from_env().root_dir) for topic in topics]
+    workers = max_processes or min(len(topics), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(run_full_research_pipeline, topic, num_subtopics, context)
+                   for topic, context in zip(topics, contexts)]
+        reports = []
+        for topic, future in zip(topics, futures):
+            try:
+                reports.append(future.result())
+            except Exception as e:
+                log_error(f"Pipeline for '{topic}' failed: {str(e)}")
+                reports.append(None)
+        return reports
 
 
 if __name__ == "__main__":
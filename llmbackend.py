@@ -0,0 +1,488 @@
+"""
+LLM Backend Module
+This module builds the language models used by the planner, the subagents and the report
+generator. The backend is chosen with DEEPRESEARCH_LLM_BACKEND: "gemini" (default) talks to
+Google Gemini, "fake" uses a deterministic local stand-in that returns scripted research
+plans, scripted web_search/save_research_data tool calls and a streamed report, so the
+orchestration can be load-tested without an API quota. Clients are built once per model and
+settings in a shared registry and reused by every planner, subagent and report call.
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, SystemMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from llmcache import cached_text_stream, get_cache_mode, get_llm_cache
+
+
+GEMINI = "gemini"
+FAKE = "fake"
+BACKENDS = (GEMINI, FAKE)
+
+# Fake backend defaults, each overridable through the environment
+DEFAULT_FAKE_LATENCY = 0.0            # DEEPRESEARCH_FAKE_LATENCY: seconds added to every call
+DEFAULT_FAKE_TOKENS_PER_SECOND = 0.0  # DEEPRESEARCH_FAKE_TOKENS_PER_SECOND: output rate, 0 means instant
+DEFAULT_FAKE_SEARCHES = 3             # DEEPRESEARCH_FAKE_SEARCHES: web_search calls per subagent
+DEFAULT_FAKE_REPORT_TOKENS = 2000     # DEEPRESEARCH_FAKE_REPORT_TOKENS: length of the streamed report
+DEFAULT_FAKE_CHUNK_TOKENS = 50        # DEEPRESEARCH_FAKE_CHUNK_TOKENS: tokens per streamed report chunk
+
+# DEEPRESEARCH_LLM_WARMUP: "build" constructs clients up front, "request" also sends a short
+# prompt to open the connection, "off" leaves construction to the first caller
+WARMUP_MODES = ("off", "build", "request")
+DEFAULT_WARMUP_MODE = "build"
+WARMUP_PROMPT = "Reply with OK."
+
+
+def get_backend_name() -> str:
+    """
+    Get the configured LLM backend
+
+    Returns:
+        str: "gemini" or "fake"
+
+    Raises:
+        ValueError: If DEEPRESEARCH_LLM_BACKEND names an unknown backend
+    """
+    backend = os.getenv('DEEPRESEARCH_LLM_BACKEND', GEMINI).strip().lower() or GEMINI
+    if backend not in BACKENDS:
+        raise ValueError(f"DEEPRESEARCH_LLM_BACKEND must be one of {BACKENDS}, got '{backend}'")
+    return backend
+
+
+def _ensure_api_key(gemini_api_key: Optional[str] = None) -> str:
+    """Export the Gemini key as GOOGLE_API_KEY, falling back to GEMINI_API_KEY"""
+    if gemini_api_key:
+        os.environ["GOOGLE_API_KEY"] = gemini_api_key
+    elif not os.getenv("GOOGLE_API_KEY"):
+        # Try to get from GEMINI_API_KEY as fallback
+        gemini_key = os.getenv("GEMINI_API_KEY")
+        if gemini_key:
+            os.environ["GOOGLE_API_KEY"] = gemini_key
+        else:
+            raise ValueError("GOOGLE_API_KEY or GEMINI_API_KEY not found in environment variables. Please set it in your .env file or pass it as a parameter.")
+    return os.environ["GOOGLE_API_KEY"]
+
+
+def _env_float(name: str, default: float) -> float:
+    """Read a float setting from the environment"""
+    value = os.getenv(name)
+    return float(value) if value not in (None, '') else default
+
+
+def _simulate_generation(latency: float, tokens_per_second: float, text: str):
+    """Sleep for the fixed latency plus the time needed to emit text at the configured rate"""
+    delay = latency
+    if tokens_per_second > 0:
+        delay += _count_tokens(text) / tokens_per_second
+    if delay > 0:
+        time.sleep(delay)
+
+
+def _count_tokens(text: str) -> int:
+    """Rough token count used for simulated output rates"""
+    return len(text.split())
+
+
+class FakeResearchChatModel(BaseChatModel):
+    """
+    Deterministic chat model that plays the planner and subagent roles from scripts
+    """
+
+    latency: float = DEFAULT_FAKE_LATENCY
+    tokens_per_second: float = DEFAULT_FAKE_TOKENS_PER_SECOND
+    searches_per_task: int = DEFAULT_FAKE_SEARCHES
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-research"
+
+    def bind_tools(self, tools: List[Any], **kwargs: Any):
+        """Bind tools the same way tool-calling chat models do"""
+        return self.bind(tools=[convert_to_openai_tool(tool) for tool in tools], **kwargs)
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        """Answer with a scripted tool call when tools are bound, otherwise with a research plan"""
+        if kwargs.get('tools'):
+            message = self._next_agent_step(messages)
+        else:
+            message = AIMessage(content=self._research_plan(messages[-1].content if messages else ''))
+
+        _simulate_generation(self.latency, self.tokens_per_second,
+                             message.content or json.dumps([call['args'] for call in message.tool_calls]))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _research_plan(self, prompt: str) -> str:
+        """Build plan JSON in the format the planner prompt asks for"""
+        topic_match = re.search(r'for the topic: "(.*?)"', prompt, re.S)
+        count_match = re.search(r'with (\d+) distinct subtopics', prompt)
+        topic = topic_match.group(1) if topic_match else "the research topic"
+        count = int(count_match.group(1)) if count_match else 8
+
+        tasks = []
+        for i in range(1, count + 1):
+            tasks.append({
+                "task_id": str(i),
+                "subtopic": f"Aspect {i} of {topic[:60]}",
+                "description": f"Investigate aspect {i} of {topic}, covering background, current data, key players and open questions.",
+                "estimated_searches": self.searches_per_task,
+                "key_areas": [f"area {i}.1", f"area {i}.2", f"area {i}.3"],
+                "status": "pending"
+            })
+        return json.dumps({"tasks": tasks}, indent=2)
+
+    def _next_agent_step(self, messages: List[BaseMessage]) -> AIMessage:
+        """Script the subagent loop: N searches, one save, then a final answer"""
+        system_text = next((m.content for m in messages if isinstance(m, SystemMessage)), '')
+        subtopic_match = re.search(r'- Specific Subtopic: (.*)', system_text)
+        subtopic = subtopic_match.group(1).strip() if subtopic_match else "research subtopic"
+
+        tool_results = [m for m in messages if isinstance(m, ToolMessage)]
+        step = len(tool_results)
+
+        if step < self.searches_per_task:
+            return self._tool_call("web_search", {"query": f"{subtopic} part {step + 1}"}, step)
+
+        if step == self.searches_per_task:
+            findings = "\n".join(f"- Finding {i + 1}: {str(result.content)[:200]}"
+                                 for i, result in enumerate(tool_results))
+            return self._tool_call("save_research_data",
+                                   {"section_title": subtopic, "content": f"### Findings\n{findings}"}, step)
+
+        return AIMessage(content=f"Research on '{subtopic}' is complete and saved.")
+
+    @staticmethod
+    def _tool_call(name: str, args: Dict[str, Any], step: int) -> AIMessage:
+        """Build an AI message carrying a single tool call with a step-derived id"""
+        return AIMessage(content="", tool_calls=[{"name": name, "args": args, "id": f"call_{step}_{name}"}])
+
+
+def create_chat_model(model_name: str, temperature: float, max_tokens: int,
+                      gemini_api_key: Optional[str] = None) -> BaseChatModel:
+    """
+    Build the chat model for the configured backend
+
+    Args:
+        model_name (str): Gemini model to use
+        temperature (float): Sampling temperature
+        max_tokens (int): Maximum output tokens
+        gemini_api_key (Optional[str]): API key for Gemini (if not set in environment)
+
+    Returns:
+        BaseChatModel: ChatGoogleGenerativeAI, or FakeResearchChatModel for the fake backend,
+            using the persistent response cache unless DEEPRESEARCH_LLM_CACHE=off
+    """
+    cache = get_llm_cache()
+    if get_backend_name() == FAKE:
+        return FakeResearchChatModel(
+            latency=_env_float('DEEPRESEARCH_FAKE_LATENCY', DEFAULT_FAKE_LATENCY),
+            tokens_per_second=_env_float('DEEPRESEARCH_FAKE_TOKENS_PER_SECOND', DEFAULT_FAKE_TOKENS_PER_SECOND),
+            searches_per_task=int(_env_float('DEEPRESEARCH_FAKE_SEARCHES', DEFAULT_FAKE_SEARCHES)),
+            cache=cache
+        )
+
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    _ensure_api_key(gemini_api_key)
+    return ChatGoogleGenerativeAI(
+        model=model_name,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        cache=cache
+    )
+
+
+def _key_fingerprint(api_key: Optional[str]) -> Optional[str]:
+    """Identify an API key in registry keys without keeping the key itself"""
+    return hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:12] if api_key else None
+
+
+class LLMClientRegistry:
+    """
+    Thread-safe registry that builds each LLM client once per distinct configuration and shares it
+    """
+
+    def __init__(self):
+        """Initialize the LLMClientRegistry"""
+        self.clients: Dict[Tuple, Any] = {}
+        self.build_locks: Dict[Tuple, threading.Lock] = {}
+        self.stats: Dict[Tuple, Dict[str, Any]] = {}
+        self.lock = threading.Lock()
+
+    def get(self, key: Tuple, factory: Callable[[], Any], label: str = '') -> Any:
+        """
+        Get the client for a key, building it with factory on first use
+
+        Concurrent first callers for the same key wait for a single build instead of each
+        constructing their own client.
+
+        Args:
+            key (Tuple): Hashable description of the client configuration
+            factory (Callable[[], Any]): Builds the client
+            label (str): Readable name for stats
+
+        Returns:
+            Any: The shared client
+        """
+        with self.lock:
+            client = self.clients.get(key)
+            if client is not None:
+                self.stats[key]['hits'] += 1
+                return client
+            build_lock = self.build_locks.setdefault(key, threading.Lock())
+
+        with build_lock:
+            with self.lock:
+                client = self.clients.get(key)
+                if client is not None:
+                    self.stats[key]['hits'] += 1
+                    return client
+            started = time.perf_counter()
+            client = factory()
+            elapsed = time.perf_counter() - started
+            with self.lock:
+                self.clients[key] = client
+                self.stats[key] = {'label': label or repr(key), 'build_seconds': elapsed,
+                                   'warmup_seconds': 0.0, 'hits': 0}
+            return client
+
+    def record_warmup(self, key: Tuple, seconds: float):
+        """Add warm-up request time to a client's stats"""
+        with self.lock:
+            if key in self.stats:
+                self.stats[key]['warmup_seconds'] += seconds
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Summarize client construction and reuse
+
+        Returns:
+            Dict[str, Any]: Totals ('clients', 'hits', 'build_seconds', 'warmup_seconds')
+                and per-client entries under 'by_client'
+        """
+        with self.lock:
+            entries = [dict(entry) for entry in self.stats.values()]
+        return {
+            'clients': len(entries),
+            'hits': sum(entry['hits'] for entry in entries),
+            'build_seconds': round(sum(entry['build_seconds'] for entry in entries), 4),
+            'warmup_seconds': round(sum(entry['warmup_seconds'] for entry in entries), 4),
+            'by_client': entries
+        }
+
+    def clear(self):
+        """Drop all clients, e.g. after credentials change"""
+        with self.lock:
+            self.clients.clear()
+            self.build_locks.clear()
+            self.stats.clear()
+
+
+_shared_registry: Optional[LLMClientRegistry] = None
+_shared_registry_lock = threading.Lock()
+
+
+def get_llm_registry() -> LLMClientRegistry:
+    """
+    Get the process-wide shared LLMClientRegistry, creating it on first use
+
+    Returns:
+        LLMClientRegistry: The shared registry
+    """
+    global _shared_registry
+    if _shared_registry is None:
+        with _shared_registry_lock:
+            if _shared_registry is None:
+                _shared_registry = LLMClientRegistry()
+    return _shared_registry
+
+
+def _chat_model_key(model_name: str, temperature: float, max_tokens: int,
+                    gemini_api_key: Optional[str]) -> Tuple:
+    """Registry key of a chat model configuration"""
+    return ("chat", get_backend_name(), model_name, float(temperature), int(max_tokens),
+            _key_fingerprint(gemini_api_key), get_cache_mode() != "off")
+
+
+def get_chat_model(model_name: str, temperature: float, max_tokens: int,
+                   gemini_api_key: Optional[str] = None) -> BaseChatModel:
+    """
+    Get the shared chat model for a configuration, building it on first use
+
+    Chat models are stateless between calls (bind_tools returns a new runnable), so one
+    instance per model and settings serves every planner and subagent in the process.
+
+    Args:
+        model_name (str): Gemini model to use
+        temperature (float): Sampling temperature
+        max_tokens (int): Maximum output tokens
+        gemini_api_key (Optional[str]): API key for Gemini (if not set in environment)
+
+    Returns:
+        BaseChatModel: The shared chat model
+    """
+    key = _chat_model_key(model_name, temperature, max_tokens, gemini_api_key)
+    return get_llm_registry().get(
+        key,
+        lambda: create_chat_model(model_name, temperature, max_tokens, gemini_api_key),
+        label=f"chat:{key[1]}:{model_name}:temperature={temperature}:max_tokens={max_tokens}"
+    )
+
+
+def warm_up_chat_models(configs: Sequence[Tuple[str, float, int]], gemini_api_key: Optional[str] = None,
+                        mode: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Build (and optionally exercise) chat models before the workers that need them start
+
+    Args:
+        configs (Sequence[Tuple[str, float, int]]): (model_name, temperature, max_tokens) per model
+        gemini_api_key (Optional[str]): API key for Gemini (if not set in environment)
+        mode (Optional[str]): "off", "build" or "request" (default: DEEPRESEARCH_LLM_WARMUP or "build")
+
+    Returns:
+        Dict[str, Any]: Registry stats after warm-up
+    """
+    mode = (mode or os.getenv('DEEPRESEARCH_LLM_WARMUP', DEFAULT_WARMUP_MODE)).strip().lower()
+    if mode not in WARMUP_MODES:
+        raise ValueError(f"DEEPRESEARCH_LLM_WARMUP must be one of {WARMUP_MODES}, got '{mode}'")
+    registry = get_llm_registry()
+    if mode == "off":
+        return registry.get_stats()
+
+    for model_name, temperature, max_tokens in configs:
+        model = get_chat_model(model_name, temperature, max_tokens, gemini_api_key)
+        if mode == "request":
+            started = time.perf_counter()
+            try:
+                model.invoke(WARMUP_PROMPT)
+            except Exception as e:
+                # A failed warm-up only means the first real call pays the connection cost
+                print(f"Warning: LLM warm-up request failed: {str(e)}")
+            registry.record_warmup(_chat_model_key(model_name, temperature, max_tokens, gemini_api_key),
+                                   time.perf_counter() - started)
+    return registry.get_stats()
+
+
+class FakeReportClient:
+    """
+    Stand-in for genai.Client that streams a deterministic report
+    """
+
+    def __init__(self, latency: float = DEFAULT_FAKE_LATENCY,
+                 tokens_per_second: float = DEFAULT_FAKE_TOKENS_PER_SECOND,
+                 report_tokens: int = DEFAULT_FAKE_REPORT_TOKENS,
+                 chunk_tokens: int = DEFAULT_FAKE_CHUNK_TOKENS):
+        """
+        Initialize the FakeReportClient
+
+        Args:
+            latency (float): Seconds before the first chunk (default: 0)
+            tokens_per_second (float): Streaming rate, 0 for instant (default: 0)
+            report_tokens (int): Approximate length of the report in tokens (default: 2000)
+            chunk_tokens (int): Tokens per streamed chunk (default: 50)
+        """
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.report_tokens = report_tokens
+        self.chunk_tokens = max(1, chunk_tokens)
+        self.models = SimpleNamespace(generate_content_stream=self.generate_content_stream)
+
+    def generate_content_stream(self, model: str, contents: Any = None, config: Any = None,
+                                prompt: str = '') -> Iterator[SimpleNamespace]:
+        """
+        Stream a report as chunks exposing .text, like genai's streaming responses
+
+        Args:
+            model (str): Ignored model name
+            contents (Any): Ignored request contents
+            config (Any): Ignored generation config
+            prompt (str): Prompt text, used to title the report
+
+        Yields:
+            SimpleNamespace: Chunks with a .text attribute
+        """
+        topic_match = re.search(r'report on:\s*"(.*?)"', prompt, re.S)
+        topic = topic_match.group(1) if topic_match else "Research Topic"
+
+        # Sections of 200 filler tokens until the requested report length is reached
+        tokens = [f"# Report: {topic}"]
+        for i in range(self.report_tokens):
+            if i % 200 == 0:
+                tokens.append(f"\n\n## Section {i // 200 + 1}\n\n")
+            tokens.append(f"finding{i % 97} ")
+
+        if self.latency > 0:
+            time.sleep(self.latency)
+        for start in range(0, len(tokens), self.chunk_tokens):
+            text = ''.join(tokens[start:start + self.chunk_tokens])
+            _simulate_generation(0.0, self.tokens_per_second, text)
+            yield SimpleNamespace(text=text)
+
+
+def stream_report(prompt: str, model: str = "gemini-2.5-flash", temperature: float = 0.4) -> Iterator[str]:
+    """
+    Stream the final report text from the configured backend
+
+    Args:
+        prompt (str): Complete report prompt
+        model (str): Gemini model to use (default: "gemini-2.5-flash")
+        temperature (float): Sampling temperature (default: 0.4)
+
+    Yields:
+        str: Report text chunks, replayed from the response cache when the prompt is unchanged
+    """
+    llm_string = f"report:{get_backend_name()}:{model}:temperature={temperature}"
+    yield from cached_text_stream(prompt, llm_string, _generate_report(prompt, model, temperature))
+
+
+def _generate_report(prompt: str, model: str, temperature: float) -> Iterator[str]:
+    """Stream the report from the configured backend without caching"""
+    backend = get_backend_name()
+    if backend == FAKE:
+        client = get_llm_registry().get(("report", FAKE), lambda: FakeReportClient(
+            latency=_env_float('DEEPRESEARCH_FAKE_LATENCY', DEFAULT_FAKE_LATENCY),
+            tokens_per_second=_env_float('DEEPRESEARCH_FAKE_TOKENS_PER_SECOND', DEFAULT_FAKE_TOKENS_PER_SECOND),
+            report_tokens=int(_env_float('DEEPRESEARCH_FAKE_REPORT_TOKENS', DEFAULT_FAKE_REPORT_TOKENS)),
+            chunk_tokens=int(_env_float('DEEPRESEARCH_FAKE_CHUNK_TOKENS', DEFAULT_FAKE_CHUNK_TOKENS))
+        ), label="report:fake")
+        for chunk in client.models.generate_content_stream(model=model, prompt=prompt):
+            yield chunk.text
+        return
+
+    from google import genai
+    from google.genai import types
+
+    api_key = os.environ.get("GEMINI_API_KEY")
+    client = get_llm_registry().get(("report", backend, _key_fingerprint(api_key)),
+                                    lambda: genai.Client(api_key=api_key), label=f"report:{backend}")
+    contents = [
+        types.Content(
+            role="user",
+            parts=[
+                types.Part.from_text(text=prompt),
+            ],
+        ),
+    ]
+    generate_content_config = types.GenerateContentConfig(
+        temperature=temperature,
+        thinking_config=types.ThinkingConfig(
+            thinking_budget=-1,
+        ),
+    )
+    for chunk in client.models.generate_content_stream(
+        model=model,
+        contents=contents,
+        config=generate_content_config,
+    ):
+        if chunk.text:
+            yield chunk.text
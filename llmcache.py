@@ -0,0 +1,314 @@
+"""
+LLM Cache Module
+This module provides a persistent, SQLite-backed LangChain cache for LLM responses. Entries
+are keyed by a hash of the model parameters and the normalized prompt, which for agent steps
+includes the whole tool-call history, so reruns on unchanged inputs skip the API. Entries
+expire after a TTL and the least recently used ones are evicted when the cache grows past its
+size limit. The report stream is cached through the same store.
+
+Configuration:
+    DEEPRESEARCH_LLM_CACHE            "on" (default), "refresh" (write only) or "off" (bypass)
+    DEEPRESEARCH_LLM_CACHE_PATH       SQLite file (default: Workspaces/cache/llm.sqlite)
+    DEEPRESEARCH_LLM_CACHE_TTL        Entry lifetime in seconds, 0 for no expiry (default: 7 days)
+    DEEPRESEARCH_LLM_CACHE_MAX_MB     Size limit in megabytes (default: 256)
+"""
+
+import os
+import json
+import time
+import zlib
+import hashlib
+import sqlite3
+import threading
+from typing import Any, Dict, Iterator, Optional
+
+from langchain_core.caches import BaseCache, RETURN_VAL_TYPE
+from langchain_core.messages import message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, Generation
+
+
+DEFAULT_CACHE_PATH = os.path.join("Workspaces", "cache", "llm.sqlite")
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_MAX_MB = 256
+CACHE_MODES = ("on", "refresh", "off")
+
+# Message fields that change between otherwise identical calls (ids, token counts, latency)
+VOLATILE_MESSAGE_FIELDS = {"id", "tool_call_id", "response_metadata", "usage_metadata", "additional_kwargs"}
+
+# Cached report text is replayed in chunks of this many characters
+REPLAY_CHUNK_CHARS = 2000
+
+
+def _strip_volatile(value: Any, in_message: bool = False) -> Any:
+    """Recursively drop volatile fields from serialized LangChain messages"""
+    if isinstance(value, list):
+        return [_strip_volatile(item, in_message) for item in value]
+    if not isinstance(value, dict):
+        return value
+    if value.get("lc") == 1 and "kwargs" in value:
+        # Serialized object: its "id" is the class path and must be kept
+        return {**value, "kwargs": _strip_volatile(value["kwargs"], in_message=True)}
+    if in_message:
+        return {key: _strip_volatile(item, in_message) for key, item in value.items()
+                if key not in VOLATILE_MESSAGE_FIELDS}
+    return {key: _strip_volatile(item, in_message) for key, item in value.items()}
+
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    Normalize a prompt so that calls differing only in volatile details share a cache entry
+
+    Serialized chat messages lose their ids, tool call ids and response metadata; plain
+    text loses trailing whitespace.
+
+    Args:
+        prompt (str): Serialized messages (JSON) or plain prompt text
+
+    Returns:
+        str: The normalized prompt
+    """
+    try:
+        data = json.loads(prompt)
+    except ValueError:
+        return "\n".join(line.rstrip() for line in prompt.strip().splitlines())
+    return json.dumps(_strip_volatile(data), sort_keys=True, ensure_ascii=False)
+
+
+def _encode_generations(generations: RETURN_VAL_TYPE) -> bytes:
+    """Serialize generations with the stable message dict format and compress them"""
+    items = []
+    for generation in generations:
+        if isinstance(generation, ChatGeneration):
+            items.append({'message': message_to_dict(generation.message), 'generation_info': generation.generation_info})
+        else:
+            items.append({'text': generation.text, 'generation_info': generation.generation_info})
+    return zlib.compress(json.dumps(items, ensure_ascii=False).encode('utf-8'))
+
+
+def _decode_generations(value: bytes) -> RETURN_VAL_TYPE:
+    """Rebuild generations stored by _encode_generations"""
+    generations = []
+    for item in json.loads(zlib.decompress(value)):
+        if 'message' in item:
+            generations.append(ChatGeneration(message=messages_from_dict([item['message']])[0],
+                                              generation_info=item.get('generation_info')))
+        else:
+            generations.append(Generation(text=item['text'], generation_info=item.get('generation_info')))
+    return generations
+
+
+def cache_key(prompt: str, llm_string: str) -> str:
+    """
+    Build the cache key of a call
+
+    Args:
+        prompt (str): Prompt as passed to the cache
+        llm_string (str): Model and parameter description
+
+    Returns:
+        str: Hex SHA-256 digest
+    """
+    return hashlib.sha256(f"{llm_string}\n{normalize_prompt(prompt)}".encode('utf-8')).hexdigest()
+
+
+class SQLiteLLMCache(BaseCache):
+    """
+    LangChain cache storing compressed responses in SQLite with TTL and LRU size eviction
+    """
+
+    def __init__(self, db_path: str = DEFAULT_CACHE_PATH, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024, read: bool = True):
+        """
+        Initialize the SQLiteLLMCache
+
+        Args:
+            db_path (str): SQLite database file (default: Workspaces/cache/llm.sqlite)
+            ttl_seconds (float): Entry lifetime in seconds, 0 for no expiry (default: 7 days)
+            max_bytes (int): Total size of stored responses before eviction (default: 256 MB)
+            read (bool): Serve lookups from the cache; False only records responses (default: True)
+        """
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.read = read
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                llm_string TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                size INTEGER NOT NULL,
+                value BLOB NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at)")
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        """
+        Look up the cached generations of a call
+
+        Args:
+            prompt (str): Serialized prompt
+            llm_string (str): Model and parameter description
+
+        Returns:
+            Optional[RETURN_VAL_TYPE]: Cached generations, or None on a miss or expired entry
+        """
+        if not self.read:
+            return None
+        key = cache_key(prompt, llm_string)
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute("SELECT created_at, value FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.ttl_seconds and now - row[0] > self.ttl_seconds:
+                self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self.conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return _decode_generations(row[1])
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE):
+        """
+        Store the generations of a call and evict old entries if the cache is over its size limit
+
+        Args:
+            prompt (str): Serialized prompt
+            llm_string (str): Model and parameter description
+            return_val (RETURN_VAL_TYPE): Generations to store
+        """
+        key = cache_key(prompt, llm_string)
+        value = _encode_generations(return_val)
+        now = time.time()
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, llm_string, created_at, accessed_at, size, value) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, llm_string, now, now, len(value), value)
+                )
+                self._evict_locked(now)
+                self.conn.execute("COMMIT")
+            except sqlite3.Error:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def _evict_locked(self, now: float):
+        """Drop expired entries, then least recently used ones until under the size limit"""
+        if self.ttl_seconds:
+            self.conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,))
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Evict down to 90% so the next few inserts do not trigger another pass
+        target = int(self.max_bytes * 0.9)
+        evict = []
+        for key, size in self.conn.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+            if total <= target:
+                break
+            evict.append((key,))
+            total -= size
+        self.conn.executemany("DELETE FROM responses WHERE key = ?", evict)
+
+    def clear(self, **kwargs: Any):
+        """Delete every cached response"""
+        with self.lock:
+            self.conn.execute("DELETE FROM responses")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Summarize cache usage
+
+        Returns:
+            Dict[str, Any]: 'entries', 'bytes', 'hits' and 'misses' (hits and misses for this process)
+        """
+        with self.lock:
+            entries, size = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+            return {'entries': entries, 'bytes': size, 'hits': self.hits, 'misses': self.misses}
+
+
+def get_cache_mode() -> str:
+    """
+    Get the configured cache mode
+
+    Returns:
+        str: "on", "refresh" or "off"
+
+    Raises:
+        ValueError: If DEEPRESEARCH_LLM_CACHE names an unknown mode
+    """
+    mode = os.getenv('DEEPRESEARCH_LLM_CACHE', 'on').strip().lower() or 'on'
+    if mode not in CACHE_MODES:
+        raise ValueError(f"DEEPRESEARCH_LLM_CACHE must be one of {CACHE_MODES}, got '{mode}'")
+    return mode
+
+
+_shared_cache: Optional[SQLiteLLMCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[SQLiteLLMCache]:
+    """
+    Get the process-wide shared LLM cache configured by the environment
+
+    Returns:
+        Optional[SQLiteLLMCache]: The shared cache, or None when DEEPRESEARCH_LLM_CACHE=off
+    """
+    global _shared_cache
+    mode = get_cache_mode()
+    if mode == "off":
+        return None
+    if _shared_cache is None:
+        with _shared_cache_lock:
+            if _shared_cache is None:
+                ttl = os.getenv('DEEPRESEARCH_LLM_CACHE_TTL')
+                max_mb = os.getenv('DEEPRESEARCH_LLM_CACHE_MAX_MB')
+                _shared_cache = SQLiteLLMCache(
+                    db_path=os.getenv('DEEPRESEARCH_LLM_CACHE_PATH') or DEFAULT_CACHE_PATH,
+                    ttl_seconds=float(ttl) if ttl else DEFAULT_TTL_SECONDS,
+                    max_bytes=int(float(max_mb) * 1024 * 1024) if max_mb else DEFAULT_MAX_MB * 1024 * 1024
+                )
+    _shared_cache.read = mode == "on"
+    return _shared_cache
+
+
+def cached_text_stream(prompt: str, llm_string: str, stream: Iterator[str]) -> Iterator[str]:
+    """
+    Serve a text stream from the cache, or pass it through and cache it once it completes
+
+    Args:
+        prompt (str): Prompt text
+        llm_string (str): Model and parameter description
+        stream (Iterator[str]): Lazily evaluated source stream; not started on a cache hit
+
+    Yields:
+        str: Text chunks
+    """
+    cache = get_llm_cache()
+    if cache is None:
+        yield from stream
+        return
+
+    cached = cache.lookup(prompt, llm_string)
+    if cached:
+        text = cached[0].text
+        for start in range(0, len(text), REPLAY_CHUNK_CHARS):
+            yield text[start:start + REPLAY_CHUNK_CHARS]
+        return
+
+    parts = []
+    for chunk in stream:
+        parts.append(chunk)
+        yield chunk
+    # Only complete responses are stored; an interrupted stream never reaches this point
+    cache.update(prompt, llm_string, [Generation(text="".join(parts))])
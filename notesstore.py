@@ -0,0 +1,274 @@
+"""
+Notes Store Module
+This module keeps research notes in one append-only markdown shard per task under
+Workspaces/notes, so subagents never contend for a shared file. Every section is written
+in a single append together with a content hash, duplicate sections are skipped, and a
+merge step rebuilds Workspaces/research.md from the shards in research plan order.
+"""
+
+import os
+import re
+import hashlib
+import tempfile
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from taskstore import get_task_store
+
+
+DEFAULT_NOTES_DIR = os.path.join("Workspaces", "notes")
+DEFAULT_OUTPUT_PATH = os.path.join("Workspaces", "research.md")
+UNASSIGNED_TASK = "unassigned"
+
+# Each section in a shard starts with this marker line giving its hash and its length in
+# characters, so content containing "---" or "##" never confuses the parser
+SECTION_MARKER = "<!-- section sha256={sha256} length={length} -->\n"
+MARKER_PATTERN = re.compile(r"<!-- section sha256=(?P<sha256>[0-9a-f]{64}) length=(?P<length>\d+) -->\n")
+HEADER_PATTERN = re.compile(r"## (?P<title>.*)\n\*Updated: (?P<updated>.*)\*\n\n")
+SECTION_END = "\n\n---\n"
+
+
+def section_hash(section_title: str, content: str) -> str:
+    """
+    Hash a section's title and content
+
+    Args:
+        section_title (str): Section title
+        content (str): Section body
+
+    Returns:
+        str: Hex SHA-256 digest
+    """
+    return hashlib.sha256(f"{section_title.strip()}\n{content.strip()}".encode('utf-8')).hexdigest()
+
+
+class NotesStore:
+    """
+    Per-task append-only note shards with a deterministic merge into research.md
+    """
+
+    def __init__(self, notes_dir: str = DEFAULT_NOTES_DIR, output_path: str = DEFAULT_OUTPUT_PATH):
+        """
+        Initialize the NotesStore
+
+        Args:
+            notes_dir (str): Directory holding one shard per task (default: Workspaces/notes)
+            output_path (str): Merged research file (default: Workspaces/research.md)
+        """
+        self.notes_dir = notes_dir
+        self.output_path = output_path
+        self.locks: Dict[str, threading.Lock] = {}
+        self.known_hashes: Dict[str, set] = {}
+        self.lock = threading.Lock()
+        os.makedirs(notes_dir, exist_ok=True)
+
+    def shard_path(self, task_id: Optional[str]) -> str:
+        """
+        Path of the shard for a task
+
+        Args:
+            task_id (Optional[str]): Task ID, or None for notes saved outside a task
+
+        Returns:
+            str: Shard file path
+        """
+        safe_id = re.sub(r'[^A-Za-z0-9_-]', '_', str(task_id)) if task_id else UNASSIGNED_TASK
+        return os.path.join(self.notes_dir, f"task_{safe_id}.md")
+
+    def _shard_lock(self, path: str) -> threading.Lock:
+        """Get the lock guarding appends to one shard"""
+        with self.lock:
+            lock = self.locks.get(path)
+            if lock is None:
+                lock = threading.Lock()
+                self.locks[path] = lock
+            return lock
+
+    def append_section(self, task_id: Optional[str], section_title: str, content: str) -> Dict[str, Any]:
+        """
+        Append a section to a task's shard unless the same section is already there
+
+        Args:
+            task_id (Optional[str]): Task the notes belong to
+            section_title (str): Section title
+            content (str): Section body in markdown
+
+        Returns:
+            Dict[str, Any]: 'path', 'sha256' and 'duplicate' (True if nothing was written)
+        """
+        path = self.shard_path(task_id)
+        digest = section_hash(section_title, content)
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        body = f"## {section_title.strip()}\n*Updated: {timestamp}*\n\n{content.strip()}{SECTION_END}"
+        section = SECTION_MARKER.format(sha256=digest, length=len(body)) + body
+
+        with self._shard_lock(path):
+            hashes = self.known_hashes.get(path)
+            if hashes is None:
+                hashes = {s['sha256'] for s in self._parse_shard(path)}
+                self.known_hashes[path] = hashes
+            if digest in hashes:
+                return {'path': path, 'sha256': digest, 'duplicate': True}
+
+            # One write() on an O_APPEND descriptor, so a section is never split or interleaved
+            data = section.encode('utf-8')
+            fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                written = os.write(fd, data)
+                while written < len(data):
+                    written += os.write(fd, data[written:])
+            finally:
+                os.close(fd)
+            hashes.add(digest)
+
+        return {'path': path, 'sha256': digest, 'duplicate': False}
+
+    @staticmethod
+    def _parse_shard(path: str) -> List[Dict[str, str]]:
+        """Read the sections of one shard file, ignoring a torn trailing section"""
+        if not os.path.exists(path):
+            return []
+        # newline='' keeps the recorded lengths exact; a torn multi-byte tail must not raise
+        with open(path, 'r', encoding='utf-8', errors='replace', newline='') as f:
+            text = f.read()
+
+        sections = []
+        position = 0
+        while True:
+            marker = MARKER_PATTERN.search(text, position)
+            if marker is None:
+                break
+            start = marker.end()
+            end = start + int(marker.group('length'))
+            body = text[start:end]
+            header = HEADER_PATTERN.match(body)
+            if len(body) < end - start or header is None or not body.endswith(SECTION_END):
+                # Partial write from an interrupted process; resynchronize on the next marker
+                position = start
+                continue
+            sections.append({
+                'sha256': marker.group('sha256'),
+                'title': header.group('title'),
+                'updated': header.group('updated'),
+                'content': body[header.end():-len(SECTION_END)]
+            })
+            position = end
+        return sections
+
+    def read_sections(self, task_id: Optional[str]) -> List[Dict[str, str]]:
+        """
+        Read the sections saved for a task
+
+        Args:
+            task_id (Optional[str]): Task ID, or None for unassigned notes
+
+        Returns:
+            List[Dict[str, str]]: Sections with 'title', 'updated', 'content' and 'sha256'
+        """
+        path = self.shard_path(task_id)
+        with self._shard_lock(path):
+            return self._parse_shard(path)
+
+    def merge(self, plan_path: Optional[str] = None) -> str:
+        """
+        Rebuild the research file from all shards
+
+        Shards of plan tasks come first in plan order, followed by any other shards sorted
+        by name. Sections with the same hash are only written once. If there are no shards
+        at all, the existing research file is left untouched.
+
+        Args:
+            plan_path (Optional[str]): Research plan of this run that defines the task order;
+                without one, every shard is merged in name order and no task store is opened
+
+        Returns:
+            str: Path of the merged research file
+        """
+        shards = sorted(
+            os.path.join(self.notes_dir, name) for name in os.listdir(self.notes_dir)
+            if name.startswith("task_") and name.endswith(".md")
+        )
+        if not shards:
+            # Nothing was saved through the shards; leave an existing research file alone
+            return self.output_path
+
+        # Never fall back to the default plan: that would read (or create) another run's task store
+        plan = (get_task_store(plan_path).get_plan() or {}) if plan_path else {}
+        ordered = [path for path in (self.shard_path(task.get("task_id")) for task in plan.get("tasks", []))
+                   if path in shards]
+        ordered += [path for path in shards if path not in ordered]
+
+        seen = set()
+        parts = []
+        for path in ordered:
+            with self._shard_lock(path):
+                sections = self._parse_shard(path)
+            for section in sections:
+                if section['sha256'] in seen:
+                    continue
+                seen.add(section['sha256'])
+                parts.append(f"\n\n## {section['title']}\n*Updated: {section['updated']}*\n\n{section['content']}{SECTION_END}")
+
+        directory = os.path.dirname(self.output_path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(''.join(parts))
+            os.replace(tmp_path, self.output_path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return self.output_path
+
+    def clear(self):
+        """Delete every shard, e.g. when a new research plan starts"""
+        with self.lock:
+            for name in os.listdir(self.notes_dir):
+                if name.startswith("task_") and name.endswith(".md"):
+                    os.remove(os.path.join(self.notes_dir, name))
+            self.known_hashes.clear()
+
+
+_shared_stores: Dict[Tuple[str, str], NotesStore] = {}
+_shared_stores_lock = threading.Lock()
+
+
+def get_notes_store(notes_dir: Optional[str] = None, output_path: Optional[str] = None) -> NotesStore:
+    """
+    Get the process-wide shared NotesStore for a notes directory, creating it on first use
+
+    Args:
+        notes_dir (Optional[str]): Shard directory (default: Workspaces/notes)
+        output_path (Optional[str]): Merged research file (default: Workspaces/research.md)
+
+    Returns:
+        NotesStore: The shared store
+    """
+    notes_dir = notes_dir or DEFAULT_NOTES_DIR
+    output_path = output_path or DEFAULT_OUTPUT_PATH
+    key = (os.path.abspath(notes_dir), os.path.abspath(output_path))
+    with _shared_stores_lock:
+        store = _shared_stores.get(key)
+        if store is None:
+            store = NotesStore(notes_dir, output_path)
+            _shared_stores[key] = store
+        return store
+
+
+def merge_research_notes(plan_path: Optional[str] = None, notes_dir: Optional[str] = None,
+                         output_path: Optional[str] = None) -> str:
+    """
+    Convenience function to rebuild the research file from the task shards
+
+    Args:
+        plan_path (Optional[str]): Research plan that defines the task order (default: name order)
+        notes_dir (Optional[str]): Shard directory (default: Workspaces/notes)
+        output_path (Optional[str]): Merged research file (default: Workspaces/research.md)
+
+    Returns:
+        str: Path of the merged research file
+    """
+    return get_notes_store(notes_dir, output_path).merge(plan_path)
@@ -1,10 +1,9 @@
 # To run this code you need to install the following dependencies:
 # pip install google-genai
 
-import os
 import json
-from google import genai
-from google.genai import types
+from llmbackend import stream_report
+from runcontext import RunContext
 
 
 def load_file(path):
@@ -12,10 +11,15 @@ def load_file(path):
         return f.read()
 
 
-def generate():
-    # Load research plan and research.md
-    plan = json.loads(load_file("Workspaces/research_plan.json"))
-    research_md = load_file("Workspaces/research.md")
+def generate(context: RunContext = None):
+    # Workspace of the run to report on: --run-id/--root-dir, DEEPRESEARCH_RUN_ID, or Workspaces/
+    context = context or RunContext.from_args()
+
+    # Rebuild research.md from the per-task notes, then load it with the research plan
+    # (read from the task store, which has every status update even if the JSON export is older)
+    context.notes_store().merge(context.plan_path)
+    plan = context.task_store().get_plan()
+    research_md = load_file(context.research_path)
 
     # Build the strict and grounded system prompt
     prompt = f"""
@@ -43,34 +47,11 @@ Research Notes (Markdown):
 Now generate the full report below:
 """
 
-    client = genai.Client(
-        api_key=os.environ.get("GEMINI_API_KEY"),
-    )
-
-    model = "gemini-2.5-flash"
-    contents = [
-        types.Content(
-            role="user",
-            parts=[
-                types.Part.from_text(text=prompt),
-            ],
-        ),
-    ]
-    generate_content_config = types.GenerateContentConfig(
-        temperature=0.4,
-        thinking_config=types.ThinkingConfig(
-            thinking_budget=-1,
-        ),
-    )
-
-    output_path = "Workspaces/report.md"
+    output_path = context.report_path
     with open(output_path, "w", encoding="utf-8") as output_file:
-        for chunk in client.models.generate_content_stream(
-            model=model,
-            contents=contents,
-            config=generate_content_config,
-        ):
-            output_file.write(chunk.text)
+        # Gemini by default; DEEPRESEARCH_LLM_BACKEND=fake streams a local scripted report
+        for text in stream_report(prompt, model="gemini-2.5-flash", temperature=0.4):
+            output_file.write(text)
 
     print(f"\n✅ Report saved to {output_path}")
 
@@ -9,11 +9,16 @@ import json
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
+from llmbackend import get_chat_model
+from taskstore import get_task_store
+from runcontext import RunContext
 
 # Load environment variables
 load_dotenv()
 
+PLANNER_TEMPERATURE = 0.2  # Lower temperature for more structured output
+PLANNER_MAX_TOKENS = 4096  # Higher token limit for detailed plans
+
 
 class ResearchPlanner:
     """
@@ -21,32 +26,29 @@ class ResearchPlanner:
     and manages the research planning workflow.
     """
     
-    def __init__(self, gemini_api_key: str = None, model_name: str = "gemini-2.0-flash-lite"):
+    def __init__(self, gemini_api_key: str = None, model_name: str = "gemini-2.0-flash-lite",
+                 context: RunContext = None):
         """
         Initialize the research planner
         
         Args:
             gemini_api_key (str): API key for Gemini (if not set in environment)
             model_name (str): Gemini model to use
+            context (RunContext): Run whose workspace holds the plan (defaults to RunContext.from_env())
         """
         self.model_name = model_name
-        
-        # Set up Gemini API key
-        if gemini_api_key:
-            os.environ["GOOGLE_API_KEY"] = gemini_api_key
-        elif not os.getenv("GOOGLE_API_KEY"):
-            # Try to get from GEMINI_API_KEY as fallback
-            gemini_key = os.getenv("GEMINI_API_KEY")
-            if gemini_key:
-                os.environ["GOOGLE_API_KEY"] = gemini_key
-            else:
-                raise ValueError("GOOGLE_API_KEY or GEMINI_API_KEY not found in environment variables. Please set it in your .env file or pass it as a parameter.")
-        
-        # Initialize LLM
-        self.llm = ChatGoogleGenerativeAI(
-            model=model_name,
-            temperature=0.2,  # Lower temperature for more structured output
-            max_tokens=4096   # Higher token limit for detailed plans
+        self.gemini_api_key = gemini_api_key
+        self.context = context or RunContext.from_env()
+    
+    @property
+    def llm(self):
+        """Shared LLM client (Gemini, or the local fake when DEEPRESEARCH_LLM_BACKEND=fake), built on first use"""
+        # Planners used only for status queries never construct a client
+        return get_chat_model(
+            self.model_name,
+            temperature=PLANNER_TEMPERATURE,
+            max_tokens=PLANNER_MAX_TOKENS,
+            gemini_api_key=self.gemini_api_key
         )
     
     def generate_research_plan(self, research_topic: str, num_subtopics: int = 8) -> Optional[Dict[str, Any]]:
@@ -163,13 +165,12 @@ Generate the research plan now:"""
             bool: True if saved successfully, False otherwise
         """
         try:
-            if file_path is None:
-                file_path = os.path.join("Workspaces", "research_plan.json")
+            # The task store writes the JSON export atomically after importing the plan
+            self.context.ensure_dirs()
+            store = get_task_store(file_path or self.context.plan_path)
+            store.import_plan(research_plan)
             
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(research_plan, f, indent=2, ensure_ascii=False)
-            
-            print(f"Research plan saved to: {file_path}")
+            print(f"Research plan saved to: {store.plan_path}")
             return True
             
         except Exception as e:
@@ -188,16 +189,13 @@ Generate the research plan now:"""
         """
         try:
             if file_path is None:
-                file_path = os.path.join("Workspaces", "research_plan.json")
+                file_path = self.context.plan_path
             
             if not os.path.exists(file_path):
                 print(f"Research plan file not found: {file_path}")
                 return None
             
-            with open(file_path, 'r', encoding='utf-8') as f:
-                research_plan = json.load(f)
-            
-            return research_plan
+            return get_task_store(file_path).get_plan()
             
         except Exception as e:
             print(f"Error loading research plan: {str(e)}")
@@ -216,35 +214,11 @@ Generate the research plan now:"""
             bool: True if updated successfully, False otherwise
         """
         try:
-            # Load current plan
-            research_plan = self.load_research_plan(file_path)
-            if not research_plan:
-                return False
-            
-            # Find and update the task
-            task_found = False
-            for task in research_plan.get("tasks", []):
-                if task.get("task_id") == task_id:
-                    task["status"] = status
-                    task["last_updated"] = datetime.now().isoformat()
-                    task_found = True
-                    break
-            
-            if not task_found:
+            # Single-row transactional update; no read-modify-write of the whole plan file
+            if not get_task_store(file_path or self.context.plan_path).update_task_status(task_id, status):
                 print(f"Task with ID {task_id} not found")
                 return False
-            
-            # Update metadata
-            completed_tasks = sum(1 for task in research_plan.get("tasks", []) if task.get("status") == "completed")
-            research_plan["last_updated"] = datetime.now().isoformat()
-            
-            # Check if all tasks are completed
-            total_tasks = len(research_plan.get("tasks", []))
-            if completed_tasks == total_tasks:
-                research_plan["plan_status"] = "completed"
-            
-            # Save updated plan
-            return self.save_research_plan(research_plan, file_path)
+            return True
             
         except Exception as e:
             print(f"Error updating task status: {str(e)}")
@@ -261,16 +235,7 @@ Generate the research plan now:"""
             List[Dict[str, Any]]: List of pending tasks
         """
         try:
-            research_plan = self.load_research_plan(file_path)
-            if not research_plan:
-                return []
-            
-            pending_tasks = [
-                task for task in research_plan.get("tasks", [])
-                if task.get("status") == "pending"
-            ]
-            
-            return pending_tasks
+            return get_task_store(file_path or self.context.plan_path).get_pending_tasks()
             
         except Exception as e:
             print(f"Error getting pending tasks: {str(e)}")
@@ -287,30 +252,7 @@ Generate the research plan now:"""
             Dict[str, Any]: Progress information
         """
         try:
-            research_plan = self.load_research_plan(file_path)
-            if not research_plan:
-                return {}
-            
-            tasks = research_plan.get("tasks", [])
-            total_tasks = len(tasks)
-            completed_tasks = sum(1 for task in tasks if task.get("status") == "completed")
-            progress_percentage = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
-            
-            tasks_by_status = {}
-            for task in tasks:
-                status = task.get("status", "unknown")
-                tasks_by_status[status] = tasks_by_status.get(status, 0) + 1
-            
-            return {
-                "research_topic": research_plan.get("research_topic", ""),
-                "plan_status": research_plan.get("plan_status", "unknown"),
-                "total_tasks": total_tasks,
-                "completed_tasks": completed_tasks,
-                "progress_percentage": round(progress_percentage, 2),
-                "tasks_by_status": tasks_by_status,
-                "plan_created": research_plan.get("plan_created", ""),
-                "last_updated": research_plan.get("last_updated", "")
-            }
+            return get_task_store(file_path or self.context.plan_path).get_progress()
             
         except Exception as e:
             print(f"Error getting plan progress: {str(e)}")
@@ -334,6 +276,9 @@ Generate the research plan now:"""
         if research_plan:
             # Save the plan
             if self.save_research_plan(research_plan, file_path):
+                # Notes shards are keyed by task ID, so a new plan starts with empty shards
+                self.context.notes_store().clear()
+                self.context.notes_index().clear("note")
                 print(f"✅ Research plan created and saved successfully!")
                 print(f"📊 Generated {len(research_plan.get('tasks', []))} research tasks")
                 return research_plan
@@ -346,47 +291,50 @@ Generate the research plan now:"""
 
 
 # Convenience functions
-def create_research_plan(research_topic: str, num_subtopics: int = 8) -> Optional[Dict[str, Any]]:
+def create_research_plan(research_topic: str, num_subtopics: int = 8, context: RunContext = None) -> Optional[Dict[str, Any]]:
     """
     Convenience function to create a research plan
     
     Args:
         research_topic (str): The main research topic
         num_subtopics (int): Number of subtopics to generate
+        context (RunContext): Run to create the plan in (defaults to RunContext.from_env())
     
     Returns:
         Optional[Dict[str, Any]]: Research plan or None if failed
     """
-    planner = ResearchPlanner()
+    planner = ResearchPlanner(context=context)
     return planner.create_and_save_plan(research_topic, num_subtopics)
 
 
-def get_plan_status(file_path: str = None) -> Dict[str, Any]:
+def get_plan_status(file_path: str = None, context: RunContext = None) -> Dict[str, Any]:
     """
     Convenience function to get plan progress
     
     Args:
         file_path (str): Optional custom file path
+        context (RunContext): Run whose plan to check (defaults to RunContext.from_env())
     
     Returns:
         Dict[str, Any]: Progress information
     """
-    planner = ResearchPlanner()
+    planner = ResearchPlanner(context=context)
     return planner.get_plan_progress(file_path)
 
 
-def mark_task_completed(task_id: str, file_path: str = None) -> bool:
+def mark_task_completed(task_id: str, file_path: str = None, context: RunContext = None) -> bool:
     """
     Convenience function to mark a task as completed
     
     Args:
         task_id (str): ID of the task to complete
         file_path (str): Optional custom file path
+        context (RunContext): Run whose plan to update (defaults to RunContext.from_env())
     
     Returns:
         bool: True if updated successfully, False otherwise
     """
-    planner = ResearchPlanner()
+    planner = ResearchPlanner(context=context)
     return planner.update_task_status(task_id, "completed", file_path)
 
 
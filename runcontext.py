@@ -0,0 +1,176 @@
+"""
+Run Context Module
+This module defines the run context that scopes one research pipeline to its own workspace.
+A run is identified by a run ID and a root directory; its plan, notes, search log, notes
+index, research notes and report live under <root>/runs/<run_id>, so several pipelines can
+run on one host at the same time. A context without a run ID maps to the classic Workspaces/ layout.
+"""
+
+import os
+import re
+import uuid
+import argparse
+from datetime import datetime
+from typing import List, Optional, Sequence
+
+from taskstore import TaskStore, get_task_store
+from notesstore import NotesStore, get_notes_store
+from Tools.SearchLog import SearchLog, get_search_log
+from Tools.NotesIndex import NotesIndex, get_notes_index
+from Tools.ContentDedup import ContentDedup, get_content_dedup
+
+
+DEFAULT_ROOT_DIR = "Workspaces"
+RUNS_DIR = "runs"
+RUN_ID_PATTERN = re.compile(r'^[A-Za-z0-9][A-Za-z0-9_.-]*$')
+
+
+class RunContext:
+    """
+    Paths and shared stores belonging to one research pipeline run
+    """
+
+    def __init__(self, run_id: Optional[str] = None, root_dir: str = DEFAULT_ROOT_DIR):
+        """
+        Initialize the RunContext
+
+        Args:
+            run_id (Optional[str]): Run identifier, or None for the unscoped Workspaces/ layout
+            root_dir (str): Root directory holding all runs (default: Workspaces)
+
+        Raises:
+            ValueError: If the run ID is not a safe directory name
+        """
+        if run_id is not None and not RUN_ID_PATTERN.match(run_id):
+            raise ValueError(f"Invalid run ID '{run_id}': use letters, digits, '.', '_' and '-'")
+        self.run_id = run_id
+        self.root_dir = root_dir
+        self.workspace_dir = os.path.join(root_dir, RUNS_DIR, run_id) if run_id else root_dir
+
+    @classmethod
+    def new(cls, topic: str = "", root_dir: str = DEFAULT_ROOT_DIR) -> "RunContext":
+        """
+        Create a context with a fresh, unique run ID
+
+        Args:
+            topic (str): Research topic, used to make the run ID readable
+            root_dir (str): Root directory holding all runs (default: Workspaces)
+
+        Returns:
+            RunContext: The new context
+        """
+        slug = re.sub(r'[^a-z0-9]+', '-', topic.lower()).strip('-')[:40].strip('-')
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        run_id = "_".join(part for part in (stamp, slug, uuid.uuid4().hex[:6]) if part)
+        return cls(run_id, root_dir)
+
+    @classmethod
+    def from_env(cls) -> "RunContext":
+        """
+        Build the context named by DEEPRESEARCH_RUN_ID and DEEPRESEARCH_WORKSPACE
+
+        Returns:
+            RunContext: The configured context (the unscoped layout if no run ID is set)
+        """
+        run_id = os.getenv('DEEPRESEARCH_RUN_ID', '').strip() or None
+        root_dir = os.getenv('DEEPRESEARCH_WORKSPACE', '').strip() or DEFAULT_ROOT_DIR
+        return cls(run_id, root_dir)
+
+    @classmethod
+    def from_args(cls, argv: Optional[Sequence[str]] = None) -> "RunContext":
+        """
+        Build the context from --run-id/--root-dir command line options, falling back to the environment
+
+        Args:
+            argv (Optional[Sequence[str]]): Arguments to parse (default: sys.argv[1:])
+
+        Returns:
+            RunContext: The selected context
+        """
+        default = cls.from_env()
+        parser = argparse.ArgumentParser(add_help=False)
+        parser.add_argument("--run-id", default=default.run_id)
+        parser.add_argument("--root-dir", default=default.root_dir)
+        args, _ = parser.parse_known_args(argv)
+        return cls(args.run_id, args.root_dir)
+
+    def to_args(self) -> List[str]:
+        """
+        Command line options that recreate this context in a child process
+
+        Returns:
+            List[str]: Options for from_args()
+        """
+        args = ["--root-dir", self.root_dir]
+        if self.run_id:
+            args += ["--run-id", self.run_id]
+        return args
+
+    def path(self, *parts: str) -> str:
+        """
+        Build a path inside this run's workspace
+
+        Args:
+            *parts (str): Path components below the workspace directory
+
+        Returns:
+            str: The joined path
+        """
+        return os.path.join(self.workspace_dir, *parts)
+
+    @property
+    def plan_path(self) -> str:
+        return self.path("research_plan.json")
+
+    @property
+    def research_path(self) -> str:
+        return self.path("research.md")
+
+    @property
+    def report_path(self) -> str:
+        return self.path("report.md")
+
+    @property
+    def notes_dir(self) -> str:
+        return self.path("notes")
+
+    @property
+    def searches_dir(self) -> str:
+        return self.path("searches")
+
+    @property
+    def notes_index_path(self) -> str:
+        return self.path("notes_index.sqlite")
+
+    def ensure_dirs(self):
+        """Create the run's workspace directory"""
+        os.makedirs(self.workspace_dir, exist_ok=True)
+
+    def task_store(self) -> TaskStore:
+        """Shared TaskStore for this run's research plan"""
+        return get_task_store(self.plan_path)
+
+    def notes_store(self) -> NotesStore:
+        """Shared NotesStore for this run's notes shards and research file"""
+        return get_notes_store(self.notes_dir, self.research_path)
+
+    def search_log(self) -> SearchLog:
+        """Shared SearchLog for this run's search results"""
+        return get_search_log(self.searches_dir)
+
+    def notes_index(self) -> NotesIndex:
+        """Shared full-text index over this run's notes and search results"""
+        return get_notes_index(self.notes_index_path)
+
+    def content_dedup(self) -> ContentDedup:
+        """Near-duplicate page index shared by all subagents of this run"""
+        return get_content_dedup(os.path.abspath(self.workspace_dir))
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, RunContext) and (self.run_id, self.root_dir) == (other.run_id, other.root_dir)
+
+    def __hash__(self) -> int:
+        return hash((self.run_id, self.root_dir))
+
+    def __repr__(self) -> str:
+        return f"RunContext(run_id={self.run_id!r}, root_dir={self.root_dir!r})"
@@ -5,15 +5,19 @@ runs subagents in parallel to execute research tasks.
 """
 
 import os
-import json
 import time
+import queue
 import threading
 
 from typing import List, Dict, Any
 from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from subagent import create_research_subagent
+from subagent import create_research_subagent, warm_up_subagent_model
+from llmbackend import get_llm_registry
 from researchplanner import ResearchPlanner
+from taskstore import get_task_store
+from statusbus import get_status_bus
+from runcontext import RunContext
 
 # Colorful print helpers
 def log_info(msg):
@@ -43,17 +47,19 @@ class SubAgentRunner:
     Manages the execution of multiple research subagents in parallel
     """
     
-    def __init__(self, research_plan_path: str = None, max_workers: int = None):
+    def __init__(self, research_plan_path: str = None, max_workers: int = None, context: RunContext = None):
         """
         Initialize the SubAgent Runner
         
         Args:
-            research_plan_path (str): Path to research plan JSON file
+            research_plan_path (str): Path to research plan JSON file (defaults to the run's research_plan.json)
             max_workers (int): Maximum number of parallel workers (defaults to MAX_CONCURRENT_THREADS)
+            context (RunContext): Run whose tasks to execute (defaults to RunContext.from_env())
         """
-        self.research_plan_path = research_plan_path or os.path.join("Workspaces", "research_plan.json")
+        self.context = context or RunContext.from_env()
+        self.research_plan_path = research_plan_path or self.context.plan_path
         self.max_workers = max_workers or MAX_CONCURRENT_THREADS
-        self.planner = ResearchPlanner()
+        self.planner = ResearchPlanner(context=self.context)
         self.task_status_lock = threading.Lock()
         self.last_known_status = {}
     
@@ -69,56 +75,32 @@ class SubAgentRunner:
                 print(f"❌ Research plan file not found: {self.research_plan_path}")
                 return []
             
-            with open(self.research_plan_path, 'r', encoding='utf-8') as f:
-                research_plan = json.load(f)
-            
-            pending_tasks = [
-                task for task in research_plan.get("tasks", [])
-                if task.get("status") == "pending"
-            ]
-            
-            return pending_tasks
+            # Indexed status query on the task store instead of parsing the whole plan
+            return get_task_store(self.research_plan_path).get_pending_tasks()
             
         except Exception as e:
             print(f"❌ Error getting pending tasks: {str(e)}")
             return []
     
-    def monitor_task_status(self, task_id: str):
+    def on_status_event(self, event: Dict[str, Any]):
         """
-        Monitor and print status changes for a specific task
+        Print status changes for tasks of this runner's plan as they are published
         
         Args:
-            task_id (str): The task ID to monitor
+            event (Dict[str, Any]): Event from the status bus
         """
-        while True:
-            try:
-                with open(self.research_plan_path, 'r', encoding='utf-8') as f:
-                    research_plan = json.load(f)
-                
-                # Find the task
-                for task in research_plan.get("tasks", []):
-                    if task.get("task_id") == task_id:
-                        current_status = task.get("status")
-                        
-                        # Check if status changed
-                        with self.task_status_lock:
-                            if task_id not in self.last_known_status or self.last_known_status[task_id] != current_status:
-                                self.last_known_status[task_id] = current_status
-                                timestamp = datetime.now().strftime("%H:%M:%S")
-                                print(f"[{timestamp}] Task {task_id}: {current_status}")
-                        
-                        # Stop monitoring if task is completed or failed
-                        if current_status in ["completed", "failed"]:
-                            return
-                        
-                        break
-                
-                # Wait before checking again
-                time.sleep(2)
-                
-            except Exception as e:
-                print(f"❌ Error monitoring task {task_id}: {str(e)}")
-                time.sleep(5)
+        if event.get("type") != "task_status" or event.get("plan_path") != os.path.abspath(self.research_plan_path):
+            return
+        
+        task_id = event.get("task_id")
+        current_status = event.get("status")
+        
+        # Check if status changed
+        with self.task_status_lock:
+            if task_id not in self.last_known_status or self.last_known_status[task_id] != current_status:
+                self.last_known_status[task_id] = current_status
+                timestamp = datetime.now().strftime("%H:%M:%S")
+                print(f"[{timestamp}] Task {task_id}: {current_status}")
     
     def execute_task(self, task_id: str) -> Dict[str, Any]:
         """
@@ -133,16 +115,9 @@ class SubAgentRunner:
         try:
             print(f"🚀 Starting execution of Task {task_id}")
             
-            # Start monitoring this task in a separate thread
-            monitor_thread = threading.Thread(
-                target=self.monitor_task_status,
-                args=(task_id,),
-                daemon=True
-            )
-            monitor_thread.start()
-            
             # Create and execute subagent
-            subagent = create_research_subagent(task_id=task_id)
+            subagent = create_research_subagent(task_id=task_id, research_plan_path=self.research_plan_path,
+                                                context=self.context)
             result = subagent.execute_research()
             
             return result
@@ -180,29 +155,41 @@ class SubAgentRunner:
         
         results = []
         
+        # Build the shared LLM client once, before the workers race to construct it
+        try:
+            warm_up_subagent_model()
+        except Exception as e:
+            print(f"⚠️ LLM warm-up failed: {str(e)}")
+        
+        # Status changes arrive from the task store through the bus; no polling threads
+        subscription_id = get_status_bus().subscribe(self.on_status_event)
+        
         # Execute tasks in parallel
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            # Submit all tasks
-            future_to_task = {
-                executor.submit(self.execute_task, task.get("task_id")): task.get("task_id")
-                for task in pending_tasks
-            }
-            
-            # Collect results as they complete
-            for future in as_completed(future_to_task):
-                task_id = future_to_task[future]
-                try:
-                    result = future.result()
-                    results.append(result)
-                    
-                except Exception as e:
-                    print(f"❌ Task {task_id} generated an exception: {str(e)}")
-                    results.append({
-                        "task_id": task_id,
-                        "status": "failed",
-                        "error": str(e),
-                        "timestamp": datetime.now().isoformat()
-                    })
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                # Submit all tasks
+                future_to_task = {
+                    executor.submit(self.execute_task, task.get("task_id")): task.get("task_id")
+                    for task in pending_tasks
+                }
+                
+                # Collect results as they complete
+                for future in as_completed(future_to_task):
+                    task_id = future_to_task[future]
+                    try:
+                        result = future.result()
+                        results.append(result)
+                        
+                    except Exception as e:
+                        print(f"❌ Task {task_id} generated an exception: {str(e)}")
+                        results.append({
+                            "task_id": task_id,
+                            "status": "failed",
+                            "error": str(e),
+                            "timestamp": datetime.now().isoformat()
+                        })
+        finally:
+            get_status_bus().unsubscribe(subscription_id)
         
         return results
     
@@ -236,15 +223,21 @@ class SubAgentRunner:
                     log_error(str(result))
 
         # Show final progress
-        progress = self.planner.get_plan_progress()
+        progress = self.planner.get_plan_progress(self.research_plan_path)
         log_info(f"Overall Progress: {progress.get('progress_percentage', 0)}% completed")
         log_info(f"Tasks by Status: {progress.get('tasks_by_status', {})}")
+        
+        llm_stats = get_llm_registry().get_stats()
+        log_info(f"LLM clients: {llm_stats['clients']} built in {llm_stats['build_seconds']:.2f}s, "
+                 f"reused {llm_stats['hits']} times")
     
     def run(self):
         """
         Main execution method - runs all pending tasks in parallel
         """
         print("🔬 Research SubAgent Runner")
+        if self.context.run_id:
+            print(f"🗂️ Run: {self.context.run_id}")
         print(f"📄 Using research plan: {self.research_plan_path}")
         print(f"⚡ Max parallel workers: {self.max_workers}")
         print(f"{'='*60}")
@@ -258,41 +251,52 @@ class SubAgentRunner:
         # Run parallel execution
         results = self.run_parallel_subagents()
         
+        # Status updates only touch the task store; write research_plan.json once for the run
+        get_task_store(self.research_plan_path).export_json()
+        
         # Display summary
         self.display_summary(results)
         
+        # Rebuild research.md from the per-task notes shards in plan order
+        research_path = self.context.notes_store().merge(self.research_plan_path)
+        log_info(f"Research notes merged into {research_path}")
+        
         print(f"\n🏁 All tasks completed at {datetime.now().strftime('%H:%M:%S')}")
 
 
-def run_all_pending_tasks(research_plan_path: str = None, max_workers: int = None):
+def run_all_pending_tasks(research_plan_path: str = None, max_workers: int = None, context: RunContext = None):
     """
     Convenience function to run all pending tasks
     
     Args:
         research_plan_path (str): Path to research plan JSON file
         max_workers (int): Maximum number of parallel workers (defaults to MAX_CONCURRENT_THREADS)
+        context (RunContext): Run whose tasks to execute (defaults to RunContext.from_env())
     """
-    runner = SubAgentRunner(research_plan_path, max_workers or MAX_CONCURRENT_THREADS)
+    runner = SubAgentRunner(research_plan_path, max_workers or MAX_CONCURRENT_THREADS, context)
     runner.run()
 
 
-def monitor_research_progress(research_plan_path: str = None, interval: int = 10):
+def monitor_research_progress(research_plan_path: str = None, interval: int = 10, context: RunContext = None):
     """
-    Monitor research progress continuously
+    Monitor research progress, printing an update whenever a task changes state
     
     Args:
         research_plan_path (str): Path to research plan JSON file
-        interval (int): Check interval in seconds
+        interval (int): Longest time in seconds between updates when no events arrive
+        context (RunContext): Run to monitor (defaults to RunContext.from_env())
     """
-    planner = ResearchPlanner()
-    plan_path = research_plan_path or os.path.join("Workspaces", "research_plan.json")
+    plan_path = research_plan_path or (context or RunContext.from_env()).plan_path
+    store = get_task_store(plan_path)
+    bus = get_status_bus()
+    subscription_id, events = bus.subscribe_queue()
     
     print("📊 Monitoring research progress...")
     print("Press Ctrl+C to stop monitoring\n")
     
     try:
         while True:
-            progress = planner.get_plan_progress(plan_path)
+            progress = store.get_progress()
             timestamp = datetime.now().strftime("%H:%M:%S")
             
             print(f"[{timestamp}] Progress: {progress.get('progress_percentage', 0)}% | "
@@ -303,10 +307,20 @@ def monitor_research_progress(research_plan_path: str = None, interval: int = 10
                 print("🎉 All tasks completed!")
                 break
             
-            time.sleep(interval)
+            # Sleep until a status event for this plan arrives (or the interval passes)
+            deadline = time.monotonic() + interval
+            while True:
+                try:
+                    event = events.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if event.get("plan_path") == os.path.abspath(plan_path):
+                    break
             
     except KeyboardInterrupt:
         print("\n👋 Monitoring stopped")
+    finally:
+        bus.unsubscribe(subscription_id)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,189 @@
+"""
+Status Bus Module
+This module provides an in-process publish/subscribe bus for task status changes. The task
+store publishes an event whenever a task changes state; the runner and progress monitor
+subscribe to it instead of polling research_plan.json. Events can also be mirrored to a
+JSONL file or a UDP socket for watchers in other processes, configured with
+DEEPRESEARCH_STATUS_SINK ("file:<path>" or "udp:<host>:<port>").
+"""
+
+import os
+import json
+import queue
+import socket
+import threading
+import itertools
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class JsonlFileSink:
+    """
+    Appends each event as one JSON line to a file
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize the JsonlFileSink
+
+        Args:
+            path (str): File to append events to
+        """
+        self.path = path
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+    def __call__(self, event: Dict[str, Any]):
+        line = json.dumps(event, ensure_ascii=False) + "\n"
+        with self.lock:
+            # O_APPEND writes of one line are not interleaved with other processes
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+
+
+class UdpSink:
+    """
+    Sends each event as a JSON datagram
+    """
+
+    def __init__(self, host: str, port: int):
+        """
+        Initialize the UdpSink
+
+        Args:
+            host (str): Destination host
+            port (int): Destination port
+        """
+        self.address = (host, port)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def __call__(self, event: Dict[str, Any]):
+        self.sock.sendto(json.dumps(event, ensure_ascii=False).encode('utf-8'), self.address)
+
+
+def sink_from_spec(spec: str) -> Optional[Callable[[Dict[str, Any]], None]]:
+    """
+    Build a sink from a "file:<path>" or "udp:<host>:<port>" specification
+
+    Args:
+        spec (str): Sink specification
+
+    Returns:
+        Optional[Callable[[Dict[str, Any]], None]]: The sink, or None for an empty spec
+    """
+    spec = spec.strip()
+    if not spec:
+        return None
+    kind, _, target = spec.partition(':')
+    if kind == 'file' and target:
+        return JsonlFileSink(target)
+    if kind == 'udp' and target:
+        host, _, port = target.rpartition(':')
+        return UdpSink(host or '127.0.0.1', int(port))
+    raise ValueError(f"Unknown status sink '{spec}'; use file:<path> or udp:<host>:<port>")
+
+
+class StatusBus:
+    """
+    Thread-safe publish/subscribe bus for task status events
+    """
+
+    def __init__(self):
+        """Initialize the StatusBus"""
+        self.subscribers: Dict[int, Callable[[Dict[str, Any]], None]] = {}
+        self.sinks: List[Callable[[Dict[str, Any]], None]] = []
+        self.ids = itertools.count(1)
+        self.lock = threading.Lock()
+
+    def subscribe(self, callback: Callable[[Dict[str, Any]], None]) -> int:
+        """
+        Call a function for every published event
+
+        The callback runs in the publishing thread, so it should return quickly.
+
+        Args:
+            callback (Callable[[Dict[str, Any]], None]): Function receiving each event
+
+        Returns:
+            int: Subscription id for unsubscribe()
+        """
+        with self.lock:
+            subscription_id = next(self.ids)
+            self.subscribers[subscription_id] = callback
+            return subscription_id
+
+    def subscribe_queue(self) -> Tuple[int, queue.Queue]:
+        """
+        Deliver events into a queue for a consumer that waits on its own thread
+
+        Returns:
+            Tuple[int, queue.Queue]: Subscription id and the queue receiving events
+        """
+        events: queue.Queue = queue.Queue()
+        return self.subscribe(events.put), events
+
+    def unsubscribe(self, subscription_id: int):
+        """
+        Stop delivering events to a subscriber
+
+        Args:
+            subscription_id (int): Id returned by subscribe()
+        """
+        with self.lock:
+            self.subscribers.pop(subscription_id, None)
+
+    def add_sink(self, sink: Callable[[Dict[str, Any]], None]):
+        """
+        Mirror every event to an out-of-process sink
+
+        Args:
+            sink (Callable[[Dict[str, Any]], None]): Sink such as JsonlFileSink or UdpSink
+        """
+        with self.lock:
+            self.sinks.append(sink)
+
+    def publish(self, event_type: str, **fields) -> Dict[str, Any]:
+        """
+        Publish an event to all subscribers and sinks
+
+        Args:
+            event_type (str): Kind of event, e.g. "task_status"
+            **fields: Event payload (task_id, status, ...)
+
+        Returns:
+            Dict[str, Any]: The published event
+        """
+        event = {'type': event_type, 'timestamp': datetime.now().isoformat(), 'pid': os.getpid()}
+        event.update(fields)
+        with self.lock:
+            receivers = list(self.subscribers.values()) + list(self.sinks)
+        for receiver in receivers:
+            try:
+                receiver(event)
+            except Exception as e:
+                # A broken watcher must never fail the task that published the event
+                print(f"Warning: Status subscriber failed: {str(e)}")
+        return event
+
+
+_shared_bus: Optional[StatusBus] = None
+_shared_bus_lock = threading.Lock()
+
+
+def get_status_bus() -> StatusBus:
+    """
+    Get the process-wide shared StatusBus, creating it on first use
+
+    Returns:
+        StatusBus: The shared bus, with the sink from DEEPRESEARCH_STATUS_SINK attached
+    """
+    global _shared_bus
+    if _shared_bus is None:
+        with _shared_bus_lock:
+            if _shared_bus is None:
+                bus = StatusBus()
+                sink = sink_from_spec(os.getenv('DEEPRESEARCH_STATUS_SINK', ''))
+                if sink is not None:
+                    bus.add_sink(sink)
+                _shared_bus = bus
+    return _shared_bus
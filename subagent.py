@@ -13,7 +13,6 @@ from dotenv import load_dotenv
 from langchain.agents import AgentExecutor, create_tool_calling_agent
 from langchain.prompts import ChatPromptTemplate
 from langchain.tools import BaseTool
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain.schema import BaseMessage
 from pydantic import BaseModel, Field
 
@@ -21,114 +20,231 @@ from pydantic import BaseModel, Field
 load_dotenv()
 
 # Import custom tools
-from Tools.WebSearch import WebSearcher
-from Tools.ReadLocalFIle import ReadLocalFile
+from llmbackend import get_chat_model, warm_up_chat_models
+from taskstore import get_task_store
+from runcontext import RunContext
+from Tools.WebSearch import get_web_searcher
+from Tools.ReadLocalFIle import ReadLocalFile, DEFAULT_RANGE_BYTES, DEFAULT_WINDOW_LINES
+
+
+# Files above this size are returned as an outline unless a window is requested
+LARGE_FILE_BYTES = 32000
+
+DEFAULT_SUBAGENT_MODEL = "gemini-2.0-flash-lite"
+SUBAGENT_TEMPERATURE = 0.3
+SUBAGENT_MAX_TOKENS = 2048
 
 
 class WebSearchTool(BaseTool):
     """Custom tool wrapper for WebSearch functionality"""
     name: str = "web_search"
-    description: str = "Search the web for information on a specific topic. Provide a clear search query and get relevant results with extracted content."
+    description: str = ("Search the web for information on a specific topic. Provide a clear search query and get relevant results with extracted content. "
+                        "To run several searches in one step, pass a list of queries in 'queries' instead; results are returned keyed by query.")
+    context: RunContext = Field(default_factory=RunContext.from_env)
     
-    def _run(self, query: str, max_results: int = 5, extract_count: int = 3) -> str:
-        """Execute web search with content extraction"""
+    def _run(self, query: str = "", max_results: int = 5, extract_count: int = 3,
+             queries: Optional[List[str]] = None) -> str:
+        """Execute web search with content extraction for one query or several queries at once"""
         try:
             # Convert to integers to handle float inputs from LangChain
             max_results = int(max_results)
             extract_count = int(extract_count)
             
-            searcher = WebSearcher()
-            results = searcher.search_and_extract(
-                query=query,
+            all_queries = [q for q in (queries or []) if q and q.strip()]
+            if query and query.strip() and query not in all_queries:
+                all_queries.insert(0, query)
+            if not all_queries:
+                return "Error performing web search: no query provided"
+            
+            searcher = get_web_searcher()
+            if len(all_queries) == 1:
+                results = searcher.search_and_extract(
+                    query=all_queries[0],
+                    max_results=max_results,
+                    extract_count=extract_count,
+                    concurrent=True
+                )
+                self._save_search_results(all_queries[0], results)
+                return json.dumps(self._format_results(results), indent=2)
+            
+            all_results = searcher.search_and_extract_many(
+                all_queries,
                 max_results=max_results,
                 extract_count=extract_count
             )
             
-            # Save search results to searches folder
-            self._save_search_results(query, results)
-            
-            # Format results for LLM consumption
-            formatted_results = []
-            for i, content in enumerate(results['extracted_contents']):
-                if content.get('content'):
-                    formatted_results.append({
-                        'source': content.get('source_url', ''),
-                        'title': content.get('title', ''),
-                        'content': content.get('content', '')[:2000],  # Truncate for context window
-                        'date': content.get('date', ''),
-                        'author': content.get('author', '')
-                    })
+            formatted_results = {}
+            for search_query, results in all_results.items():
+                # Save search results to searches folder
+                self._save_search_results(search_query, results)
+                formatted_results[search_query] = self._format_results(results)
             
             return json.dumps(formatted_results, indent=2)
             
         except Exception as e:
             return f"Error performing web search: {str(e)}"
     
-    def _save_search_results(self, query: str, results: dict):
-        """Save search results to the searches folder"""
-        try:
-            # Create filename based on query and timestamp
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            safe_query = "".join(c for c in query if c.isalnum() or c in (' ', '-', '_')).strip()
-            safe_query = safe_query.replace(' ', '_')[:50]  # Limit filename length
-            filename = f"{timestamp}_{safe_query}.json"
+    def _format_results(self, results: dict) -> List[Dict[str, Any]]:
+        """Format extracted contents for LLM consumption, collapsing pages already seen in this run"""
+        dedup = self.context.content_dedup()
+        formatted_results = []
+        by_source = {}
+        for content in results['extracted_contents']:
+            if not content.get('content'):
+                continue
+            source = content.get('source_url', '')
+            original = dedup.check_and_add(source, content['content'], content.get('title', ''))
+            if original is not None:
+                # Mirrored or syndicated copy: keep the URL as a citation, not the text
+                if original in by_source:
+                    by_source[original].setdefault('also_published_at', []).append(source)
+                else:
+                    # The original may have been returned to another subagent, so describe it here
+                    summary = dedup.summary_of(original) or {}
+                    formatted_results.append({
+                        'source': source,
+                        'title': content.get('title', ''),
+                        'duplicate_of': original,
+                        'original_title': summary.get('title', ''),
+                        'original_snippet': summary.get('snippet', ''),
+                        'note': 'Same content as the page at duplicate_of, found earlier in this research run; '
+                                'only its opening is repeated here'
+                    })
+                continue
             
-            # Save search results
-            search_data = {
-                'query': query,
-                'timestamp': datetime.now().isoformat(),
-                'results': results
+            item = {
+                'source': source,
+                'title': content.get('title', ''),
+                'content': content.get('content', '')[:2000],  # Truncate for context window
+                'date': content.get('date', ''),
+                'author': content.get('author', '')
             }
-            
-            file_path = os.path.join("Workspaces", "searches", filename)
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(search_data, f, indent=2, ensure_ascii=False)
-                
+            by_source[source] = item
+            formatted_results.append(item)
+        return formatted_results
+    
+    def _save_search_results(self, query: str, results: dict):
+        """Queue search results for the run's compressed search log (written in the background) and index them"""
+        try:
+            self.context.search_log().append(query, results)
         except Exception as e:
             # Don't fail the search if saving fails
             print(f"Warning: Could not save search results: {str(e)}")
+        try:
+            self.context.notes_index().add_search_results(query, results)
+        except Exception as e:
+            print(f"Warning: Could not index search results: {str(e)}")
 
 
 class FileReaderTool(BaseTool):
-    """Custom tool wrapper for reading local files"""
+    """Custom tool wrapper for reading local files, whole or in windows"""
     name: str = "read_file"
-    description: str = "Read content from a local file. Provide the file path to read its contents."
+    description: str = ("Read content from a local file. Provide the file path to read its contents. "
+                        f"Files larger than {LARGE_FILE_BYTES // 1000} KB return an outline of their headings instead; "
+                        "then read only what you need with 'section' (a heading title), 'start_line'/'num_lines', "
+                        "or 'offset'/'length' in bytes. Set 'outline' to true to get the outline of any file.")
     
-    def _run(self, file_path: str) -> str:
-        """Read file content"""
+    def _run(self, file_path: str, section: Optional[str] = None, start_line: Optional[int] = None,
+             num_lines: Optional[int] = None, offset: Optional[int] = None, length: Optional[int] = None,
+             outline: bool = False) -> str:
+        """Read a whole file, one section, a line window or a byte range"""
         try:
             reader = ReadLocalFile()
-            result = reader.read_file(file_path)
-            if result['success']:
-                return result['content']
+            if outline:
+                return self._format_outline(reader.list_headings(file_path))
+            if section:
+                result = reader.read_section(file_path, section)
+            elif start_line is not None or num_lines is not None:
+                result = reader.read_lines(file_path, int(start_line or 1), int(num_lines or DEFAULT_WINDOW_LINES))
+            elif offset is not None or length is not None:
+                result = reader.read_range(file_path, int(offset or 0), int(length or DEFAULT_RANGE_BYTES))
             else:
+                # Large files would flood the context window; hand back a map of the file instead
+                resolved = file_path if os.path.isabs(file_path) else os.path.join(reader.workspace_path, file_path)
+                if os.path.isfile(resolved) and os.path.getsize(resolved) > LARGE_FILE_BYTES:
+                    return self._format_outline(reader.list_headings(file_path))
+                result = reader.read_file(file_path)
+            
+            if not result['success']:
                 return f"Error reading file: {result['error']}"
+            window = result.get('range')
+            if window and window['has_more']:
+                if 'end_line' in window:
+                    shown = f"lines {window['start_line']}-{window['end_line']} of {window['total_lines']}"
+                else:
+                    shown = f"bytes {window['start_byte']}-{window['end_byte']} of {window['total_bytes']}"
+                return f"{result['content']}\n[Showing {shown}; more content follows]"
+            return result['content']
         except Exception as e:
             return f"Error reading file: {str(e)}"
+    
+    def _format_outline(self, result: dict) -> str:
+        """Format a heading outline with instructions for targeted reads"""
+        if not result['success']:
+            return f"Error reading file: {result['error']}"
+        info = result['file_info']
+        return (f"File {info['relative_path']} has {info['size']} bytes and {result['range']['total_lines']} lines.\n"
+                f"Headings (line number and title):\n{result['content'] or '(no markdown headings)'}\n"
+                "Read part of it with 'section', 'start_line'/'num_lines' or 'offset'/'length'.")
+
+
+class SearchNotesTool(BaseTool):
+    """Tool for full-text search over saved research notes and search results"""
+    name: str = "search_notes"
+    description: str = ("Search the research notes saved by all agents and the pages found by earlier web searches. "
+                        "Returns the best matching passages with their sources. Use it to check whether something "
+                        "has already been covered. Optionally set 'kind' to 'note' or 'search' and 'k' for the number of passages.")
+    context: RunContext = Field(default_factory=RunContext.from_env)
+    
+    def _run(self, query: str, k: int = 5, kind: Optional[str] = None) -> str:
+        """Return the top-k passages for a query"""
+        try:
+            passages = self.context.notes_index().search(query, k=int(k), kind=kind or None)
+            if not passages:
+                return f"No saved notes or search results match: {query}"
+            return json.dumps([{
+                'title': passage['title'],
+                'source': passage['url'] or passage['source'],
+                'task_id': passage['task_id'],
+                'kind': passage['kind'],
+                'passage': passage['content'],
+                'score': passage['score']
+            } for passage in passages], indent=2)
+        except Exception as e:
+            return f"Error searching notes: {str(e)}"
 
 
 class ResearchDataSaverTool(BaseTool):
-    """Tool for saving research data to the central research file"""
+    """Tool for saving research data to the agent's notes shard"""
     name: str = "save_research_data"
     description: str = "Save collected research data to the research file in the workspace folder. Provide the section title and content to save."
+    task_id: Optional[str] = None
+    context: RunContext = Field(default_factory=RunContext.from_env)
     
     def _run(self, section_title: str, content: str, file_path: str = None) -> str:
-        """Save research data to file in workspace folder"""
+        """Save research data to this task's notes shard (or append to an explicit file)"""
         try:
-            # Default to research.md in Workspaces folder if no path provided
             if file_path is None:
-                file_path = os.path.join("Workspaces", "research.md")
+                # Each task appends to its own shard; research.md is rebuilt by the merge step
+                saved = self.context.notes_store().append_section(self.task_id, section_title, content)
+                if saved['duplicate']:
+                    return f"Research data for section: {section_title} was already saved; skipped duplicate"
+                try:
+                    self.context.notes_index().add_note(self.task_id, section_title, content,
+                                                        sha256=saved['sha256'], source=saved['path'])
+                except Exception as e:
+                    # The notes are saved; a missing index entry only affects search_notes
+                    print(f"Warning: Could not index research data: {str(e)}")
+                return f"Successfully saved research data for section: {section_title} to {saved['path']}"
             
             timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             
             # Create section header
             section_header = f"\n\n## {section_title}\n*Updated: {timestamp}*\n\n"
             
-            # Append to research file
+            # Append to the requested file in a single write
             with open(file_path, 'a', encoding='utf-8') as f:
-                f.write(section_header)
-                f.write(content)
-                f.write("\n\n---\n")
+                f.write(section_header + content + "\n\n---\n")
             
             return f"Successfully saved research data for section: {section_title} to {file_path}"
             
@@ -151,13 +267,14 @@ class ResearchSubAgent:
                  key_areas: List[str] = None,
                  agent_name: str = None,
                  gemini_api_key: str = None,
-                 model_name: str = "gemini-2.0-flash-lite"):
+                 model_name: str = DEFAULT_SUBAGENT_MODEL,
+                 context: RunContext = None):
         """
         Initialize the research subagent
         
         Args:
             task_id (str): Task ID to automatically fetch details from research plan
-            research_plan_path (str): Path to research plan JSON file (defaults to Workspaces/research_plan.json)
+            research_plan_path (str): Path to research plan JSON file (defaults to the run's research_plan.json)
             research_topic (str): The main research topic (will be fetched if task_id provided)
             subtopic (str): Specific subtopic this agent should focus on (will be fetched if task_id provided)
             task_description (str): Detailed description of the research task (will be fetched if task_id provided)
@@ -165,13 +282,16 @@ class ResearchSubAgent:
             agent_name (str): Name identifier for this agent (auto-generated if not provided)
             gemini_api_key (str): API key for Gemini (if not set in environment)
             model_name (str): Gemini model to use
+            context (RunContext): Run this agent works in (defaults to RunContext.from_env())
         """
         self.task_id = task_id
         self.model_name = model_name
+        self.context = context or RunContext.from_env()
+        self.research_plan_path = research_plan_path or self.context.plan_path
         
         # If task_id is provided, load details from research plan
         if task_id:
-            task_details = self._load_task_from_plan(task_id, research_plan_path)
+            task_details = self._load_task_from_plan(task_id, self.research_plan_path)
             if task_details:
                 self.research_topic = task_details.get('research_topic', research_topic or '')
                 self.subtopic = task_details.get('subtopic', subtopic or '')
@@ -188,29 +308,20 @@ class ResearchSubAgent:
         
         self.agent_name = agent_name or f"Research Agent - {self.subtopic[:50]}..."
         
-        # Set up Gemini API key
-        if gemini_api_key:
-            os.environ["GOOGLE_API_KEY"] = gemini_api_key
-        elif not os.getenv("GOOGLE_API_KEY"):
-            # Try to get from GEMINI_API_KEY as fallback
-            gemini_key = os.getenv("GEMINI_API_KEY")
-            if gemini_key:
-                os.environ["GOOGLE_API_KEY"] = gemini_key
-            else:
-                raise ValueError("GOOGLE_API_KEY or GEMINI_API_KEY not found in environment variables. Please set it in your .env file or pass it as a parameter.")
-        
-        # Initialize LLM
-        self.llm = ChatGoogleGenerativeAI(
-            model=model_name,
-            temperature=0.3,
-            max_tokens=2048
+        # Shared LLM client (Gemini, or the local fake when DEEPRESEARCH_LLM_BACKEND=fake)
+        self.llm = get_chat_model(
+            model_name,
+            temperature=SUBAGENT_TEMPERATURE,
+            max_tokens=SUBAGENT_MAX_TOKENS,
+            gemini_api_key=gemini_api_key
         )
         
         # Initialize tools
         self.tools = [
-            WebSearchTool(),
+            WebSearchTool(context=self.context),
             FileReaderTool(),
-            ResearchDataSaverTool()
+            SearchNotesTool(context=self.context),
+            ResearchDataSaverTool(task_id=self.task_id, context=self.context)
         ]
         
         # Create system prompt
@@ -232,22 +343,18 @@ class ResearchSubAgent:
         """
         try:
             if plan_path is None:
-                plan_path = os.path.join("Workspaces", "research_plan.json")
+                plan_path = self.research_plan_path
             
             if not os.path.exists(plan_path):
                 print(f"Research plan file not found: {plan_path}")
                 return None
             
-            with open(plan_path, 'r', encoding='utf-8') as f:
-                research_plan = json.load(f)
-            
-            # Find the task with matching ID
-            for task in research_plan.get("tasks", []):
-                if task.get("task_id") == task_id:
-                    # Add research topic from plan metadata
-                    task_details = task.copy()
-                    task_details['research_topic'] = research_plan.get('research_topic', '')
-                    return task_details
+            store = get_task_store(plan_path)
+            task_details = store.get_task(task_id)
+            if task_details:
+                # Add research topic from plan metadata
+                task_details['research_topic'] = store.get_meta('research_topic', '')
+                return task_details
             
             print(f"Task with ID '{task_id}' not found in research plan")
             return None
@@ -275,17 +382,17 @@ MISSION: Conduct an exhaustive, in-depth research analysis of your specific subt
 
 DETAILED INSTRUCTIONS:
 1. You are part of a larger research system. Your job is to become an expert on your assigned subtopic through systematic research.
-2. Use the web_search tool extensively to find detailed information about ALL aspects of your specific subtopic and key focus areas.
+2. Use the web_search tool extensively to find detailed information about ALL aspects of your specific subtopic and key focus areas. When you have several independent searches in mind, pass them together in the 'queries' list so they run in parallel.
 3. Focus specifically on your assigned subtopic - don't drift into other areas of the main topic.
 4. Search for multiple perspectives, related areas, and different viewpoints within your subtopic.
 5. Analyze the information you find and extract detailed insights, facts, statistics, case studies, and expert opinions.
 6. Save your findings using the save_research_data tool with your subtopic as the section title and comprehensive content.
-7. All research data will be appended to the Workspaces/research.md file, and search results will be logged in Workspaces/searches.
+7. All research data will be saved to your task's notes in {self.context.notes_dir} and merged into {self.context.research_path}, and search results will be logged in {self.context.searches_dir}.
 8. Be extremely thorough - aim for depth over breadth, but cover all major aspects of your subtopic.
 9. Always cite your sources with URLs and publication details when available.
 10. Look for recent developments, historical context, and future trends related to your subtopic.
 11. Include quantitative data, statistics, and specific examples whenever possible.
-12. If you need to read existing research files, use the read_file tool to avoid duplication.
+12. Before saving or searching for something, use the search_notes tool to check what other agents have already saved or found; it returns the best matching passages with their sources. Use read_file only when you need a whole section, and read large files by section.
 
 COMPREHENSIVE RESEARCH APPROACH:
 Phase 1 - Foundation Research (Focus on your subtopic):
@@ -478,35 +585,13 @@ Remember: Your goal is to become the definitive expert on this topic through sys
             plan_path (str): Optional custom path to research plan file
         """
         try:
-            if plan_path is None:
-                plan_path = os.path.join("Workspaces", "research_plan.json")
+            plan_path = plan_path or self.research_plan_path
             
             if not os.path.exists(plan_path):
                 return
             
-            # Load current plan
-            with open(plan_path, 'r', encoding='utf-8') as f:
-                research_plan = json.load(f)
-            
-            # Find and update the task
-            for task in research_plan.get("tasks", []):
-                if task.get("task_id") == self.task_id:
-                    task["status"] = status
-                    task["last_updated"] = datetime.now().isoformat()
-                    break
-            
-            # Update plan metadata
-            research_plan["last_updated"] = datetime.now().isoformat()
-            
-            # Check if all tasks are completed
-            completed_tasks = sum(1 for task in research_plan.get("tasks", []) if task.get("status") == "completed")
-            total_tasks = len(research_plan.get("tasks", []))
-            if completed_tasks == total_tasks:
-                research_plan["plan_status"] = "completed"
-            
-            # Save updated plan
-            with open(plan_path, 'w', encoding='utf-8') as f:
-                json.dump(research_plan, f, indent=2, ensure_ascii=False)
+            # Atomic single-task update; concurrent subagents no longer overwrite each other
+            get_task_store(plan_path).update_task_status(self.task_id, status)
                 
         except Exception as e:
             print(f"Warning: Could not update task status: {str(e)}")
@@ -527,7 +612,8 @@ Remember: Your goal is to become the definitive expert on this topic through sys
 # Factory function to create specialized subagents
 def create_research_subagent(task_id: str,
                            research_plan_path: str = None,
-                           gemini_api_key: str = None) -> ResearchSubAgent:
+                           gemini_api_key: str = None,
+                           context: RunContext = None) -> ResearchSubAgent:
     """
     Factory function to create a research subagent using just a task ID
     
@@ -535,6 +621,7 @@ def create_research_subagent(task_id: str,
         task_id (str): The task ID from the research plan
         research_plan_path (str): Optional custom path to research plan file
         gemini_api_key (str): Optional API key for Gemini
+        context (RunContext): Optional run the agent works in
     
     Returns:
         ResearchSubAgent: Configured research subagent
@@ -542,10 +629,26 @@ def create_research_subagent(task_id: str,
     return ResearchSubAgent(
         task_id=task_id,
         research_plan_path=research_plan_path,
-        gemini_api_key=gemini_api_key
+        gemini_api_key=gemini_api_key,
+        context=context
     )
 
 
+def warm_up_subagent_model(model_name: str = DEFAULT_SUBAGENT_MODEL,
+                            gemini_api_key: str = None) -> Dict[str, Any]:
+    """
+    Build the subagents' shared LLM client before the workers start
+    
+    Args:
+        model_name (str): Gemini model the subagents use
+        gemini_api_key (str): Optional API key for Gemini
+    
+    Returns:
+        Dict[str, Any]: LLM client registry stats after warm-up
+    """
+    return warm_up_chat_models([(model_name, SUBAGENT_TEMPERATURE, SUBAGENT_MAX_TOKENS)], gemini_api_key)
+
+
 # Example usage
 if __name__ == "__main__":
     # Example of creating and using a research subagent with just task ID
@@ -0,0 +1,403 @@
+"""
+Task Store Module
+This module keeps the research plan in a SQLite database (WAL mode) next to research_plan.json.
+Task status changes are single-row transactional updates instead of whole-file rewrites, so
+concurrent subagents cannot lose each other's updates. The JSON file is written when a plan is
+imported and on demand through export_json(), e.g. once at the end of a run, for tools that
+read it directly.
+"""
+
+import os
+import json
+import sqlite3
+import tempfile
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from statusbus import get_status_bus
+
+
+DEFAULT_PLAN_PATH = os.path.join("Workspaces", "research_plan.json")
+
+# Task fields stored in their own columns; everything else lives in the JSON data column
+TASK_COLUMNS = ("task_id", "status", "last_updated")
+
+
+class TaskStore:
+    """
+    A thread- and process-safe store for one research plan and its tasks
+    """
+
+    def __init__(self, plan_path: str = DEFAULT_PLAN_PATH, db_path: Optional[str] = None):
+        """
+        Initialize the TaskStore
+
+        Args:
+            plan_path (str): Path of the research plan JSON file (default: Workspaces/research_plan.json)
+            db_path (Optional[str]): SQLite database path (default: the plan path with a .sqlite extension)
+        """
+        self.plan_path = plan_path
+        self.db_path = db_path or os.path.splitext(plan_path)[0] + ".sqlite"
+        self.lock = threading.Lock()
+        # mtime of the JSON file when this store last looked at it, so unchanged files skip the database
+        self.seen_json_mtime: Optional[float] = None
+
+        os.makedirs(os.path.dirname(self.db_path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS plan_meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            )
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                task_id TEXT PRIMARY KEY,
+                position INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                last_updated TEXT,
+                data TEXT NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status)")
+
+        self.sync_from_json()
+
+    def _json_is_newer(self) -> bool:
+        """Whether the JSON file changed after the last export recorded in the database"""
+        row = self.conn.execute("SELECT value FROM plan_meta WHERE key = '_json_mtime'").fetchone()
+        return row is None or os.path.getmtime(self.plan_path) > json.loads(row[0])
+
+    def sync_from_json(self):
+        """Import the JSON plan if it was written by something other than a TaskStore"""
+        try:
+            mtime = os.path.getmtime(self.plan_path)
+        except OSError:
+            return
+        if mtime == self.seen_json_mtime:
+            return
+        with self.lock:
+            if self._json_is_newer():
+                # Re-check inside a write transaction: another store may be between writing
+                # the export and committing its mtime, which must not look like a hand edit
+                self.conn.execute("BEGIN IMMEDIATE")
+                try:
+                    if self._json_is_newer():
+                        with open(self.plan_path, 'r', encoding='utf-8') as f:
+                            self._import_locked(json.load(f))
+                    self.conn.execute("COMMIT")
+                except (OSError, json.JSONDecodeError) as e:
+                    self.conn.execute("ROLLBACK")
+                    print(f"Warning: Could not import research plan {self.plan_path}: {str(e)}")
+                except Exception:
+                    self.conn.execute("ROLLBACK")
+                    raise
+            # Remember the version just checked (an unreadable file is reported once, not on every
+            # call); an export made by the import has already recorded its own, newer mtime
+            self.seen_json_mtime = max(mtime, self.seen_json_mtime or 0.0)
+
+    def import_plan(self, research_plan: Dict[str, Any]):
+        """
+        Replace the stored plan and write the JSON export
+
+        Args:
+            research_plan (Dict[str, Any]): Plan with metadata fields and a "tasks" list
+        """
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._import_locked(research_plan)
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def _import_locked(self, research_plan: Dict[str, Any]):
+        """Replace the stored plan (caller holds the lock and a write transaction)"""
+        self.conn.execute("DELETE FROM plan_meta")
+        self.conn.execute("DELETE FROM tasks")
+        for key, value in research_plan.items():
+            if key != "tasks":
+                self.conn.execute("INSERT INTO plan_meta (key, value) VALUES (?, ?)",
+                                  (key, json.dumps(value, ensure_ascii=False)))
+        for position, task in enumerate(research_plan.get("tasks", [])):
+            data = {k: v for k, v in task.items() if k not in TASK_COLUMNS}
+            self.conn.execute(
+                "INSERT OR REPLACE INTO tasks (task_id, position, status, last_updated, data) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (str(task.get("task_id", position + 1)), position, task.get("status", "pending"),
+                 task.get("last_updated"), json.dumps(data, ensure_ascii=False))
+            )
+        self._refresh_plan_status_locked()
+        self._export_locked()
+
+    def has_plan(self) -> bool:
+        """Whether a plan with at least one task is stored"""
+        with self.lock:
+            return self.conn.execute("SELECT 1 FROM tasks LIMIT 1").fetchone() is not None
+
+    @staticmethod
+    def _task_from_row(row) -> Dict[str, Any]:
+        """Rebuild a task dictionary from a (task_id, status, last_updated, data) row"""
+        task_id, status, last_updated, data = row
+        task = {"task_id": task_id}
+        task.update(json.loads(data))
+        task["status"] = status
+        if last_updated:
+            task["last_updated"] = last_updated
+        return task
+
+    def _plan_locked(self) -> Optional[Dict[str, Any]]:
+        """Read the full plan (caller holds the lock)"""
+        meta = {key: json.loads(value) for key, value in
+                self.conn.execute("SELECT key, value FROM plan_meta WHERE key NOT LIKE '\\_%' ESCAPE '\\'")}
+        rows = self.conn.execute(
+            "SELECT task_id, status, last_updated, data FROM tasks ORDER BY position"
+        ).fetchall()
+        if not meta and not rows:
+            return None
+        # Plans are generated as {"tasks": [...]} with metadata added afterwards; keep that layout
+        plan = {"tasks": [self._task_from_row(row) for row in rows]}
+        plan.update(meta)
+        return plan
+
+    def get_plan(self) -> Optional[Dict[str, Any]]:
+        """
+        Get the full research plan in the research_plan.json layout
+
+        Returns:
+            Optional[Dict[str, Any]]: The plan, or None if nothing is stored
+        """
+        with self.lock:
+            return self._plan_locked()
+
+    def get_task(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a single task
+
+        Args:
+            task_id (str): ID of the task
+
+        Returns:
+            Optional[Dict[str, Any]]: The task, or None if not found
+        """
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT task_id, status, last_updated, data FROM tasks WHERE task_id = ?", (task_id,)
+            ).fetchone()
+        return self._task_from_row(row) if row else None
+
+    def get_meta(self, key: str, default: Any = None) -> Any:
+        """
+        Get a plan metadata field such as research_topic
+
+        Args:
+            key (str): Metadata field name
+            default (Any): Value returned when the field is missing
+
+        Returns:
+            Any: The field value
+        """
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM plan_meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def update_task_status(self, task_id: str, status: str) -> bool:
+        """
+        Atomically set a task's status and refresh the plan status
+
+        Only the task's row and the plan status are written; call export_json() to bring
+        research_plan.json up to date.
+
+        Args:
+            task_id (str): ID of the task to update
+            status (str): New status ("pending", "in_progress", "completed", "failed")
+
+        Returns:
+            bool: True if the task exists and was updated, False otherwise
+        """
+        now = datetime.now().isoformat()
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = self.conn.execute(
+                    "UPDATE tasks SET status = ?, last_updated = ? WHERE task_id = ?", (status, now, task_id)
+                )
+                if cursor.rowcount == 0:
+                    self.conn.execute("ROLLBACK")
+                    return False
+
+                self.conn.execute("INSERT OR REPLACE INTO plan_meta (key, value) VALUES ('last_updated', ?)",
+                                  (json.dumps(now),))
+                tasks_by_status, plan_status = self._refresh_plan_status_locked()
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+        # Notify watchers after the commit, outside the lock, so subscribers can read the store
+        get_status_bus().publish(
+            "task_status",
+            plan_path=os.path.abspath(self.plan_path),
+            task_id=task_id,
+            status=status,
+            tasks_by_status=tasks_by_status,
+            plan_status=plan_status
+        )
+        return True
+
+    def _refresh_plan_status_locked(self) -> Tuple[Dict[str, int], Optional[str]]:
+        """
+        Derive the plan status from the task rows (caller holds the lock and a write transaction)
+
+        Returns:
+            Tuple[Dict[str, int], Optional[str]]: Task counts by status and the plan status, which is
+            "completed" when every task is completed and "active" otherwise (a task can be reset)
+        """
+        tasks_by_status = dict(self.conn.execute(
+            "SELECT status, COUNT(*) FROM tasks GROUP BY status"
+        ).fetchall())
+        if not tasks_by_status:
+            # An empty plan has nothing to derive a status from; keep whatever was imported
+            row = self.conn.execute("SELECT value FROM plan_meta WHERE key = 'plan_status'").fetchone()
+            return tasks_by_status, json.loads(row[0]) if row else None
+        all_completed = tasks_by_status.get("completed", 0) == sum(tasks_by_status.values())
+        plan_status = "completed" if all_completed else "active"
+        self.conn.execute("INSERT OR REPLACE INTO plan_meta (key, value) VALUES ('plan_status', ?)",
+                          (json.dumps(plan_status),))
+        return tasks_by_status, plan_status
+
+    def get_tasks_by_status(self, status: str) -> List[Dict[str, Any]]:
+        """
+        Get all tasks with a given status, in plan order
+
+        Args:
+            status (str): Status to filter on
+
+        Returns:
+            List[Dict[str, Any]]: Matching tasks
+        """
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT task_id, status, last_updated, data FROM tasks WHERE status = ? ORDER BY position",
+                (status,)
+            ).fetchall()
+        return [self._task_from_row(row) for row in rows]
+
+    def get_pending_tasks(self) -> List[Dict[str, Any]]:
+        """
+        Get all pending tasks
+
+        Returns:
+            List[Dict[str, Any]]: List of pending tasks
+        """
+        return self.get_tasks_by_status("pending")
+
+    def get_status_counts(self) -> Dict[str, int]:
+        """
+        Count tasks per status
+
+        Returns:
+            Dict[str, int]: Number of tasks for each status present
+        """
+        with self.lock:
+            return dict(self.conn.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall())
+
+    def get_progress(self) -> Dict[str, Any]:
+        """
+        Get the current progress of the research plan
+
+        Returns:
+            Dict[str, Any]: Progress information (empty if no plan is stored)
+        """
+        if not self.has_plan() and self.get_meta("research_topic") is None:
+            return {}
+
+        tasks_by_status = self.get_status_counts()
+        total_tasks = sum(tasks_by_status.values())
+        completed_tasks = tasks_by_status.get("completed", 0)
+        progress_percentage = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
+
+        return {
+            "research_topic": self.get_meta("research_topic", ""),
+            "plan_status": self.get_meta("plan_status", "unknown"),
+            "total_tasks": total_tasks,
+            "completed_tasks": completed_tasks,
+            "progress_percentage": round(progress_percentage, 2),
+            "tasks_by_status": tasks_by_status,
+            "plan_created": self.get_meta("plan_created", ""),
+            "last_updated": self.get_meta("last_updated", "")
+        }
+
+    def export_json(self, file_path: Optional[str] = None):
+        """
+        Write the plan as JSON
+
+        Status updates do not touch the JSON file, so call this whenever a phase finishes
+        and other tools need to read research_plan.json.
+
+        Args:
+            file_path (Optional[str]): Destination (default: the store's plan path)
+        """
+        with self.lock:
+            if file_path is None or os.path.abspath(file_path) == os.path.abspath(self.plan_path):
+                # Exporting inside a write transaction keeps concurrent exports in commit order
+                self.conn.execute("BEGIN IMMEDIATE")
+                try:
+                    self._export_locked()
+                    self.conn.execute("COMMIT")
+                except Exception:
+                    self.conn.execute("ROLLBACK")
+                    raise
+            else:
+                self._write_json(self._plan_locked() or {"tasks": []}, file_path)
+
+    def _export_locked(self):
+        """Write the JSON export and remember its mtime (caller holds the lock and a write transaction)"""
+        self._write_json(self._plan_locked() or {"tasks": []}, self.plan_path)
+        self.seen_json_mtime = os.path.getmtime(self.plan_path)
+        self.conn.execute("INSERT OR REPLACE INTO plan_meta (key, value) VALUES ('_json_mtime', ?)",
+                          (json.dumps(self.seen_json_mtime),))
+
+    @staticmethod
+    def _write_json(research_plan: Dict[str, Any], file_path: str):
+        """Write JSON to a temp file and rename it so readers never see a partial plan"""
+        directory = os.path.dirname(file_path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(research_plan, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, file_path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+_shared_stores: Dict[str, TaskStore] = {}
+_shared_stores_lock = threading.Lock()
+
+
+def get_task_store(plan_path: Optional[str] = None) -> TaskStore:
+    """
+    Get the process-wide shared TaskStore for a plan file, creating it on first use
+
+    Args:
+        plan_path (Optional[str]): Path of the research plan JSON file (default: Workspaces/research_plan.json)
+
+    Returns:
+        TaskStore: The shared store
+    """
+    path = os.path.abspath(plan_path or DEFAULT_PLAN_PATH)
+    with _shared_stores_lock:
+        store = _shared_stores.get(path)
+        if store is None:
+            store = TaskStore(plan_path or DEFAULT_PLAN_PATH)
+            _shared_stores[path] = store
+            return store
+    # Pick up hand edits or plans copied in since the store was opened
+    store.sync_from_json()
+    return store
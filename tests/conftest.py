@@ -0,0 +1,62 @@
+"""
+Shared test helpers: a network-free stand-in for HttpClient serving canned pages
+"""
+
+import os
+import sys
+
+import pytest
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# Make the repository root and Tools/ importable the same way the application does
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, "Tools"))
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def read_fixture(name: str) -> str:
+    """Read a saved page from tests/fixtures"""
+    with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def make_response(url: str, body: bytes, status: int = 200,
+                  content_type: str = "text/html; charset=utf-8") -> requests.Response:
+    """Build an already-consumed requests.Response whose body is served from memory"""
+    response = requests.Response()
+    response.status_code = status
+    response.url = url
+    response.headers = CaseInsensitiveDict({"Content-Type": content_type})
+    response.encoding = "utf-8"
+    response._content = body
+    response._content_consumed = True
+    return response
+
+
+class FakeHttpClient:
+    """Answers GET requests from a dict of URL -> (body, status) and records every request"""
+
+    def __init__(self, pages=None, default=None):
+        self.pages = dict(pages or {})
+        self.default = default
+        self.requests = []
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        self.requests.append(url)
+        for prefix, page in self.pages.items():
+            if url.startswith(prefix):
+                break
+        else:
+            page = self.default
+        if page is None:
+            raise requests.exceptions.ConnectionError(f"No stubbed page for {url}")
+        body, status = page if isinstance(page, tuple) else (page, 200)
+        return make_response(url, body.encode("utf-8") if isinstance(body, str) else body, status)
+
+
+@pytest.fixture
+def fake_http():
+    return FakeHttpClient()
@@ -0,0 +1,30 @@
+"""
+Near-duplicate detection across pages seen in one research run
+"""
+
+from ContentDedup import ContentDedup, hamming_distance, simhash
+
+
+ARTICLE = " ".join(
+    f"Perovskite tandem cells reached record efficiency in test {i} according to the lab report."
+    for i in range(10)
+)
+
+
+def test_simhash_is_stable_under_small_edits():
+    edited = ARTICLE.replace("test 3 ", "trial 3 ")
+    assert hamming_distance(simhash(ARTICLE), simhash(edited)) <= 6
+    assert simhash("") == 0
+
+
+def test_repeated_duplicate_is_listed_once():
+    dedup = ContentDedup()
+    assert dedup.check_and_add("https://origin.example/a", ARTICLE, "Record tandem cells") is None
+    for _ in range(3):
+        assert dedup.check_and_add("https://mirror.example/a", ARTICLE) == "https://origin.example/a"
+
+    assert dedup.duplicates_of("https://origin.example/a") == ["https://mirror.example/a"]
+    assert dedup.summary_of("https://origin.example/a") == {
+        "title": "Record tandem cells", "snippet": ARTICLE[:300]
+    }
+    assert dedup.summary_of("https://mirror.example/a") is None
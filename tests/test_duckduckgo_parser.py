@@ -0,0 +1,70 @@
+"""
+Differential tests of the lxml result parser against the BeautifulSoup parser on saved pages
+"""
+
+import pytest
+
+from conftest import FakeHttpClient, read_fixture
+from DuckDuckGoSearch import DuckDuckGoSearcher, _needs_bs4, compare_parsers
+from SearchCache import SearchCache
+
+
+FIXTURES = [
+    "duckduckgo_results.html",
+    "duckduckgo_hidden_text.html",
+    "duckduckgo_nested_links.html",
+    "duckduckgo_web_results.html",
+]
+
+
+@pytest.mark.parametrize("name", FIXTURES)
+@pytest.mark.parametrize("max_results", [1, 3, 10])
+def test_parsers_agree(name, max_results):
+    parsers_match, lxml_results, bs4_results = compare_parsers(read_fixture(name), max_results)
+    assert parsers_match, (lxml_results, bs4_results)
+    assert lxml_results
+
+
+@pytest.mark.parametrize("name", ["duckduckgo_results.html", "duckduckgo_hidden_text.html",
+                                  "duckduckgo_web_results.html"])
+def test_ordinary_pages_use_lxml(name):
+    assert not _needs_bs4(read_fixture(name))
+
+
+def test_hidden_text_is_skipped():
+    _, results, _ = compare_parsers(read_fixture("duckduckgo_hidden_text.html"))
+    assert [r["title"] for r in results] == [
+        "Trackedresult", "Styledresult", "Reading漢字aloud", "Q&A: <b> tags 'escaped'\xa0here"
+    ]
+    assert results[0]["snippet"] == "Snippet before scriptand after it."
+    assert results[1]["snippet"] == "Inlinecomment andtemplate."
+    assert results[2]["snippet"] == "Ruby annotations like東京show pronunciation & meaning."
+
+
+def test_nested_links_and_cdata_fall_back_to_bs4():
+    html = read_fixture("duckduckgo_nested_links.html")
+    assert _needs_bs4(html)
+    _, results, _ = compare_parsers(html)
+    assert results[0]["title"] == "Outer titleinner linktail"
+    assert results[0]["snippet"] == "Snippet witha citationinside."
+    assert results[2]["snippet"] == "Beforeraw sectionafter."
+
+
+def test_web_result_containers():
+    _, results, _ = compare_parsers(read_fixture("duckduckgo_web_results.html"))
+    assert [r["url"] for r in results] == ["https://example.org/lite-one", "https://example.org/lite-two"]
+    assert results[1] == {"title": "Second   lite\n      result", "url": "https://example.org/lite-two",
+                          "snippet": ""}
+
+
+def test_cached_results_are_not_shared_with_the_caller():
+    http = FakeHttpClient(default=read_fixture("duckduckgo_results.html"))
+    searcher = DuckDuckGoSearcher(http_client=http, search_cache=SearchCache(db_path=None))
+
+    first = searcher.search("solar panels", max_results=3)
+    expected = [dict(result) for result in first]
+    first[0]["title"] = "edited by the caller"
+    first.append({"title": "extra", "url": "https://extra.example", "snippet": ""})
+
+    assert searcher.search("solar panels", max_results=3) == expected
+    assert len(http.requests) == 1
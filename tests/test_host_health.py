@@ -0,0 +1,102 @@
+"""
+Circuit breaker and negative URL cache interplay with HttpClient and extraction retries
+"""
+
+import pytest
+import requests
+
+from conftest import make_response, read_fixture
+from HostHealth import HostHealthRegistry, HostUnavailableError
+from HttpSession import HttpClient
+from RequestCoalescer import RequestCoalescer
+from WebContentExtractor import WebContentExtractor
+
+
+URL = "https://flaky.example.org/article"
+
+
+class NoRateLimit:
+    def acquire(self, url):
+        pass
+
+
+def make_client(statuses, registry=None):
+    """HttpClient whose session answers with the given statuses in turn (exceptions are raised)"""
+    client = HttpClient(rate_limiter=NoRateLimit(), host_health=registry or HostHealthRegistry())
+    calls = []
+
+    def request(method, url, **kwargs):
+        outcome = statuses[min(len(calls), len(statuses) - 1)]
+        calls.append(url)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        body = read_fixture("article.html") if outcome == 200 else "error"
+        return make_response(url, body.encode("utf-8"), outcome)
+
+    client.session.request = request
+    return client, calls
+
+
+def make_extractor(client):
+    return WebContentExtractor(http_client=client, use_cache=False, coalescer=RequestCoalescer())
+
+
+def test_retries_reach_the_network_after_a_failure():
+    client, calls = make_client([503, 503, 200])
+    content = make_extractor(client)._extract_with_retries(URL, max_retries=3)
+    assert content and "band gap" in content["content"]
+    assert len(calls) == 3
+    assert client.host_health.get_status() == {"unhealthy_hosts": {}, "failed_urls": 0}
+
+
+def test_last_failed_attempt_is_remembered():
+    client, calls = make_client([404])
+    assert make_extractor(client)._extract_with_retries(URL, max_retries=3) is None
+    assert len(calls) == 3
+    with pytest.raises(HostUnavailableError):
+        client.host_health.check(URL)
+
+
+def test_probe_is_released_after_unexpected_error():
+    registry = HostHealthRegistry(failure_threshold=1, cooldown=0)
+    client, calls = make_client([ValueError("parser bug"), 200], registry)
+    registry.record_response("https://flaky.example.org/other", 503)
+
+    with pytest.raises(ValueError):
+        client.get(URL)
+    # The failed probe must not keep the host locked in half-open state
+    assert client.get(URL).status_code == 200
+    assert registry.get_status()["unhealthy_hosts"] == {}
+
+
+def test_body_read_failure_counts_against_the_host():
+    registry = HostHealthRegistry(failure_threshold=1)
+    client, calls = make_client([200], registry)
+    session_request = client.session.request
+
+    def broken_body(method, url, **kwargs):
+        response = session_request(method, url, **kwargs)
+
+        def iter_content(chunk_size=1):
+            raise requests.exceptions.ChunkedEncodingError("connection broken mid-body")
+            yield b""
+
+        response.iter_content = iter_content
+        return response
+
+    client.session.request = broken_body
+    content, error = make_extractor(client).extract_content_with_error(URL)
+
+    assert content is None and isinstance(error, requests.exceptions.ChunkedEncodingError)
+    assert registry.get_status()["unhealthy_hosts"]["flaky.example.org"]["state"] == "open"
+
+
+def test_rate_limiting_has_its_own_threshold():
+    registry = HostHealthRegistry(failure_threshold=3, throttle_threshold=5)
+    for _ in range(4):
+        registry.record_response(URL, 429, remember_url=False)
+    assert registry.get_status()["unhealthy_hosts"] == {}
+
+    registry.record_response(URL, 429, remember_url=False)
+    with pytest.raises(HostUnavailableError):
+        registry.check(URL)
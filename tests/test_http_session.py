@@ -0,0 +1,73 @@
+"""
+Transport-level retries of the shared HttpClient against a local HTTP server
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from HostHealth import HostHealthRegistry
+from HttpSession import HttpClient
+
+
+class NoRateLimit:
+    def acquire(self, url):
+        pass
+
+
+@pytest.fixture
+def server():
+    """Local server whose behaviour is picked per test through server.mode"""
+    hits = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits.append(self.path)
+            if self.server.mode == "slow":
+                time.sleep(1)
+                return
+            self.send_response(429)
+            self.send_header("Retry-After", "120")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    httpd.daemon_threads = True
+    httpd.hits = hits
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def make_client():
+    return HttpClient(rate_limiter=NoRateLimit(), host_health=HostHealthRegistry(), backoff_factor=0.01)
+
+
+def test_read_timeouts_are_not_retried_by_the_transport(server):
+    server.mode = "slow"
+    client = make_client()
+
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        client.get(f"http://127.0.0.1:{server.server_port}/slow", timeout=0.2)
+
+    assert server.hits == ["/slow"]
+
+
+def test_retry_after_does_not_stall_status_retries(server):
+    server.mode = "throttled"
+    client = make_client()
+
+    started = time.monotonic()
+    response = client.get(f"http://127.0.0.1:{server.server_port}/busy")
+
+    assert response.status_code == 429
+    assert len(server.hits) == 1 + client.max_retries
+    assert time.monotonic() - started < 5
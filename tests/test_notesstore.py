@@ -0,0 +1,32 @@
+"""
+Merging per-task note shards into the research file
+"""
+
+import os
+
+from notesstore import NotesStore
+from taskstore import TaskStore
+
+
+def test_merge_follows_the_run_plan(tmp_path):
+    plan_path = str(tmp_path / "run" / "research_plan.json")
+    TaskStore(plan_path).import_plan({"tasks": [{"task_id": "2"}, {"task_id": "1"}]})
+    store = NotesStore(str(tmp_path / "notes"), str(tmp_path / "research.md"))
+    store.append_section("1", "First task", "Notes on task one.")
+    store.append_section("2", "Second task", "Notes on task two.")
+
+    with open(store.merge(plan_path), encoding="utf-8") as f:
+        merged = f.read()
+    assert merged.index("Second task") < merged.index("First task")
+
+
+def test_merge_without_plan_opens_no_task_store(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    store = NotesStore(str(tmp_path / "notes"), str(tmp_path / "research.md"))
+    store.append_section("1", "First task", "Notes on task one.")
+    store.append_section("2", "Second task", "Notes on task two.")
+
+    with open(store.merge(), encoding="utf-8") as f:
+        merged = f.read()
+    assert merged.index("First task") < merged.index("Second task")
+    assert not os.path.exists(tmp_path / "Workspaces")
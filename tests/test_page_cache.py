@@ -0,0 +1,65 @@
+"""
+PageCache size accounting, LRU eviction and access-time updates
+"""
+
+import os
+
+import PageCache as page_cache_module
+from PageCache import PageCache
+
+
+HEADERS = {"Content-Type": "text/html"}
+
+
+def body_files(cache):
+    return sorted(name for _, _, names in os.walk(cache.bodies_dir) for name in names)
+
+
+def test_shared_bodies_count_once(tmp_path):
+    cache = PageCache(str(tmp_path), max_bytes=250)
+    shared = b"a" * 100
+    for i in range(3):
+        cache.store(f"https://mirror{i}.example/page", shared, HEADERS)
+    assert cache.total_bytes == 100
+
+    # 100 shared + 100 new is under the limit, so nothing may be evicted
+    cache.store("https://other.example/page", b"b" * 100, HEADERS)
+    assert cache.total_bytes == 200
+    assert all(cache.get(f"https://mirror{i}.example/page") for i in range(3))
+    assert len(body_files(cache)) == 2
+
+
+def test_eviction_frees_least_recently_used_bodies(tmp_path):
+    cache = PageCache(str(tmp_path), max_bytes=250)
+    for name in ("old", "mid", "new"):
+        cache.store(f"https://{name}.example/", name.encode() * 30, HEADERS)
+
+    assert cache.get("https://old.example/") is None
+    assert cache.get("https://mid.example/") and cache.get("https://new.example/")
+    assert cache.total_bytes == 180
+    assert len(body_files(cache)) == 2
+
+
+def test_replacing_a_body_releases_the_old_size(tmp_path):
+    cache = PageCache(str(tmp_path))
+    cache.store("https://a.example/", b"x" * 50, HEADERS)
+    cache.store("https://a.example/", b"y" * 20, HEADERS)
+    assert cache.total_bytes == 20
+
+
+def test_reads_update_access_time_at_most_once_per_interval(tmp_path, monkeypatch):
+    cache = PageCache(str(tmp_path))
+    clock = [1000.0]
+    monkeypatch.setattr(page_cache_module.time, "time", lambda: clock[0])
+    cache.store("https://a.example/", b"body", HEADERS)
+
+    def accessed_at():
+        return cache.conn.execute("SELECT accessed_at FROM pages").fetchone()[0]
+
+    clock[0] += 30
+    assert cache.get("https://a.example/")
+    assert accessed_at() == 1000.0
+
+    clock[0] += page_cache_module.ACCESS_UPDATE_INTERVAL
+    assert cache.get("https://a.example/")
+    assert accessed_at() == clock[0]
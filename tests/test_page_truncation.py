@@ -0,0 +1,74 @@
+"""
+Bodies cut off at a size cap must never be stored as complete pages
+"""
+
+import requests
+
+from conftest import FakeHttpClient, make_response, read_fixture
+from HttpRecorder import HttpRecorder, REPLAY, TRUNCATED_HEADER
+from PageCache import PageCache
+from WebContentExtractor import WebContentExtractor
+
+
+URL = "https://example.org/solar/efficiency"
+
+
+def make_extractor(tmp_path, http, max_bytes):
+    return WebContentExtractor(http_client=http, page_cache=PageCache(str(tmp_path / "pages")),
+                               max_bytes=max_bytes)
+
+
+def test_truncated_page_is_not_cached(tmp_path):
+    page = read_fixture("article.html")
+    extractor = make_extractor(tmp_path, FakeHttpClient(default=page), max_bytes=len(page) // 2)
+
+    body, _ = extractor._fetch_page(URL)
+    assert len(body) == len(page) // 2
+    assert extractor.page_cache.get(URL) is None
+
+
+def test_page_at_the_limit_is_cached(tmp_path):
+    page = read_fixture("article.html")
+    extractor = make_extractor(tmp_path, FakeHttpClient(default=page), max_bytes=len(page.encode("utf-8")))
+
+    body, _ = extractor._fetch_page(URL)
+    assert body == page.encode("utf-8")
+    assert extractor.page_cache.get(URL)["body"] == body
+
+
+class FakeSession:
+    def __init__(self, body):
+        self.body = body
+
+    def request(self, method, url, **kwargs):
+        return make_response(url, self.body)
+
+
+def test_recorder_marks_truncated_bodies(tmp_path):
+    archive = str(tmp_path / "archive.sqlite")
+    recorder = HttpRecorder(archive_path=archive, max_body_bytes=100)
+
+    live = recorder.request(FakeSession(b"x" * 250), "GET", URL)
+    assert live.content == b"x" * 100
+    assert live.headers[TRUNCATED_HEADER] == "1"
+    small = recorder.request(FakeSession(b"y" * 100), "GET", URL + "?small")
+    assert TRUNCATED_HEADER not in small.headers
+
+    replay = HttpRecorder(mode=REPLAY, archive_path=archive, latency="none")
+    replayed = replay.request(requests.Session(), "GET", URL)
+    assert replayed.headers[TRUNCATED_HEADER] == "1"
+
+
+def test_recorder_truncation_is_not_cached(tmp_path):
+    page = read_fixture("article.html").encode("utf-8")
+    recorder = HttpRecorder(archive_path=str(tmp_path / "archive.sqlite"), max_body_bytes=len(page) // 2)
+
+    class RecordingHttp:
+        def get(self, url, **kwargs):
+            kwargs.pop("remember_failure", None)
+            return recorder.request(FakeSession(page), "GET", url, **kwargs)
+
+    extractor = make_extractor(tmp_path, RecordingHttp(), max_bytes=len(page))
+    body, _ = extractor._fetch_page(URL)
+    assert len(body) == len(page) // 2
+    assert extractor.page_cache.get(URL) is None
@@ -0,0 +1,24 @@
+"""
+Search log records are snapshots of the results at the time they were logged
+"""
+
+from SearchLog import SearchLog
+
+
+def test_record_is_serialized_when_queued(tmp_path):
+    log = SearchLog(str(tmp_path))
+    results = {
+        "search_results": [{"title": "Perovskite cells", "url": "https://a.example/pv", "snippet": ""}],
+        "extracted_contents": [],
+    }
+
+    log.append("perovskite efficiency", results)
+    results["search_results"].append({"title": "Added later", "url": "https://b.example/", "snippet": ""})
+    results["search_results"][0]["title"] = "Edited later"
+    log.flush()
+
+    [record] = log.find(query="perovskite efficiency")
+    assert record["results"]["search_results"] == [
+        {"title": "Perovskite cells", "url": "https://a.example/pv", "snippet": ""}
+    ]
+    assert log.find(url="https://b.example/") == []
@@ -0,0 +1,90 @@
+"""
+TaskStore status updates and the on-demand JSON export
+"""
+
+import json
+import os
+
+from taskstore import TaskStore, get_task_store
+
+
+PLAN = {
+    "tasks": [
+        {"task_id": "1", "title": "Background", "status": "pending"},
+        {"task_id": "2", "title": "Current state", "status": "pending"},
+    ],
+    "research_topic": "Solar panel efficiency",
+    "plan_status": "in_progress",
+}
+
+
+def _read_json(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_status_updates_do_not_rewrite_json(tmp_path):
+    plan_path = str(tmp_path / "research_plan.json")
+    store = TaskStore(plan_path)
+    store.import_plan(PLAN)
+    exported = _read_json(plan_path)
+    mtime = os.stat(plan_path).st_mtime_ns
+
+    assert store.update_task_status("1", "completed")
+    assert not store.update_task_status("missing", "completed")
+
+    assert os.stat(plan_path).st_mtime_ns == mtime
+    assert _read_json(plan_path) == exported
+    assert store.get_task("1")["status"] == "completed"
+    assert store.get_status_counts() == {"completed": 1, "pending": 1}
+
+
+def test_export_json_and_reopen(tmp_path):
+    plan_path = str(tmp_path / "research_plan.json")
+    store = TaskStore(plan_path)
+    store.import_plan(PLAN)
+    store.update_task_status("1", "completed")
+    store.update_task_status("2", "completed")
+
+    # The unchanged JSON file must not be re-imported over newer database state
+    reopened = TaskStore(plan_path)
+    assert reopened.get_meta("plan_status") == "completed"
+    assert reopened.get_pending_tasks() == []
+
+    store.export_json()
+    plan = _read_json(plan_path)
+    assert [task["status"] for task in plan["tasks"]] == ["completed", "completed"]
+    assert plan["plan_status"] == "completed"
+
+
+def test_plan_status_follows_the_task_rows(tmp_path):
+    store = TaskStore(str(tmp_path / "research_plan.json"))
+    store.import_plan(PLAN)
+    store.update_task_status("1", "completed")
+    store.update_task_status("2", "completed")
+    assert store.get_meta("plan_status") == "completed"
+
+    # A task sent back for another pass reopens the plan
+    store.update_task_status("2", "pending")
+    assert store.get_meta("plan_status") == "active"
+
+
+def test_shared_store_imports_only_changed_json(tmp_path, monkeypatch):
+    plan_path = str(tmp_path / "research_plan.json")
+    store = get_task_store(plan_path)
+    store.import_plan(PLAN)
+
+    checks = []
+    json_is_newer = store._json_is_newer
+    monkeypatch.setattr(store, "_json_is_newer", lambda: checks.append(1) or json_is_newer())
+    for _ in range(3):
+        assert get_task_store(plan_path) is store
+    assert checks == []
+
+    # A hand edit is picked up on the next lookup
+    edited = _read_json(plan_path)
+    edited["research_topic"] = "Wind turbine efficiency"
+    with open(plan_path, "w", encoding="utf-8") as f:
+        json.dump(edited, f)
+    os.utime(plan_path, ns=(os.stat(plan_path).st_atime_ns, os.stat(plan_path).st_mtime_ns + 10**9))
+    assert get_task_store(plan_path).get_meta("research_topic") == "Wind turbine efficiency"
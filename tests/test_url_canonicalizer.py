@@ -0,0 +1,21 @@
+"""
+Canonical URL forms shared by the page cache and the request coalescer
+"""
+
+import pytest
+
+from UrlCanonicalizer import canonicalize_url
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("HTTPS://Example.COM:443/a/?utm_source=x&b=2&a=1#top", "https://example.com/a?a=1&b=2"),
+    ("http://[::1]:8080/a", "http://[::1]:8080/a"),
+    ("http://[FE80::1]:80/docs/", "http://[fe80::1]/docs"),
+])
+def test_canonical_form(url, expected):
+    assert canonicalize_url(url) == expected
+
+
+@pytest.mark.parametrize("url", ["http://h:abc/", "http://[::1/page"])
+def test_unparseable_url_is_returned_unchanged(url):
+    assert canonicalize_url(url) == url
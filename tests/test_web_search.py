@@ -0,0 +1,64 @@
+"""
+WebSearcher entry points exercised end to end against a stubbed network
+"""
+
+import pytest
+
+from conftest import FakeHttpClient, read_fixture
+from Tools.WebSearch import WebSearcher
+
+
+SEARCH_PREFIX = "https://html.duckduckgo.com/"
+EXPECTED_URLS = [
+    "https://example.org/solar/efficiency",
+    "https://news.example.com/2024/record-cells",
+    "https://energy.example.net/guides/choosing-panels",
+]
+
+
+@pytest.fixture
+def web_searcher():
+    http = FakeHttpClient(pages={SEARCH_PREFIX: read_fixture("duckduckgo_results.html")},
+                          default=read_fixture("article.html"))
+    searcher = WebSearcher(http_client=http)
+    # Keep the shared on-disk caches out of the test
+    searcher.searcher.cache = None
+    searcher.extractor.page_cache = None
+    return searcher
+
+
+def _assert_extracted(result, query):
+    assert [r["url"] for r in result["search_results"][:3]] == EXPECTED_URLS
+    contents = result["extracted_contents"]
+    assert [c["source_url"] for c in contents] == EXPECTED_URLS
+    assert [c["extraction_order"] for c in contents] == [1, 2, 3]
+    for content in contents:
+        assert content["search_query"] == query
+        assert "band gap" in content["content"]
+
+
+@pytest.mark.parametrize("concurrent", [False, True])
+def test_search_and_extract(web_searcher, concurrent):
+    result = web_searcher.search_and_extract("solar panel efficiency", max_results=5,
+                                             extract_count=3, concurrent=concurrent)
+    _assert_extracted(result, "solar panel efficiency")
+
+
+def test_search_and_extract_batch(web_searcher):
+    result = web_searcher.search_and_extract_batch("solar panel efficiency", max_results=5,
+                                                   extract_count=3, max_retries=1)
+    _assert_extracted(result, "solar panel efficiency")
+
+
+def test_search_and_extract_many(web_searcher):
+    queries = ["solar panel efficiency", "perovskite cells", "solar panel efficiency"]
+    results = web_searcher.search_and_extract_many(queries, max_results=5, extract_count=3)
+    assert list(results) == ["solar panel efficiency", "perovskite cells"]
+    for query, result in results.items():
+        _assert_extracted(result, query)
+
+
+def test_search_without_results(web_searcher):
+    web_searcher.http.pages[SEARCH_PREFIX] = "<html><body><div id='links'></div></body></html>"
+    assert web_searcher.search_and_extract("nothing") == {"search_results": [], "extracted_contents": []}
+    assert web_searcher.search_and_extract_batch("nothing") == {"search_results": [], "extracted_contents": []}